@@ -0,0 +1,220 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from debate_host import StreamInterrupted, is_error_response
+
+DEFAULT_JOBS_PATH = os.path.join("cache", "jobs.sqlite3")
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('done', 'error', 'cancelled')
+
+
+class JobQueue:
+    """Runs analysis and verdict calls on worker threads, off the Streamlit script thread.
+
+    Jobs are keyed by session and debate and persisted in SQLite together with their
+    streamed progress and result, so a page can poll for them across reruns and
+    browser refreshes. The queue also keeps a snapshot of each debate's state so a
+    refreshed page can pick the debate up again. Jobs still active when the process
+    stops are marked as errors on the next start.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_PATH, max_workers=DEFAULT_MAX_WORKERS, max_age_seconds=DEFAULT_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="debate-job")
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._cancel_requested = set()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    debate_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    partial TEXT NOT NULL DEFAULT '',
+                    result TEXT,
+                    meta TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_debate ON jobs (session_id, debate_id, created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS debate_states (
+                    debate_id TEXT PRIMARY KEY,
+                    session_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Nothing survives a restart in the worker threads
+            conn.execute(
+                "UPDATE jobs SET status = 'error', error = 'interrupted by a server restart', finished_at = ? "
+                "WHERE status IN ('queued', 'running')",
+                (time.time(),)
+            )
+            cutoff = time.time() - max_age_seconds
+            conn.execute("DELETE FROM jobs WHERE created_at < ?", (cutoff,))
+            conn.execute("DELETE FROM debate_states WHERE updated_at < ?", (cutoff,))
+
+    def _connect(self):
+        # One short-lived connection per operation keeps the store safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, session_id, debate_id, kind, chunks, payload=None, describe=None):
+        """Queue a job and return its id.
+
+        chunks() is called on a worker thread and must return an iterator of text chunks
+        (e.g. a DebateHost stream_* call); describe(), if given, is called on the same
+        thread afterwards and returns extra metadata to store with the result.
+        """
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, session_id, debate_id, kind, status, payload, created_at) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, session_id, debate_id, kind, json.dumps(payload or {}), time.time())
+            )
+        with self._lock:
+            self._futures[job_id] = self._pool.submit(self._run, job_id, chunks, describe)
+        return job_id
+
+    def _set(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def _run(self, job_id, chunks, describe):
+        text = ""
+        try:
+            if self._is_cancel_requested(job_id):
+                self._set(job_id, status='cancelled', finished_at=time.time())
+                return
+            self._set(job_id, status='running', started_at=time.time())
+
+            # The first chunk is written straight away so the page shows progress as early as possible
+            last_flush = 0.0
+            stream = chunks()
+            for chunk in stream:
+                text += chunk
+                # Cancellation takes effect between chunks; the model call itself cannot be interrupted
+                if self._is_cancel_requested(job_id):
+                    getattr(stream, 'close', lambda: None)()
+                    self._set(job_id, status='cancelled', partial=text, finished_at=time.time())
+                    return
+                if time.monotonic() - last_flush >= PROGRESS_INTERVAL_SECONDS:
+                    self._set(job_id, partial=text)
+                    last_flush = time.monotonic()
+
+            meta = describe() if describe else {}
+            if is_error_response(text):
+                self._set(job_id, status='error', partial=text, error=text, meta=json.dumps(meta), finished_at=time.time())
+            else:
+                self._set(job_id, status='done', partial=text, result=text, meta=json.dumps(meta), finished_at=time.time())
+        except StreamInterrupted as e:
+            # The text streamed so far stays visible as progress but never becomes the result
+            self._set(job_id, status='error', partial=text, error=str(e), finished_at=time.time())
+        except Exception as e:
+            self._set(job_id, status='error', partial=text, error=f"{type(e).__name__}: {e}", finished_at=time.time())
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+                self._cancel_requested.discard(job_id)
+
+    def _is_cancel_requested(self, job_id):
+        with self._lock:
+            return job_id in self._cancel_requested
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns False if it had already finished"""
+        job = self.get(job_id)
+        if job is None or job['status'] not in ACTIVE_STATUSES:
+            return False
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                # Never started, so _run will not clean up after it
+                self._futures.pop(job_id, None)
+                cancelled_now = True
+            else:
+                self._cancel_requested.add(job_id)
+                cancelled_now = future is None
+        if cancelled_now:
+            self._set(job_id, status='cancelled', finished_at=time.time())
+        return True
+
+    @staticmethod
+    def _row_to_job(row):
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['meta'] = json.loads(job['meta']) if job['meta'] else {}
+        return job
+
+    def get(self, job_id):
+        """The job as a dict (status, partial, result, meta, error, ...), or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def jobs_for(self, session_id, debate_id):
+        """All jobs for a debate, oldest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE session_id = ? AND debate_id = ? ORDER BY created_at",
+                (session_id, debate_id)
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def stats(self):
+        """Number of jobs per status, plus worker threads currently busy"""
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        with self._lock:
+            in_flight = len(self._futures)
+        stats = {status: counts.get(status, 0) for status in ACTIVE_STATUSES + FINISHED_STATUSES}
+        stats['in_flight'] = in_flight
+        return stats
+
+    def save_state(self, session_id, debate_id, state):
+        """Snapshot a debate's session state (JSON-serializable dict)"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO debate_states (debate_id, session_id, state, updated_at) VALUES (?, ?, ?, ?)",
+                (debate_id, session_id, json.dumps(state), time.time())
+            )
+
+    def delete_state(self, session_id, debate_id):
+        """Drop a debate's snapshot, e.g. once the debate has been reset"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM debate_states WHERE debate_id = ? AND session_id = ?", (debate_id, session_id))
+
+    def load_state(self, session_id, debate_id):
+        """The latest snapshot of a debate started by this session, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT state FROM debate_states WHERE debate_id = ? AND session_id = ?",
+                (debate_id, session_id)
+            ).fetchone()
+        return json.loads(row['state']) if row else None
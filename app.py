@@ -1,139 +1,167 @@
 import streamlit as st
-import google.generativeai as genai
 from datetime import datetime
 import json
 import time
 import os
-import glob
-import re
-import pandas as pd
+import uuid
+from analysis_jobs import ACTIVE_STATUSES, DEFAULT_MAX_AGE_SECONDS, JobQueue
+from debate_host import DebateHost, parse_streamed_scores
+from debate_state import ScoreTable, compact_round, expand_round, state_bytes
+from llm_metrics import LLMMetrics
+from call_scheduler import get_scheduler
+from model_clients import get_backend, get_registry, model_loader
+from model_routing import get_router
+from response_cache import ResponseCache
+from records_catalog import RecordsCatalog
+from record_store import RecordStore
+from record_archive import RecordArchive
+from leaderboard import Leaderboard
+from record_search import RecordSearchIndex
+from judge_ensemble import JudgeEnsemble
+from score_repair import ScoreRepair
+from score_parser import parse_scores
+from verdict_context import summarize_round
 
 # Configure Gemini API
 def configure_gemini():
-    api_key = st.sidebar.text_input("Enter your Gemini API Key", type="password")
-    if api_key:
-        genai.configure(api_key=api_key)
+    # The local stand-in needs no key (DEBATE_MODEL_BACKEND=fake)
+    if get_backend() == "fake":
+        st.sidebar.info("🧪 Using the local fake model backend")
+        st.session_state.gemini_api_key = "fake"
         return True
-    return False
-
-class DebateHost:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
-        
-    def generate_opening_statement(self, topic):
-        prompt = f"""
-        You are an AI debate host. Generate a professional opening statement for a debate on the topic: "{topic}"
-        
-        Your opening should:
-        1. Welcome participants
-        2. Clearly state the debate topic
-        3. Explain the format (alternating arguments, AI analysis after each round)
-        4. Set ground rules for respectful discourse
-        5. Encourage both parties to present their strongest arguments
-        
-        Keep it concise but authoritative.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating opening statement: {str(e)}"
     
-    def analyze_arguments(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic):
-        prompt = f"""
-        You are an impartial AI debate analyst. Analyze the following debate round objectively:
+    api_key = st.sidebar.text_input("Enter your Gemini API Key", type="password")
+    
+    # Clients are pooled per key across sessions; drop the old ones when this session's key changes
+    previous_key = st.session_state.get('gemini_api_key')
+    if previous_key and previous_key != api_key:
+        get_registry().invalidate(previous_key)
+    st.session_state.gemini_api_key = api_key
+    
+    return bool(api_key)
 
-        Topic: {topic}
-        Round: {round_number}
-        
-        {party1_name}'s Argument:
-        {party1_argument}
-        
-        {party2_name}'s Argument:
-        {party2_argument}
-        
-        Provide an unbiased analysis covering:
-        
-        1. SCORING (Rate each party on these criteria from 0-10):
-           - Argument Strength: Logic, reasoning, and validity of claims
-           - Evidence Quality: Use of facts, data, examples, and sources
-           - Rebuttal Effectiveness: Addressing opponent's points
-           - Clarity & Delivery: Communication quality and structure
-           
-           Format your scores EXACTLY like this at the START of your response:
-           SCORES:
-           {party1_name}: Argument=X, Evidence=X, Rebuttal=X, Clarity=X
-           {party2_name}: Argument=X, Evidence=X, Rebuttal=X, Clarity=X
-           
-        2. DETAILED ANALYSIS (for each party):
-           - Strengths in this round
-           - Weaknesses or areas to improve
-           - Key points made
-           
-        3. ROUND ASSESSMENT:
-           - Which argument was stronger this round and why
-           - Critical moments or turning points
-           - Impact on overall debate trajectory
-        
-        Be fair, constructive, and specific in your feedback.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error analyzing arguments: {str(e)}"
-    
-    def generate_final_verdict(self, debate_history, topic, party1_total_score, party2_total_score):
-        prompt = f"""
-        You are an impartial AI judge concluding a debate on: "{topic}"
-        
-        Here is the complete debate history:
-        {json.dumps(debate_history, indent=2)}
-        
-        FINAL SCORES:
-        Party 1 Total: {party1_total_score} points
-        Party 2 Total: {party2_total_score} points
-        
-        Provide a comprehensive final verdict that includes:
-        
-        1. OVERALL PERFORMANCE SUMMARY:
-           - Strengths and weaknesses of each debater
-           - Quality of arguments throughout the debate
-           - Score breakdown analysis
-           
-        2. KEY MOMENTS:
-           - Most compelling arguments from each side
-           - Critical turning points in the debate
-           - Best rounds for each debater
-           
-        3. FINAL JUDGMENT:
-           - Which side presented the stronger overall case
-           - Reasoning for your decision based on scores and performance
-           - Margin of victory assessment
-           
-        4. CONSTRUCTIVE FEEDBACK:
-           - Areas for improvement for both parties
-           - Positive highlights from the debate
-           - Lessons learned
-        
-        Be thorough, fair, and provide educational value in your analysis.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating final verdict: {str(e)}"
+def get_debate_host():
+    """DebateHost for this session, routing each task to a shared client for its API key"""
+    api_key = st.session_state.gemini_api_key
+    return DebateHost(
+        cache=get_response_cache(),
+        router=get_router(),
+        model_loader=model_loader(api_key),
+        metrics=get_llm_metrics(),
+        scheduler=get_scheduler(),
+        rate_key=api_key,
+        session_id=get_session_id()
+    )
+
+@st.cache_resource
+def get_response_cache():
+    """Process-wide response cache shared by all sessions"""
+    return ResponseCache()
+
+@st.cache_resource
+def get_llm_metrics():
+    """Process-wide model call metrics; set LLM_METRICS_TEXTFILE to also export a Prometheus textfile"""
+    return LLMMetrics(textfile_path=os.environ.get("LLM_METRICS_TEXTFILE"))
+
+@st.cache_resource
+def get_records_catalog():
+    """Process-wide index of the records directory and the record archive"""
+    return RecordsCatalog("records", archive=get_record_archive())
+
+@st.cache_resource
+def get_record_archive():
+    """Process-wide compact archive that every saved record is appended to (see record_archive.py)"""
+    return RecordArchive("archive")
+
+@st.cache_resource
+def get_record_store():
+    """Process-wide writer for the records directory; spilled round text of abandoned debates is expired on creation"""
+    store = RecordStore("records")
+    store.expire_spilled(SPILL_MAX_AGE_SECONDS)
+    return store
+
+@st.cache_resource
+def get_leaderboard():
+    """Process-wide participant ratings, updated as each record is saved and backfilled from the catalog when first opened"""
+    leaderboard = Leaderboard()
+    catalog = get_records_catalog()
+    catalog.refresh()
+    backfill_leaderboard(catalog, leaderboard)
+    return leaderboard
+
+@st.cache_resource
+def get_search_index():
+    """Process-wide full-text index of saved arguments, analyses and verdicts, backfilled from the catalog when first opened"""
+    index = RecordSearchIndex()
+    catalog = get_records_catalog()
+    catalog.refresh()
+    backfill_search_index(catalog, index)
+    return index
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide background queue for analysis and verdict calls"""
+    return JobQueue()
+
+# Session state that makes up a debate, snapshotted so a browser refresh can restore it.
+# Scores live only in the debate_scores ScoreTable and round text in the record store's spill
+# area, so a debate's footprint grows by a few hundred bytes per round however long the text.
+DEBATE_STATE_KEYS = [
+    'debate_started', 'current_round', 'debate_rounds', 'debate_scores', 'opening_statement', 'debate_topic',
+    'party1_name', 'party2_name', 'max_rounds', 'debate_finished',
+    'debate_pending_job', 'debate_verdict', 'debate_verdict_model', 'debate_saved_path', 'debate_finished_at'
+]
+# Round counts offered in setup; long-form debates run for dozens of rounds
+ROUND_OPTIONS = [3, 5, 7]
+LONG_FORM_ROUND_OPTIONS = [12, 24, 36, 48]
+# Rounds listed individually in the history; earlier ones are picked from a list
+HISTORY_ROUNDS_SHOWN = 5
+# Reset debates delete their spilled round text; text of tabs closed without a reset is kept until
+# well after their checkpoints (which expire with the job queue's) can no longer restore them
+SPILL_MAX_AGE_SECONDS = 2 * DEFAULT_MAX_AGE_SECONDS
+
+def get_session_id():
+    """Id for this browser tab, kept in the URL so it survives a refresh"""
+    if 'session' not in st.query_params:
+        st.query_params['session'] = uuid.uuid4().hex
+    return st.query_params['session']
+
+def checkpoint_debate():
+    """Persist the current debate so a refreshed page can pick it up again"""
+    state = {key: st.session_state[key] for key in DEBATE_STATE_KEYS if key in st.session_state}
+    if 'debate_scores' in state:
+        state['debate_scores'] = state['debate_scores'].to_state()
+    get_job_queue().save_state(get_session_id(), st.session_state.debate_id, state)
+
+def restore_debate():
+    """Reload the debate named in the URL into a fresh session"""
+    debate_id = st.query_params.get('debate')
+    if not debate_id or st.session_state.get('debate_id') == debate_id:
+        return
+    state = get_job_queue().load_state(get_session_id(), debate_id)
+    if state:
+        if 'debate_history' in state:
+            # A snapshot taken before scores and round text were compacted
+            history = state.pop('debate_history')
+            state['debate_rounds'] = [compact_round(round_data, get_record_store(), debate_id) for round_data in history]
+            state['debate_scores'] = ScoreTable()
+            for round_data in history:
+                state['debate_scores'].append(round_data['scores'])
+            for key in ('party1_total_score', 'party2_total_score', 'party1_round_scores', 'party2_round_scores'):
+                state.pop(key, None)
+        else:
+            state['debate_scores'] = ScoreTable.from_state(state.get('debate_scores', ""))
+        st.session_state.update(state)
+        st.session_state.debate_id = debate_id
 
 def initialize_session_state():
+    restore_debate()
     if 'debate_started' not in st.session_state:
         st.session_state.debate_started = False
     if 'current_round' not in st.session_state:
         st.session_state.current_round = 1
-    if 'debate_history' not in st.session_state:
-        st.session_state.debate_history = []
+    if 'debate_rounds' not in st.session_state:
+        st.session_state.debate_rounds = []
     if 'opening_statement' not in st.session_state:
         st.session_state.opening_statement = ""
     if 'debate_topic' not in st.session_state:
@@ -146,64 +174,15 @@ def initialize_session_state():
         st.session_state.max_rounds = 3
     if 'debate_finished' not in st.session_state:
         st.session_state.debate_finished = False
-    # Scoring system
-    if 'party1_total_score' not in st.session_state:
-        st.session_state.party1_total_score = 0
-    if 'party2_total_score' not in st.session_state:
-        st.session_state.party2_total_score = 0
-    if 'party1_round_scores' not in st.session_state:
-        st.session_state.party1_round_scores = []
-    if 'party2_round_scores' not in st.session_state:
-        st.session_state.party2_round_scores = []
-
-def parse_scores_from_analysis(analysis_text, party1_name, party2_name):
-    """Extract scores from AI analysis text"""
-    
-    scores = {
-        'party1': {'argument': 0, 'evidence': 0, 'rebuttal': 0, 'clarity': 0, 'total': 0},
-        'party2': {'argument': 0, 'evidence': 0, 'rebuttal': 0, 'clarity': 0, 'total': 0}
-    }
-    
-    try:
-        # Look for SCORES: section
-        if "SCORES:" in analysis_text:
-            scores_section = analysis_text.split("SCORES:")[1].split("\n\n")[0]
-            
-            # Parse party1 scores
-            party1_pattern = rf"{re.escape(party1_name)}[:\s]+Argument[=\s]+(\d+).*?Evidence[=\s]+(\d+).*?Rebuttal[=\s]+(\d+).*?Clarity[=\s]+(\d+)"
-            party1_match = re.search(party1_pattern, scores_section, re.IGNORECASE | re.DOTALL)
-            
-            if party1_match:
-                scores['party1']['argument'] = int(party1_match.group(1))
-                scores['party1']['evidence'] = int(party1_match.group(2))
-                scores['party1']['rebuttal'] = int(party1_match.group(3))
-                scores['party1']['clarity'] = int(party1_match.group(4))
-                scores['party1']['total'] = sum([
-                    scores['party1']['argument'],
-                    scores['party1']['evidence'],
-                    scores['party1']['rebuttal'],
-                    scores['party1']['clarity']
-                ])
-            
-            # Parse party2 scores
-            party2_pattern = rf"{re.escape(party2_name)}[:\s]+Argument[=\s]+(\d+).*?Evidence[=\s]+(\d+).*?Rebuttal[=\s]+(\d+).*?Clarity[=\s]+(\d+)"
-            party2_match = re.search(party2_pattern, scores_section, re.IGNORECASE | re.DOTALL)
-            
-            if party2_match:
-                scores['party2']['argument'] = int(party2_match.group(1))
-                scores['party2']['evidence'] = int(party2_match.group(2))
-                scores['party2']['rebuttal'] = int(party2_match.group(3))
-                scores['party2']['clarity'] = int(party2_match.group(4))
-                scores['party2']['total'] = sum([
-                    scores['party2']['argument'],
-                    scores['party2']['evidence'],
-                    scores['party2']['rebuttal'],
-                    scores['party2']['clarity']
-                ])
-    except Exception as e:
-        st.warning(f"Could not parse scores automatically. Using default values. Error: {str(e)}")
-    
-    return scores
+    # Scoring system: totals and series are derived from this table
+    if 'debate_scores' not in st.session_state:
+        st.session_state.debate_scores = ScoreTable()
+    if 'stream_responses' not in st.session_state:
+        st.session_state.stream_responses = True
+    if 'bypass_cache' not in st.session_state:
+        st.session_state.bypass_cache = False
+    if 'judge_ensemble' not in st.session_state:
+        st.session_state.judge_ensemble = False
 
 def main():
     st.set_page_config(
@@ -219,13 +198,16 @@ def main():
     initialize_session_state()
     
     # Create navigation tabs
-    tab1, tab2 = st.tabs(["🎯 Current Debate", "📚 Records"])
+    tab1, tab2, tab3 = st.tabs(["🎯 Current Debate", "📚 Records", "🏆 Leaderboard"])
     
     with tab1:
         run_debate_tab()
     
     with tab2:
         run_records_tab()
+    
+    with tab3:
+        run_leaderboard_tab()
 
 def run_debate_tab():
     # Sidebar for API configuration and controls
@@ -240,11 +222,49 @@ def run_debate_tab():
         
         st.success("✅ Gemini API configured")
         
+        st.toggle(
+            "⚡ Stream AI responses",
+            key="stream_responses",
+            help="Show analysis and verdict text as it is generated"
+        )
+        st.toggle(
+            "⚖️ Judge ensemble",
+            key="judge_ensemble",
+            help="Score each round with several judges in parallel (DEBATE_JUDGES) and use their median; "
+                 "the analysis appears once the panel agrees"
+        )
+        
+        st.header("🗄️ Response Cache")
+        st.toggle(
+            "Bypass cache",
+            key="bypass_cache",
+            help="Always call the model; fresh responses still refresh the cache"
+        )
+        cache_stats = get_response_cache().stats()
+        cache_col1, cache_col2 = st.columns(2)
+        cache_col1.metric("Hits", cache_stats['hits'])
+        cache_col2.metric("Misses", cache_stats['misses'])
+        st.caption(f"{cache_stats['entries']} entries · {cache_stats['bytes'] / 1024:.0f} KB · {cache_stats['hit_rate']:.0%} hit rate")
+        
+        render_diagnostics_panel()
+        
         st.header("🎮 Debate Controls")
         if st.button("🔄 Reset Debate"):
+            pending_job = st.session_state.get('debate_pending_job')
+            if pending_job:
+                get_job_queue().cancel(pending_job)
+            # The debate's spilled text is its own (a saved debate keeps it in its record); its
+            # checkpoint goes too, so no restored snapshot can point at the discarded text
+            rounds = st.session_state.get('debate_rounds')
+            if rounds:
+                get_record_store().discard_spilled(record['text'] for record in rounds)
+            if st.session_state.get('debate_id'):
+                get_job_queue().delete_state(get_session_id(), st.session_state.debate_id)
             for key in list(st.session_state.keys()):
                 if key.startswith('debate') or key in ['current_round', 'max_rounds', 'opening_statement', 'party1_name', 'party2_name']:
                     del st.session_state[key]
+            if 'debate' in st.query_params:
+                del st.query_params['debate']
             st.rerun()
     
     # Main application
@@ -253,129 +273,364 @@ def run_debate_tab():
     else:
         run_debate()
 
+@st.fragment
+def render_diagnostics_panel():
+    """Latency, token and error metrics for recent model calls, built only while the panel is switched on"""
+    # Off by default, so pandas (and the tables below) stay off the rerun path until someone looks
+    if not st.toggle("🩺 Diagnostics", key="show_diagnostics"):
+        return
+    import pandas as pd
+    
+    metrics = get_llm_metrics()
+    with st.container(border=True):
+        st.caption("Model routing")
+        st.dataframe(pd.DataFrame(get_router().status()).set_index('task'), use_container_width=True)
+        
+        job_stats = get_job_queue().stats()
+        st.caption(f"Background jobs: {job_stats['running']} running · {job_stats['queued']} queued · "
+                   f"{job_stats['done']} done · {job_stats['error']} failed · {job_stats['cancelled']} cancelled")
+        
+        render_session_memory()
+        
+        scheduler_stats = get_scheduler().stats()
+        st.caption(f"Rate limiter: {scheduler_stats['queued']} waiting · {scheduler_stats['quota_errors']} quota errors · " + " · ".join(
+            f"{priority} {stats['granted']} sent, p95 wait {stats['p95_wait_s'] or 0:.1f}s (max queue {stats['max_depth']})"
+            for priority, stats in scheduler_stats['priorities'].items() if stats['granted'] or stats['depth']
+        ))
+        
+        if get_backend() != "fake":
+            registry_stats = get_registry().stats()
+            st.caption(f"Debate contexts: {registry_stats['contexts_created']} registered "
+                       f"({registry_stats['contexts_explicit']} as cached content) · {registry_stats['contexts_reused']} reused")
+        
+        summary = metrics.summary()
+        if not summary:
+            st.caption("No model calls yet")
+            return
+        
+        st.dataframe(pd.DataFrame(summary).set_index('method'), use_container_width=True)
+        
+        recent = metrics.recent_calls()[-20:]
+        st.caption("Most recent calls")
+        st.dataframe(
+            pd.DataFrame(recent)[['timestamp', 'method', 'model', 'status', 'error_class', 'cache', 'context',
+                                  'queue_wait', 'wall_time', 'time_to_first_byte', 'prompt_chars', 'prompt_tokens', 'cached_tokens',
+                                  'response_tokens']],
+            use_container_width=True
+        )
+        
+        st.download_button(
+            label="📥 Prometheus metrics",
+            data=metrics.render_prometheus(),
+            file_name="debate_llm_metrics.prom",
+            mime="text/plain"
+        )
+        st.download_button(
+            label="📥 Recent calls (JSONL)",
+            data="".join(json.dumps(call) + "\n" for call in metrics.recent_calls()),
+            file_name="llm_calls.jsonl",
+            mime="application/x-ndjson"
+        )
+
+def render_session_memory():
+    """How much this session keeps in st.session_state, and how much round text it has spilled to disk"""
+    sizes = state_bytes({key: st.session_state[key] for key in st.session_state.keys()})
+    rounds = st.session_state.get('debate_rounds', [])
+    largest = " · ".join(f"{key} {size / 1024:.1f} KB" for key, size in list(sizes.items())[:3])
+    st.caption(f"This session: {sum(sizes.values()) / 1024:.1f} KB in session state ({largest}) · "
+               f"{len(rounds)} rounds, {sum(record['spilled_bytes'] for record in rounds) / 1024:.1f} KB of text spilled to disk")
+
+RECORD_SORT_OPTIONS = {
+    "Newest first": 'newest',
+    "Oldest first": 'oldest',
+    "Highest score": 'highest_score',
+    "Lowest score": 'lowest_score',
+    "Topic (A-Z)": 'topic'
+}
+
+# Filtering and paging records reruns only this tab, not the debate page
+@st.fragment
 def run_records_tab():
     st.header("📚 Debate Records")
     
-    # Ensure records directory exists
-    records_dir = "records"
-    if not os.path.exists(records_dir):
-        os.makedirs(records_dir)
+    catalog = refresh_records_catalog()
+    
+    search_query = st.text_input(
+        "🔎 Search arguments, analyses and verdicts",
+        key="records_search",
+        placeholder="e.g. nuclear waste rebuttal"
+    )
+    if search_query.strip():
+        render_search_results(search_query)
+        return
+    
+    # Filters and sorting
+    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
+    with filter_col1:
+        topic_filter = st.text_input("Topic contains", key="records_topic_filter")
+    with filter_col2:
+        participant_filter = st.text_input("Participant", key="records_participant_filter")
+    with filter_col3:
+        date_range = st.date_input("Date range", value=(), key="records_date_filter")
+    with filter_col4:
+        min_score = st.number_input("Min. winning score", min_value=0, value=0, step=5, key="records_min_score")
+    
+    sort_col, size_col, page_col = st.columns([2, 1, 1])
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(RECORD_SORT_OPTIONS), key="records_sort")
+    with size_col:
+        page_size = st.selectbox("Per page", [10, 25, 50], key="records_page_size")
+    
+    date_from = date_range[0] if len(date_range) > 0 else None
+    date_to = date_range[1] if len(date_range) > 1 else None
+    filters = dict(
+        topic=topic_filter.strip() or None,
+        participant=participant_filter.strip() or None,
+        date_from=date_from,
+        date_to=date_to,
+        min_score=min_score or None,
+        sort=RECORD_SORT_OPTIONS[sort_label]
+    )
     
-    # Get all JSON files in records directory
-    json_files = glob.glob(os.path.join(records_dir, "*.json"))
-    json_files.sort(reverse=True)  # Most recent first
+    # Start from the first page whenever the filters or sort order change
+    filter_signature = (tuple(filters.items()), page_size)
+    if st.session_state.get('records_filter_signature') != filter_signature:
+        st.session_state.records_filter_signature = filter_signature
+        st.session_state.records_page = 1
     
-    if not json_files:
+    _, total = catalog.query_records(limit=0, **filters)
+    if not total:
         st.info("No debate records found. Complete a debate to see records here!")
         return
     
-    st.subheader(f"Found {len(json_files)} debate record(s)")
+    page_count = (total + page_size - 1) // page_size
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=page_count, key="records_page")
     
-    # Display records
-    for file_path in json_files:
-        try:
-            with open(file_path, 'r') as f:
-                debate_data = json.load(f)
-            
-            filename = os.path.basename(file_path)
+    records, _ = catalog.query_records(limit=page_size, offset=(page - 1) * page_size, **filters)
+    
+    st.subheader(f"Found {total} debate record(s)")
+    st.caption(f"Page {page} of {page_count}")
+    
+    # Display records; full record files are only read on request
+    for record in records:
+        filename = record['filename']
+        
+        if record['error']:
+            st.error(f"Error loading {filename}: {record['error']}")
+            continue
+        
+        with st.expander(f"📋 {record['topic'] or 'Unknown Topic'} - {filename}"):
+            col1, col2 = st.columns(2)
             
-            with st.expander(f"📋 {debate_data.get('topic', 'Unknown Topic')} - {filename}"):
-                col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"**Topic:** {record['topic'] or 'N/A'}")
+                st.write(f"**Participants:** {', '.join(record['participants'])}")
+                st.write(f"**Rounds:** {record['rounds'] if record['rounds'] is not None else 'N/A'}")
                 
-                with col1:
-                    st.write(f"**Topic:** {debate_data.get('topic', 'N/A')}")
-                    st.write(f"**Participants:** {', '.join(debate_data.get('participants', []))}")
-                    st.write(f"**Rounds:** {debate_data.get('rounds', 'N/A')}")
+                # Display final scores if available
+                if record['final_scores'] is not None:
+                    st.write("**Final Scores:**")
+                    for participant, score in record['final_scores'].items():
+                        st.write(f"  • {participant}: {score} points")
+                
+                # Format timestamp if available
+                if record['timestamp']:
+                    try:
+                        dt = datetime.fromisoformat(record['timestamp'])
+                        formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
+                        st.write(f"**Date:** {formatted_time}")
+                    except:
+                        st.write(f"**Date:** {record['timestamp']}")
+            
+            with col2:
+                # The download payload is only read once requested
+                if st.button("💾 Prepare Download", key=f"prepare_download_{filename}"):
+                    st.session_state[f"download_ready_{filename}"] = True
+                if st.session_state.get(f"download_ready_{filename}"):
+                    try:
+                        payload = json.dumps(read_record(record), indent=2)
+                        st.download_button(
+                            label="💾 Download JSON",
+                            data=payload,
+                            file_name=filename,
+                            mime="application/json",
+                            key=f"download_{filename}"
+                        )
+                    except Exception as e:
+                        st.error(f"Error loading {filename}: {str(e)}")
+            
+            if st.toggle("📖 Show rounds & verdict", key=f"show_details_{filename}"):
+                render_record_details(record)
+
+def refresh_records_catalog():
+    """The records catalog, brought up to date; records it newly lists are added to the search index and leaderboard"""
+    # The catalog only re-reads record files that changed since the last rerun
+    catalog = get_records_catalog()
+    if catalog.refresh():
+        backfill_search_index(catalog, get_search_index())
+        backfill_leaderboard(catalog, get_leaderboard())
+    return catalog
+
+def backfill_leaderboard(catalog, leaderboard):
+    """Rate records saved outside this app (or before the leaderboard existed), oldest first"""
+    applied = leaderboard.applied_ids()
+    missing = [record for record in reversed(catalog.list_records()) if record['filename'] not in applied and not record['error']]
+    for record_id, debate_data in load_records(missing):
+        leaderboard.apply_record(record_id, debate_data)
+
+def backfill_search_index(catalog, index):
+    """Index records saved outside this app (or before the index existed), and forget deleted ones"""
+    records = {record['filename']: record for record in catalog.list_records() if not record['error']}
+    known = index.known_ids()
+    missing = [record for filename, record in records.items() if filename not in known]
+    indexed = set()
+    for record_id, debate_data in load_records(missing):
+        index.index_record(record_id, debate_data)
+        indexed.add(record_id)
+    index.mark_unreadable({record['filename'] for record in missing} - indexed)
+    index.remove_records(known - set(records))
+
+def render_search_results(query):
+    """Ranked rounds and verdicts matching the query, with highlighted snippets; a single index query"""
+    hits = get_search_index().search(query, limit=25)
+    if not hits:
+        st.info("No rounds or verdicts match your search.")
+        return
+    
+    st.subheader(f"Top {len(hits)} match(es)")
+    for hit in hits:
+        location = f"Round {hit['round']}" if hit['round'] is not None else "Final verdict"
+        st.markdown(f"**{hit['topic'] or 'Unknown Topic'}** · {location} · `{hit['record_id']}`")
+        st.markdown("> " + " ".join(hit['snippet'].split()))
+
+def render_record_details(record):
+    """Load a saved record and render its rounds, analyses and final verdict"""
+    try:
+        debate_data = read_record(record)
+    except Exception as e:
+        st.error(f"Error loading {record['filename']}: {str(e)}")
+        return
+    
+    # Show debate history
+    if 'history' in debate_data and debate_data['history']:
+        st.subheader("🗣️ Debate Rounds")
+        for round_data in debate_data['history']:
+            round_num = round_data.get('round', 'Unknown')
+            # Expanders cannot be nested inside the record's expander
+            with st.container():
+                st.markdown(f"#### Round {round_num}")
+                # Display scores if available
+                if 'scores' in round_data:
+                    score_col1, score_col2 = st.columns(2)
+                    with score_col1:
+                        party1_scores = round_data['scores']['party1']
+                        st.markdown(f"**{round_data.get('party1_name', 'Party 1')} - Score: {party1_scores['total']}/40**")
+                        st.caption(f"Arg: {party1_scores['argument']} | Ev: {party1_scores['evidence']} | Reb: {party1_scores['rebuttal']} | Cl: {party1_scores['clarity']}")
                     
-                    # Display final scores if available
-                    if 'final_scores' in debate_data:
-                        st.write("**Final Scores:**")
-                        for participant, score in debate_data['final_scores'].items():
-                            st.write(f"  • {participant}: {score} points")
+                    with score_col2:
+                        party2_scores = round_data['scores']['party2']
+                        st.markdown(f"**{round_data.get('party2_name', 'Party 2')} - Score: {party2_scores['total']}/40**")
+                        st.caption(f"Arg: {party2_scores['argument']} | Ev: {party2_scores['evidence']} | Reb: {party2_scores['rebuttal']} | Cl: {party2_scores['clarity']}")
                     
-                    # Format timestamp if available
-                    if 'timestamp' in debate_data:
-                        try:
-                            dt = datetime.fromisoformat(debate_data['timestamp'])
-                            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-                            st.write(f"**Date:** {formatted_time}")
-                        except:
-                            st.write(f"**Date:** {debate_data['timestamp']}")
+                    st.divider()
                 
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(f"**{round_data.get('party1_name', 'Party 1')}:**")
+                    st.write(round_data.get('party1_argument', 'No argument recorded'))
                 with col2:
-                    # Download button for individual record
-                    st.download_button(
-                        label="💾 Download JSON",
-                        data=json.dumps(debate_data, indent=2),
-                        file_name=filename,
-                        mime="application/json",
-                        key=f"download_{filename}"
-                    )
+                    st.markdown(f"**{round_data.get('party2_name', 'Party 2')}:**")
+                    st.write(round_data.get('party2_argument', 'No argument recorded'))
                 
-                # Show debate history
-                if 'history' in debate_data and debate_data['history']:
-                    st.subheader("🗣️ Debate Rounds")
-                    for round_data in debate_data['history']:
-                        round_num = round_data.get('round', 'Unknown')
-                        with st.expander(f"Round {round_num}", expanded=False):
-                            # Display scores if available
-                            if 'scores' in round_data:
-                                score_col1, score_col2 = st.columns(2)
-                                with score_col1:
-                                    party1_scores = round_data['scores']['party1']
-                                    st.markdown(f"**{round_data.get('party1_name', 'Party 1')} - Score: {party1_scores['total']}/40**")
-                                    st.caption(f"Arg: {party1_scores['argument']} | Ev: {party1_scores['evidence']} | Reb: {party1_scores['rebuttal']} | Cl: {party1_scores['clarity']}")
-                                
-                                with score_col2:
-                                    party2_scores = round_data['scores']['party2']
-                                    st.markdown(f"**{round_data.get('party2_name', 'Party 2')} - Score: {party2_scores['total']}/40**")
-                                    st.caption(f"Arg: {party2_scores['argument']} | Ev: {party2_scores['evidence']} | Reb: {party2_scores['rebuttal']} | Cl: {party2_scores['clarity']}")
-                                
-                                st.divider()
-                            
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.markdown(f"**{round_data.get('party1_name', 'Party 1')}:**")
-                                st.write(round_data.get('party1_argument', 'No argument recorded'))
-                            with col2:
-                                st.markdown(f"**{round_data.get('party2_name', 'Party 2')}:**")
-                                st.write(round_data.get('party2_argument', 'No argument recorded'))
-                            
-                            if 'analysis' in round_data:
-                                st.markdown("**🤖 AI Analysis:**")
-                                st.write(round_data['analysis'])
-                
-                # Show final verdict
-                if 'final_verdict' in debate_data:
-                    with st.expander("🏆 Final Verdict", expanded=False):
-                        st.write(debate_data['final_verdict'])
+                if 'analysis' in round_data:
+                    st.markdown("**🤖 AI Analysis:**")
+                    st.write(round_data['analysis'])
+                    if round_data.get('model'):
+                        st.caption(f"Scored by {round_data['model']}")
                 
                 st.divider()
-        
-        except Exception as e:
-            st.error(f"Error loading {filename}: {str(e)}")
+    
+    # Show final verdict
+    if 'final_verdict' in debate_data:
+        st.subheader("🏆 Final Verdict")
+        st.write(debate_data['final_verdict'])
+
+def read_record(record):
+    """A catalog entry's debate data: from its record file, or from the archive once the file is gone"""
+    try:
+        with open(record['path'], 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        debate_data = get_record_archive().get_by_filename(record['filename'])
+        if debate_data is None:
+            raise
+        return debate_data
+
+def load_records(records):
+    """(record id, debate data) for catalog entries that can be read"""
+    for record in records:
+        try:
+            yield record['filename'], read_record(record)
+        except (OSError, ValueError):
+            continue
+
+@st.fragment
+def run_leaderboard_tab():
+    st.header("🏆 Participant Leaderboard")
+    
+    # Records saved outside this app are rated when the catalog picks them up, not on every rerun
+    catalog = refresh_records_catalog()
+    leaderboard = get_leaderboard()
+    
+    min_debates = st.slider("Minimum debates", min_value=1, max_value=10, value=1)
+    standings = leaderboard.standings(min_debates=min_debates)
+    if not standings:
+        st.info("No rated debates yet. Finish a debate to see participant ratings here.")
+    else:
+        import pandas as pd
+        st.dataframe(
+            pd.DataFrame(standings),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'participant': "Participant",
+                'rating': st.column_config.NumberColumn("Elo", format="%d"),
+                'avg_argument': "Avg Argument",
+                'avg_evidence': "Avg Evidence",
+                'avg_rebuttal': "Avg Rebuttal",
+                'avg_clarity': "Avg Clarity",
+                'last_played': "Last Played"
+            }
+        )
+        st.caption("Elo ratings start at 1500 and are updated in the order debates were saved; averages are per round.")
+    
+    if st.button("🔁 Rebuild ratings from all records"):
+        with st.spinner("Recomputing ratings..."):
+            rated = leaderboard.rebuild(load_records(reversed(catalog.list_records())))
+        st.toast(f"Rebuilt ratings from {rated} debate(s)")
+        st.rerun(scope="fragment")
 
 def save_debate_to_records(debate_data):
-    """Save debate data to records directory as JSON file"""
+    """Save debate data to the records directory under a unique id"""
     try:
-        # Ensure records directory exists
-        records_dir = "records"
-        if not os.path.exists(records_dir):
-            os.makedirs(records_dir)
+        # Written atomically into a date-sharded directory and listed in the manifest
+        record_id, filepath = get_record_store().save(debate_data)
+        filename = os.path.basename(filepath)
         
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"debate_{timestamp}.json"
-        filepath = os.path.join(records_dir, filename)
-        
-        # Save to file
-        with open(filepath, 'w') as f:
-            json.dump(debate_data, f, indent=2)
-        
-        return filepath
+        get_records_catalog().index_file(filepath)
+        get_leaderboard().apply_record(filename, debate_data)
+        get_search_index().index_record(filename, debate_data)
     except Exception as e:
         st.error(f"Error saving debate record: {str(e)}")
         return None
+    
+    # The archive copy lets the record file be removed later without losing the debate
+    try:
+        get_record_archive().append_record(record_id, {'record_id': record_id, **debate_data}, filename)
+    except Exception as e:
+        st.warning(f"The debate was saved but could not be added to the archive: {str(e)}")
+    return filepath
 
 def setup_debate():
     st.header("🚀 Setup New Debate")
@@ -390,7 +645,8 @@ def setup_debate():
     with col2:
         st.subheader("📋 Debate Settings")
         debate_topic = st.text_input("Debate Topic", placeholder="e.g., Should AI replace human teachers?")
-        max_rounds = st.selectbox("Number of Rounds", [3, 5, 7], index=0)
+        long_form = st.toggle("📜 Long-form debate", help="Dozens of rounds; earlier rounds are kept on disk, not in memory")
+        max_rounds = st.selectbox("Number of Rounds", LONG_FORM_ROUND_OPTIONS if long_form else ROUND_OPTIONS, index=0)
     
     st.subheader("📝 Instructions")
     st.info("""
@@ -409,219 +665,425 @@ def setup_debate():
             st.session_state.debate_topic = debate_topic
             st.session_state.max_rounds = max_rounds
             st.session_state.debate_started = True
+            st.session_state.debate_id = uuid.uuid4().hex
+            st.query_params['debate'] = st.session_state.debate_id
             
             # Generate opening statement
-            host = DebateHost()
+            host = get_debate_host()
             with st.spinner("AI Host preparing opening statement..."):
-                opening = host.generate_opening_statement(debate_topic)
+                opening = host.generate_opening_statement(
+                    debate_topic,
+                    bypass_cache=st.session_state.bypass_cache
+                )
                 st.session_state.opening_statement = opening
             
+            checkpoint_debate()
             st.rerun()
         else:
             st.error("Please fill in all fields before starting the debate!")
 
-def run_debate():
-    host = DebateHost()
-    
-    # Display opening statement
-    if st.session_state.opening_statement:
-        st.header("🎤 AI Host Opening Statement")
-        st.info(st.session_state.opening_statement)
-        st.divider()
-    
-    # Display current debate info and scores
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Topic", st.session_state.debate_topic)
-    with col2:
-        st.metric("Current Round", f"{st.session_state.current_round}/{st.session_state.max_rounds}")
-    with col3:
-        progress = st.session_state.current_round / st.session_state.max_rounds
-        st.metric("Progress", f"{progress:.0%}")
+def render_live_scoreboard():
+    """Render the live scoreboard with totals and the latest round's breakdown"""
+    scores = st.session_state.debate_scores
+    totals = scores.totals()
+    party1_total = totals['party1']
+    party2_total = totals['party2']
+    latest = scores.round_scores(len(scores) - 1) if len(scores) else None
+    party1_latest = latest['party1'] if latest else None
+    party2_latest = latest['party2'] if latest else None
     
-    # Display live scoreboard
-    st.header("📊 Live Scoreboard")
     score_col1, score_col2, score_col3 = st.columns([2, 2, 1])
     
     with score_col1:
         st.subheader(f"🔵 {st.session_state.party1_name}")
-        st.metric("Total Score", f"{st.session_state.party1_total_score} pts", 
-                  delta=st.session_state.party1_round_scores[-1]['total'] if st.session_state.party1_round_scores else None)
+        st.metric("Total Score", f"{party1_total} pts", 
+                  delta=party1_latest['total'] if party1_latest else None)
         
-        if st.session_state.party1_round_scores:
-            latest = st.session_state.party1_round_scores[-1]
+        if party1_latest:
             cols = st.columns(4)
-            cols[0].metric("Argument", latest['argument'], delta_color="off")
-            cols[1].metric("Evidence", latest['evidence'], delta_color="off")
-            cols[2].metric("Rebuttal", latest['rebuttal'], delta_color="off")
-            cols[3].metric("Clarity", latest['clarity'], delta_color="off")
+            cols[0].metric("Argument", party1_latest['argument'], delta_color="off")
+            cols[1].metric("Evidence", party1_latest['evidence'], delta_color="off")
+            cols[2].metric("Rebuttal", party1_latest['rebuttal'], delta_color="off")
+            cols[3].metric("Clarity", party1_latest['clarity'], delta_color="off")
     
     with score_col2:
         st.subheader(f"🔴 {st.session_state.party2_name}")
-        st.metric("Total Score", f"{st.session_state.party2_total_score} pts",
-                  delta=st.session_state.party2_round_scores[-1]['total'] if st.session_state.party2_round_scores else None)
+        st.metric("Total Score", f"{party2_total} pts",
+                  delta=party2_latest['total'] if party2_latest else None)
         
-        if st.session_state.party2_round_scores:
-            latest = st.session_state.party2_round_scores[-1]
+        if party2_latest:
             cols = st.columns(4)
-            cols[0].metric("Argument", latest['argument'], delta_color="off")
-            cols[1].metric("Evidence", latest['evidence'], delta_color="off")
-            cols[2].metric("Rebuttal", latest['rebuttal'], delta_color="off")
-            cols[3].metric("Clarity", latest['clarity'], delta_color="off")
+            cols[0].metric("Argument", party2_latest['argument'], delta_color="off")
+            cols[1].metric("Evidence", party2_latest['evidence'], delta_color="off")
+            cols[2].metric("Rebuttal", party2_latest['rebuttal'], delta_color="off")
+            cols[3].metric("Clarity", party2_latest['clarity'], delta_color="off")
     
     with score_col3:
         st.subheader("Lead")
-        score_diff = st.session_state.party1_total_score - st.session_state.party2_total_score
+        score_diff = party1_total - party2_total
         if score_diff > 0:
             st.success(f"🔵 +{score_diff}")
         elif score_diff < 0:
             st.error(f"🔴 +{abs(score_diff)}")
         else:
             st.info("Tied")
+
+def submit_host_job(kind, stream, args, payload=None, ensemble=False):
+    """Run a DebateHost stream_* call for this debate on the background job queue.
+    
+    With ensemble, the round is scored by a JudgeEnsemble instead of a single analysis call;
+    otherwise analyses whose scores do not parse are repaired by ScoreRepair.
+    """
+    host = get_debate_host()
+    bypass_cache = st.session_state.bypass_cache
+    if ensemble:
+        panel = JudgeEnsemble(host)
+        chunks = lambda: panel.stream_analysis(*args, bypass_cache=bypass_cache)
+        describe = lambda: {'model': (panel.last_result or {}).get('model'), 'ensemble': panel.summary()}
+    elif stream == 'stream_analysis':
+        repair = ScoreRepair(host)
+        chunks = lambda: repair.stream_analysis(*args, bypass_cache=bypass_cache)
+        describe = lambda: {'model': host.last_model(kind), 'score_check': repair.summary()}
+    else:
+        chunks = lambda: getattr(host, stream)(*args, bypass_cache=bypass_cache)
+        describe = lambda: {'model': host.last_model(kind)}
+    return get_job_queue().submit(
+        get_session_id(),
+        st.session_state.debate_id,
+        kind,
+        chunks,
+        payload=payload,
+        describe=describe
+    )
+
+def record_round(payload, analysis, model, ensemble=None, score_check=None):
+    """Score a finished analysis and append it to the debate as the current round.
+    
+    ensemble is a JudgeEnsemble summary whose aggregated scores replace the analysis' own;
+    score_check is a ScoreRepair summary with the (possibly repaired) scores and parse status.
+    """
+    # A result that was already applied (e.g. before a refresh) must not be counted twice
+    if payload['round'] != st.session_state.current_round:
+        return
+    
+    if ensemble and ensemble['scores']:
+        issues = [] if ensemble['quorum_met'] else [f"only {ensemble['valid']} of {ensemble['judges']} judges returned scores"]
+        score_parse = {
+            'status': 'ok' if ensemble['quorum_met'] else 'partial',
+            'confidence': ensemble['confidence'],
+            'issues': issues,
+            'scores': ensemble['scores']
+        }
+    elif score_check:
+        score_parse = score_check
+        # A re-analysis replaces the analysis whose scores could not be read
+        analysis = score_check.get('analysis', analysis)
+    else:
+        # Parse scores from the complete analysis
+        score_parse = parse_scores(
+            analysis,
+            st.session_state.party1_name,
+            st.session_state.party2_name
+        )
+    scores = score_parse['scores']
+    
+    # Store round data
+    round_data = {
+        'round': payload['round'],
+        'party1_name': st.session_state.party1_name,
+        'party1_argument': payload['party1_argument'],
+        'party2_name': st.session_state.party2_name,
+        'party2_argument': payload['party2_argument'],
+        'analysis': analysis,
+        'model': model,
+        'scores': scores,
+        'score_parse': {
+            'status': score_parse['status'],
+            'confidence': score_parse['confidence'],
+            'issues': score_parse['issues'],
+            'repair': score_parse.get('repair'),
+            'repair_model': score_parse.get('repair_model')
+        },
+        'timestamp': datetime.now().isoformat()
+    }
+    if ensemble:
+        round_data['ensemble'] = ensemble
+    round_data['summary'] = summarize_round(round_data)
+    
+    # Only the scores and a handle to the spilled text stay in session state
+    try:
+        record = compact_round(round_data, get_record_store(), st.session_state.debate_id)
+    except OSError as e:
+        st.session_state.debate_job_error = f"The round could not be stored: {e}\n\nPlease try again."
+        return
+    st.session_state.debate_scores.append(scores)
+    st.session_state.debate_rounds.append(record)
+    
+    # Check if this was the last round
+    if st.session_state.current_round >= st.session_state.max_rounds:
+        st.session_state.debate_finished = True
+    else:
+        st.session_state.current_round += 1
+
+def get_debate_history():
+    """Every recorded round in full, its text read back from the record store"""
+    scores = st.session_state.debate_scores
+    return [
+        expand_round(record, scores.round_scores(index), st.session_state.party1_name, st.session_state.party2_name, get_record_store())
+        for index, record in enumerate(st.session_state.debate_rounds)
+    ]
+
+def build_debate_export():
+    """The finished debate in the format saved to records and offered for download"""
+    scores = st.session_state.debate_scores
+    totals = scores.totals()
+    return {
+        'topic': st.session_state.debate_topic,
+        'participants': [st.session_state.party1_name, st.session_state.party2_name],
+        'rounds': len(st.session_state.debate_rounds),
+        'final_scores': {
+            st.session_state.party1_name: totals['party1'],
+            st.session_state.party2_name: totals['party2']
+        },
+        'round_scores': {
+            st.session_state.party1_name: scores.party_rounds('party1'),
+            st.session_state.party2_name: scores.party_rounds('party2')
+        },
+        'history': get_debate_history(),
+        'final_verdict': st.session_state.debate_verdict,
+        'verdict_model': st.session_state.get('debate_verdict_model'),
+        'timestamp': st.session_state.debate_finished_at
+    }
+
+def complete_debate(final_verdict, model):
+    """Store the final verdict and automatically save the debate to the records directory"""
+    st.session_state.debate_verdict = final_verdict
+    st.session_state.debate_verdict_model = model
+    st.session_state.debate_finished_at = datetime.now().isoformat()
+    st.session_state.debate_saved_path = save_debate_to_records(build_debate_export())
+
+@st.fragment(run_every=1.0)
+def render_job_progress():
+    """Poll this debate's background job, showing its progress until it finishes"""
+    job_id = st.session_state.get('debate_pending_job')
+    job = get_job_queue().get(job_id) if job_id else None
+    
+    if job is not None and job['status'] in ACTIVE_STATUSES:
+        label = "AI analyzing arguments..." if job['kind'] == 'analysis' else "AI Judge preparing final verdict..."
+        elapsed = time.time() - (job['started_at'] or job['created_at'])
+        status_col, cancel_col = st.columns([4, 1])
+        status_col.info(f"⏳ {label} ({job['status']}, {elapsed:.0f}s)")
+        if cancel_col.button("✖️ Cancel", key=f"cancel_{job_id}"):
+            get_job_queue().cancel(job_id)
+        
+        if st.session_state.stream_responses and job['partial']:
+            if job['kind'] == 'analysis':
+                # Show provisional round scores as soon as the SCORES: block is complete
+                scores = parse_streamed_scores(job['partial'], st.session_state.party1_name, st.session_state.party2_name)
+                if scores:
+                    st.caption(f"⏳ Round {st.session_state.current_round} scores are in — "
+                               f"{st.session_state.party1_name}: {scores['party1']['total']} · "
+                               f"{st.session_state.party2_name}: {scores['party2']['total']} — analysis still streaming...")
+            st.markdown(job['partial'] + "▌")
+        return
+    
+    # Finished (or gone): apply the outcome to the debate and rerun the whole page
+    st.session_state.debate_pending_job = None
+    if job is None:
+        st.session_state.debate_job_error = "The background job could not be found — please try again."
+    elif job['status'] == 'done' and job['kind'] == 'analysis':
+        record_round(job['payload'], job['result'], job['meta'].get('model'), job['meta'].get('ensemble'), job['meta'].get('score_check'))
+    elif job['status'] == 'done':
+        complete_debate(job['result'], job['meta'].get('model'))
+    elif job['status'] == 'error' and job['kind'] == 'analysis':
+        # A failed call must not be recorded as a zero-scored round
+        st.session_state.debate_job_error = f"{job['error']}\n\nThe round was not recorded — please try again."
+    elif job['status'] == 'error':
+        st.session_state.debate_job_error = "The final verdict could not be generated, so the debate was not saved — please try again."
+    checkpoint_debate()
+    st.rerun()
+
+def get_score_progression():
+    """Chart frame of cumulative totals per round, built from the score table on each render so no frame is kept in session state"""
+    # pandas is imported on first use so it stays off the cold-start path
+    import pandas as pd
+    scores = st.session_state.debate_scores
+    return pd.DataFrame(
+        {
+            st.session_state.party1_name: scores.cumulative('party1'),
+            st.session_state.party2_name: scores.cumulative('party2')
+        },
+        index=pd.Index(range(1, len(scores) + 1), name='Round')
+    )
+
+@st.fragment
+def render_round_input():
+    """Argument entry for the current round; typing reruns only this fragment, not the whole page"""
+    st.header(f"⚔️ Round {st.session_state.current_round}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader(f"🗣️ {st.session_state.party1_name}")
+        party1_argument = st.text_area(
+            f"{st.session_state.party1_name}'s Argument",
+            height=150,
+            placeholder="Present your argument here..."
+        )
+    
+    with col2:
+        st.subheader(f"🗣️ {st.session_state.party2_name}")
+        party2_argument = st.text_area(
+            f"{st.session_state.party2_name}'s Argument",
+            height=150,
+            placeholder="Present your argument here..."
+        )
+    
+    pending_job = st.session_state.get('debate_pending_job')
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        analyze_clicked = st.button("📊 Analyze This Round", type="primary", disabled=bool(pending_job))
+    
+    with col2:
+        if st.session_state.current_round > 1:
+            if st.button("🏁 End Debate Early", disabled=bool(pending_job)):
+                st.session_state.debate_finished = True
+                checkpoint_debate()
+                st.rerun()
+    
+    if analyze_clicked:
+        if party1_argument.strip() and party2_argument.strip():
+            analysis_args = (
+                st.session_state.party1_name,
+                party1_argument,
+                st.session_state.party2_name,
+                party2_argument,
+                st.session_state.current_round,
+                st.session_state.debate_topic
+            )
+            # The analysis runs on a worker thread; the page polls it and records the round when it completes
+            st.session_state.debate_pending_job = submit_host_job(
+                'analysis',
+                'stream_analysis',
+                analysis_args,
+                payload={
+                    'round': st.session_state.current_round,
+                    'party1_argument': party1_argument,
+                    'party2_argument': party2_argument
+                },
+                ensemble=st.session_state.judge_ensemble
+            )
+            checkpoint_debate()
+            st.rerun()
+        else:
+            st.error("Both parties must provide arguments before analysis!")
+
+def render_round_details(index):
+    """Scores, arguments and analysis of one recorded round, its text read back from the record store"""
+    record = st.session_state.debate_rounds[index]
+    scores = st.session_state.debate_scores.round_scores(index)
+    names = {'party1': st.session_state.party1_name, 'party2': st.session_state.party2_name}
+    
+    # Flag rounds whose scores could not be read cleanly from the analysis
+    score_parse = record.get('score_parse')
+    if score_parse and score_parse['status'] != 'ok':
+        st.warning(f"⚠️ Scores parsed with status '{score_parse['status']}' "
+                   f"(confidence {score_parse['confidence']:.0%}): {'; '.join(score_parse['issues'])}")
+    elif score_parse and score_parse.get('repair'):
+        how = "read back from the analysis" if score_parse['repair'] == 'extracted' else "from a second analysis"
+        st.caption(f"🔧 The SCORES block did not parse; scores were {how} by {score_parse['repair_model']} "
+                   f"(confidence {score_parse['confidence']:.0%})")
+    ensemble = record.get('ensemble')
+    if ensemble:
+        st.caption(f"⚖️ {ensemble['valid']}/{ensemble['judges']} judges · {ensemble['aggregate'].replace('_', ' ')} · "
+                   f"max spread {ensemble['max_spread']} pts · confidence {ensemble['confidence']:.0%} · "
+                   f"{'quorum met' if ensemble['quorum_met'] else 'no quorum'}{' · stopped early' if ensemble['early_stop'] else ''}")
+    
+    score_col1, score_col2 = st.columns(2)
+    for column, party, marker in ((score_col1, 'party1', "🔵"), (score_col2, 'party2', "🔴")):
+        with column:
+            st.markdown(f"**{marker} {names[party]} - Round Score: {scores[party]['total']}/40**")
+            st.caption(f"Argument: {scores[party]['argument']}/10 | Evidence: {scores[party]['evidence']}/10 | "
+                       f"Rebuttal: {scores[party]['rebuttal']}/10 | Clarity: {scores[party]['clarity']}/10")
+    st.divider()
+    
+    try:
+        text = get_record_store().load_spilled(record['text'])
+    except (OSError, ValueError) as e:
+        st.error(f"The text of round {index + 1} could not be read: {e}")
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"**{names['party1']}:**")
+        st.write(text['party1_argument'])
+    with col2:
+        st.markdown(f"**{names['party2']}:**")
+        st.write(text['party2_argument'])
+    
+    st.markdown("**🤖 AI Analysis:**")
+    st.write(text['analysis'])
+
+def run_debate():
+    # Shown once: the outcome of a background job that failed since the last run
+    job_error = st.session_state.pop('debate_job_error', None)
+    if job_error:
+        st.error(job_error)
+    
+    # Display opening statement
+    if st.session_state.opening_statement:
+        st.header("🎤 AI Host Opening Statement")
+        st.info(st.session_state.opening_statement)
+        st.divider()
+    
+    # Display current debate info and scores
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Topic", st.session_state.debate_topic)
+    with col2:
+        st.metric("Current Round", f"{st.session_state.current_round}/{st.session_state.max_rounds}")
+    with col3:
+        progress = st.session_state.current_round / st.session_state.max_rounds
+        st.metric("Progress", f"{progress:.0%}")
+    
+    # Display live scoreboard
+    st.header("📊 Live Scoreboard")
+    render_live_scoreboard()
     
     # Score progression chart
-    if len(st.session_state.party1_round_scores) > 0:
+    if len(st.session_state.debate_scores) > 0:
         st.subheader("📈 Score Progression")
-        
-        rounds = list(range(1, len(st.session_state.party1_round_scores) + 1))
-        party1_cumulative = []
-        party2_cumulative = []
-        
-        cumulative1 = 0
-        cumulative2 = 0
-        for i in range(len(st.session_state.party1_round_scores)):
-            cumulative1 += st.session_state.party1_round_scores[i]['total']
-            cumulative2 += st.session_state.party2_round_scores[i]['total']
-            party1_cumulative.append(cumulative1)
-            party2_cumulative.append(cumulative2)
-        
-        chart_data = pd.DataFrame({
-            'Round': rounds,
-            st.session_state.party1_name: party1_cumulative,
-            st.session_state.party2_name: party2_cumulative
-        })
-        
-        st.line_chart(chart_data.set_index('Round'))
+        st.line_chart(get_score_progression())
     
     st.divider()
     
     # Show debate history
-    if st.session_state.debate_history:
+    rounds = st.session_state.debate_rounds
+    if rounds:
         st.header("📚 Debate History")
-        for i, round_data in enumerate(st.session_state.debate_history, 1):
-            with st.expander(f"Round {i} - Analysis & Scores", expanded=(i == len(st.session_state.debate_history))):
-                # Show scores for this round
-                if 'scores' in round_data:
-                    score_col1, score_col2 = st.columns(2)
-                    with score_col1:
-                        st.markdown(f"**🔵 {round_data['party1_name']} - Round Score: {round_data['scores']['party1']['total']}/40**")
-                        score_details = f"Argument: {round_data['scores']['party1']['argument']}/10 | "
-                        score_details += f"Evidence: {round_data['scores']['party1']['evidence']}/10 | "
-                        score_details += f"Rebuttal: {round_data['scores']['party1']['rebuttal']}/10 | "
-                        score_details += f"Clarity: {round_data['scores']['party1']['clarity']}/10"
-                        st.caption(score_details)
-                    
-                    with score_col2:
-                        st.markdown(f"**🔴 {round_data['party2_name']} - Round Score: {round_data['scores']['party2']['total']}/40**")
-                        score_details = f"Argument: {round_data['scores']['party2']['argument']}/10 | "
-                        score_details += f"Evidence: {round_data['scores']['party2']['evidence']}/10 | "
-                        score_details += f"Rebuttal: {round_data['scores']['party2']['rebuttal']}/10 | "
-                        score_details += f"Clarity: {round_data['scores']['party2']['clarity']}/10"
-                        st.caption(score_details)
-                    
-                    st.divider()
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown(f"**{round_data['party1_name']}:**")
-                    st.write(round_data['party1_argument'])
-                with col2:
-                    st.markdown(f"**{round_data['party2_name']}:**")
-                    st.write(round_data['party2_argument'])
-                
-                st.markdown("**🤖 AI Analysis:**")
-                st.write(round_data['analysis'])
+        # Long-form debates list only their latest rounds; earlier ones are opened one at a time
+        shown_from = max(0, len(rounds) - HISTORY_ROUNDS_SHOWN)
+        if shown_from:
+            earlier = st.selectbox(
+                f"Earlier rounds (1-{shown_from})",
+                range(shown_from),
+                index=None,
+                format_func=lambda index: f"Round {index + 1}",
+                placeholder="Open an earlier round..."
+            )
+            if earlier is not None:
+                with st.expander(f"Round {earlier + 1} - Analysis & Scores", expanded=True):
+                    render_round_details(earlier)
+        for i in range(shown_from, len(rounds)):
+            with st.expander(f"Round {i + 1} - Analysis & Scores", expanded=(i == len(rounds) - 1)):
+                render_round_details(i)
         st.divider()
     
     # Current round input (if debate not finished)
     if not st.session_state.debate_finished:
-        st.header(f"⚔️ Round {st.session_state.current_round}")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader(f"🗣️ {st.session_state.party1_name}")
-            party1_argument = st.text_area(
-                f"{st.session_state.party1_name}'s Argument",
-                height=150,
-                placeholder="Present your argument here..."
-            )
-        
-        with col2:
-            st.subheader(f"🗣️ {st.session_state.party2_name}")
-            party2_argument = st.text_area(
-                f"{st.session_state.party2_name}'s Argument",
-                height=150,
-                placeholder="Present your argument here..."
-            )
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if st.button("📊 Analyze This Round", type="primary"):
-                if party1_argument.strip() and party2_argument.strip():
-                    with st.spinner("AI analyzing arguments..."):
-                        analysis = host.analyze_arguments(
-                            st.session_state.party1_name,
-                            party1_argument,
-                            st.session_state.party2_name,
-                            party2_argument,
-                            st.session_state.current_round,
-                            st.session_state.debate_topic
-                        )
-                        
-                        # Parse scores from analysis
-                        scores = parse_scores_from_analysis(
-                            analysis,
-                            st.session_state.party1_name,
-                            st.session_state.party2_name
-                        )
-                        
-                        # Update scores
-                        st.session_state.party1_round_scores.append(scores['party1'])
-                        st.session_state.party2_round_scores.append(scores['party2'])
-                        st.session_state.party1_total_score += scores['party1']['total']
-                        st.session_state.party2_total_score += scores['party2']['total']
-                        
-                        # Store round data
-                        round_data = {
-                            'round': st.session_state.current_round,
-                            'party1_name': st.session_state.party1_name,
-                            'party1_argument': party1_argument,
-                            'party2_name': st.session_state.party2_name,
-                            'party2_argument': party2_argument,
-                            'analysis': analysis,
-                            'scores': scores,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        
-                        st.session_state.debate_history.append(round_data)
-                        
-                        # Check if this was the last round
-                        if st.session_state.current_round >= st.session_state.max_rounds:
-                            st.session_state.debate_finished = True
-                        else:
-                            st.session_state.current_round += 1
-                        
-                        st.rerun()
-                else:
-                    st.error("Both parties must provide arguments before analysis!")
-        
-        with col2:
-            if st.session_state.current_round > 1:
-                if st.button("🏁 End Debate Early"):
-                    st.session_state.debate_finished = True
-                    st.rerun()
+        render_round_input()
+        if st.session_state.get('debate_pending_job'):
+            render_job_progress()
     
     # Final verdict (if debate finished)
     if st.session_state.debate_finished:
@@ -630,72 +1092,57 @@ def run_debate():
         # Display final scores prominently
         st.subheader("🎯 Final Scores")
         final_col1, final_col2, final_col3 = st.columns([2, 2, 1])
+        totals = st.session_state.debate_scores.totals()
         
         with final_col1:
             st.metric(f"🔵 {st.session_state.party1_name}", 
-                     f"{st.session_state.party1_total_score} points",
+                     f"{totals['party1']} points",
                      delta=None)
         
         with final_col2:
             st.metric(f"� {st.session_state.party2_name}", 
-                     f"{st.session_state.party2_total_score} points",
+                     f"{totals['party2']} points",
                      delta=None)
         
         with final_col3:
-            score_diff = abs(st.session_state.party1_total_score - st.session_state.party2_total_score)
-            if st.session_state.party1_total_score > st.session_state.party2_total_score:
+            score_diff = abs(totals['party1'] - totals['party2'])
+            if totals['party1'] > totals['party2']:
                 st.success(f"🔵 Wins\nby {score_diff}")
-            elif st.session_state.party2_total_score > st.session_state.party1_total_score:
+            elif totals['party2'] > totals['party1']:
                 st.error(f"🔴 Wins\nby {score_diff}")
             else:
                 st.info("Tie!")
         
         st.divider()
         
-        if st.button("�📋 Generate Final Analysis", type="primary"):
-            with st.spinner("AI Judge preparing final verdict..."):
-                final_verdict = host.generate_final_verdict(
-                    st.session_state.debate_history,
-                    st.session_state.debate_topic,
-                    st.session_state.party1_total_score,
-                    st.session_state.party2_total_score
-                )
-                
-                st.success("**🎯 Final Analysis Complete!**")
-                st.write(final_verdict)
-                
-                # Prepare debate export data
-                debate_export = {
-                    'topic': st.session_state.debate_topic,
-                    'participants': [st.session_state.party1_name, st.session_state.party2_name],
-                    'rounds': len(st.session_state.debate_history),
-                    'final_scores': {
-                        st.session_state.party1_name: st.session_state.party1_total_score,
-                        st.session_state.party2_name: st.session_state.party2_total_score
-                    },
-                    'round_scores': {
-                        st.session_state.party1_name: st.session_state.party1_round_scores,
-                        st.session_state.party2_name: st.session_state.party2_round_scores
-                    },
-                    'history': st.session_state.debate_history,
-                    'final_verdict': final_verdict,
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                # Automatically save to records directory
-                saved_path = save_debate_to_records(debate_export)
-                if saved_path:
-                    st.success(f"✅ Debate automatically saved to: `{saved_path}`")
-                    st.info("💡 You can view this and other saved debates in the **Records** tab!")
-                
-                # Option to download debate
-                st.subheader("📄 Export Options")
-                st.download_button(
-                    label="💾 Download Debate Summary",
-                    data=json.dumps(debate_export, indent=2),
-                    file_name=f"debate_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json"
-                )
+        if st.session_state.get('debate_verdict'):
+            st.success("**🎯 Final Analysis Complete!**")
+            st.write(st.session_state.debate_verdict)
+            
+            if st.session_state.get('debate_saved_path'):
+                st.success(f"✅ Debate automatically saved to: `{st.session_state.debate_saved_path}`")
+                st.info("💡 You can view this and other saved debates in the **Records** tab!")
+            
+            # Option to download debate
+            st.subheader("📄 Export Options")
+            st.download_button(
+                label="💾 Download Debate Summary",
+                data=json.dumps(build_debate_export(), indent=2),
+                file_name=f"debate_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                mime="application/json"
+            )
+        elif st.session_state.get('debate_pending_job'):
+            render_job_progress()
+        elif st.button("�📋 Generate Final Analysis", type="primary"):
+            verdict_args = (
+                get_debate_history(),
+                st.session_state.debate_topic,
+                totals['party1'],
+                totals['party2']
+            )
+            st.session_state.debate_pending_job = submit_host_job('verdict', 'stream_final_verdict', verdict_args)
+            checkpoint_debate()
+            st.rerun()
 
 if __name__ == "__main__":
     main()
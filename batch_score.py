@@ -0,0 +1,235 @@
+"""Headless batch scoring of debate transcripts.
+
+Re-scores saved records and JSONL transcript archives with the current rubric,
+without the Streamlit UI:
+
+    python batch_score.py records/ tournament.jsonl -o scores.jsonl --workers 8 --rpm 30
+
+Inputs may be record directories, record .json files, or .jsonl files whose lines
+are either records or transcripts shaped like
+{"id": ..., "topic": ..., "party1_name": ..., "party2_name": ..., "rounds": [{"party1_argument": ..., "party2_argument": ...}]}.
+
+One result line is appended to the output per round as soon as it is scored. The
+output doubles as the checkpoint: rerunning the same command skips rounds that
+already have a successful result.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from call_policy import CallPolicy
+from call_scheduler import CallScheduler
+from debate_host import DebateHost, is_error_response
+from llm_metrics import LLMMetrics
+from model_clients import get_backend, model_loader
+from model_routing import get_router, resolve_model
+from record_store import iter_record_paths
+from response_cache import ResponseCache
+from score_repair import ScoreRepair
+
+# Offline scoring favours patience over latency: more retries, no hedged duplicate requests
+BATCH_POLICIES = {'analysis': CallPolicy(deadline=300.0, max_attempts=6, base_delay=2.0, max_delay=60.0)}
+
+
+def _normalize_debate(data, debate_id, source):
+    """Map a saved record or a transcript onto one shape: topic, party names and rounds"""
+    if 'history' in data:
+        participants = data.get('participants') or []
+        rounds = data['history']
+        party1_name = rounds[0].get('party1_name') if rounds else None
+        party2_name = rounds[0].get('party2_name') if rounds else None
+        party1_name = party1_name or (participants[0] if len(participants) > 0 else 'Party 1')
+        party2_name = party2_name or (participants[1] if len(participants) > 1 else 'Party 2')
+    else:
+        participants = data.get('participants') or []
+        rounds = data.get('rounds') or []
+        party1_name = data.get('party1_name') or (participants[0] if len(participants) > 0 else 'Party 1')
+        party2_name = data.get('party2_name') or (participants[1] if len(participants) > 1 else 'Party 2')
+
+    return {
+        'debate_id': str(data.get('id') or debate_id),
+        'source': source,
+        'topic': data.get('topic', ''),
+        'party1_name': party1_name,
+        'party2_name': party2_name,
+        'rounds': rounds
+    }
+
+
+def iter_debates(paths):
+    """Lazily yield normalized debates from record directories, record files and JSONL files"""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from iter_debates(list(iter_record_paths(path)))
+        elif path.endswith(".jsonl"):
+            with open(path, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError as e:
+                        print(f"Skipping {path}:{line_number}: {e}", file=sys.stderr)
+                        continue
+                    yield _normalize_debate(data, f"{os.path.basename(path)}:{line_number}", path)
+        else:
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {path}: {e}", file=sys.stderr)
+                continue
+            yield _normalize_debate(data, os.path.basename(path), path)
+
+
+def iter_jobs(paths):
+    """One scoring job per round, produced lazily so large archives are never held in memory"""
+    for debate in iter_debates(paths):
+        for index, round_data in enumerate(debate['rounds'], 1):
+            round_number = round_data.get('round', index)
+            yield {
+                'job_id': f"{debate['debate_id']}#{round_number}",
+                'debate_id': debate['debate_id'],
+                'source': debate['source'],
+                'topic': debate['topic'],
+                'round': round_number,
+                'party1_name': debate['party1_name'],
+                'party2_name': debate['party2_name'],
+                'party1_argument': round_data.get('party1_argument', ''),
+                'party2_argument': round_data.get('party2_argument', '')
+            }
+
+
+def load_checkpoint(output_path):
+    """Job ids that already have a successful result in the output file"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, 'r') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A crash can leave a partial last line; that job simply runs again
+                continue
+            if result.get('status') == 'ok':
+                done.add(result['job_id'])
+    return done
+
+
+def score_job(job, host, bypass_cache=False):
+    analysis = host.analyze_arguments(
+        job['party1_name'],
+        job['party1_argument'],
+        job['party2_name'],
+        job['party2_argument'],
+        job['round'],
+        job['topic'],
+        bypass_cache=bypass_cache
+    )
+    failed = is_error_response(analysis)
+    round_args = (job['party1_name'], job['party1_argument'], job['party2_name'], job['party2_argument'], job['round'], job['topic'])
+    score_parse = None if failed else ScoreRepair(host).check(analysis, job['party1_name'], job['party2_name'], round_args, bypass_cache)
+
+    return {
+        'job_id': job['job_id'],
+        'debate_id': job['debate_id'],
+        'source': job['source'],
+        'round': job['round'],
+        'topic': job['topic'],
+        'party1_name': job['party1_name'],
+        'party2_name': job['party2_name'],
+        'model': host.last_model('analysis'),
+        'status': 'error' if failed else 'ok',
+        'analysis': score_parse['analysis'] if score_parse else analysis,
+        'scores': score_parse['scores'] if score_parse else None,
+        'parse_status': score_parse['status'] if score_parse else None,
+        'parse_confidence': score_parse['confidence'] if score_parse else None,
+        'score_repair': score_parse['repair'] if score_parse else None,
+        'scored_at': datetime.now().isoformat()
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score debate transcripts offline with the debate rubric.")
+    parser.add_argument("inputs", nargs="+", help="record directories, record .json files or .jsonl transcript files")
+    parser.add_argument("-o", "--output", default="batch_scores.jsonl", help="JSONL file results are appended to (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent model calls")
+    parser.add_argument("--rpm", type=float, default=30, help="max requests per minute per API key (0 for unlimited)")
+    parser.add_argument("--api-key", action="append", dest="api_keys", help="Gemini API key; repeat to spread load over several keys (default: GEMINI_API_KEY)")
+    parser.add_argument("--model", help="pin analysis to this model or tier (pro, fast, lite) instead of the routing table")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the response cache")
+    parser.add_argument("--bypass-cache", action="store_true", help="always call the model but refresh the response cache")
+    parser.add_argument("--metrics-log", default="logs/llm_calls.jsonl", help="JSONL file each model call's metrics are appended to")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    api_keys = args.api_keys or [key.strip() for key in os.environ.get("GEMINI_API_KEY", "").split(",") if key.strip()]
+    if not api_keys and get_backend() == "fake":
+        api_keys = ["fake"]
+    if not api_keys:
+        print("No API key given: pass --api-key or set GEMINI_API_KEY", file=sys.stderr)
+        return 2
+
+    cache = None if args.no_cache else ResponseCache()
+    metrics = LLMMetrics(log_path=args.metrics_log)
+
+    # Model calls (not cache hits) take turns under per-key and per-model rate limits, at batch priority
+    scheduler = CallScheduler(key_rpm=args.rpm)
+
+    def make_host(api_key):
+        load_model = model_loader(api_key)
+        limits = {'scheduler': scheduler, 'rate_key': api_key, 'priority': 'batch'}
+        if args.model:
+            return DebateHost(cache=cache, model=load_model(resolve_model(args.model)), metrics=metrics, policies=BATCH_POLICIES, **limits)
+        return DebateHost(cache=cache, router=get_router(), model_loader=load_model, metrics=metrics, policies=BATCH_POLICIES, **limits)
+
+    hosts = itertools.cycle([make_host(api_key) for api_key in api_keys])
+
+    done = load_checkpoint(args.output)
+    counts = {'ok': 0, 'error': 0, 'skipped': 0}
+
+    def record(future, out):
+        result = future.result()
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        counts[result['status']] += 1
+        print(f"[{result['status']}] {result['job_id']}", file=sys.stderr)
+
+    with open(args.output, 'a') as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        pending = set()
+        for job in iter_jobs(args.inputs):
+            if job['job_id'] in done:
+                counts['skipped'] += 1
+                continue
+
+            # Keep the number of queued jobs bounded instead of reading the whole archive up front
+            if len(pending) >= args.workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future, out)
+
+            pending.add(pool.submit(score_job, job, next(hosts), args.bypass_cache))
+
+        for future in wait(pending).done:
+            record(future, out)
+
+    print(f"Scored {counts['ok']} round(s), {counts['error']} failed, {counts['skipped']} already done", file=sys.stderr)
+    for row in metrics.summary():
+        if row['p50_s'] is not None:
+            print(f"{row['method']} ({row['model']}): {row['calls']} calls, {row['errors']} errors, "
+                  f"p50 {row['p50_s']:.2f}s, p95 {row['p95_s']:.2f}s, p99 {row['p99_s']:.2f}s "
+                  f"(plus p95 {row['p95_queue_s'] or 0:.2f}s waiting for rate limits)", file=sys.stderr)
+    return 1 if counts['error'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
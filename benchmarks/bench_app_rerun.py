@@ -0,0 +1,178 @@
+"""Rerun time, memory and output size of the app with the local fake model backend.
+
+    python benchmarks/bench_app_rerun.py [--rounds 1,5,20,50] [--argument-chars 200,2000,10000]
+                                         [--records 0,100,500] [--repeats 5]
+                                         [--json results.json] [--baseline old.json] [--tolerance 1.5]
+
+Runs app.py through streamlit.testing.v1.AppTest with DEBATE_MODEL_BACKEND=fake, so
+no API key or network is needed. Every scenario gets a fresh working directory
+(records/, cache/) and session state prefilled with a synthetic debate, then:
+
+1. times the first run and the median/max of warm reruns, which execute both
+   run_debate and run_records_tab,
+2. measures the peak Python allocation of one warm rerun with tracemalloc,
+3. sums the serialized size of every element the run produced, and the pickled
+   size of the debate's session state.
+
+Scenarios vary the round count, the argument length and the number of saved
+records. With --baseline, any scenario whose warm median is more than tolerance
+times slower than in the baseline file fails the run.
+"""
+import argparse
+import json
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "app.py")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+os.environ["DEBATE_MODEL_BACKEND"] = "fake"
+os.environ.setdefault("DEBATE_FAKE_MODEL", "")
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from debate_fixtures import make_debate, session_state_for, write_records
+
+BASE_ROUNDS = 5
+BASE_ARGUMENT_CHARS = 1000
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def output_bytes(node):
+    """Serialized size and count of the elements under an AppTest tree node"""
+    size = 0
+    count = 0
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        size += proto.ByteSize()
+        count += 1
+    for child in (getattr(node, "children", None) or {}).values():
+        child_size, child_count = output_bytes(child)
+        size += child_size
+        count += child_count
+    return size, count
+
+
+def run_scenario(name, rounds, argument_chars, records, repeats, timeout):
+    """Measure one scenario in a fresh working directory"""
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_app_") as work_dir:
+        os.chdir(work_dir)
+        try:
+            # Cached getters hold stores opened in the previous scenario's directory
+            st.cache_resource.clear()
+            st.cache_data.clear()
+            if records:
+                write_records("records", records)
+
+            state = session_state_for(make_debate(rounds, argument_chars, finished=False)) if rounds else {}
+            app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+            for key, value in state.items():
+                app.session_state[key] = value
+
+            started = time.perf_counter()
+            app.run()
+            first = time.perf_counter() - started
+            if app.exception:
+                raise RuntimeError(f"{name}: app raised {app.exception[0].message}")
+
+            warm = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                app.run()
+                warm.append(time.perf_counter() - started)
+
+            tracemalloc.start()
+            app.run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            main_bytes, main_count = output_bytes(app.main)
+            sidebar_bytes, sidebar_count = output_bytes(app.sidebar)
+            return {
+                'scenario': name,
+                'rounds': rounds,
+                'argument_chars': argument_chars,
+                'records': records,
+                'first_ms': first * 1000,
+                'warm_median_ms': statistics.median(warm) * 1000,
+                'warm_max_ms': max(warm) * 1000,
+                'peak_alloc_kb': peak / 1024,
+                'output_kb': (main_bytes + sidebar_bytes) / 1024,
+                'elements': main_count + sidebar_count,
+                'state_kb': len(pickle.dumps(state)) / 1024
+            }
+        finally:
+            os.chdir(previous_dir)
+
+
+def scenarios(args):
+    for rounds in args.rounds:
+        yield f"rounds={rounds}", rounds, BASE_ARGUMENT_CHARS, 0
+    for chars in args.argument_chars:
+        yield f"argument_chars={chars}", BASE_ROUNDS, chars, 0
+    for records in args.records:
+        yield f"records={records}", BASE_ROUNDS, BASE_ARGUMENT_CHARS, records
+
+
+def print_table(results):
+    columns = (('first_ms', "first ms"), ('warm_median_ms', "warm p50 ms"), ('warm_max_ms', "warm max ms"),
+               ('peak_alloc_kb', "peak KB"), ('output_kb', "output KB"), ('elements', "elements"), ('state_kb', "state KB"))
+    print(f"{'scenario':<22}" + "".join(f"{label:>13}" for _, label in columns))
+    for result in results:
+        print(f"{result['scenario']:<22}" + "".join(
+            f"{result[key]:>13,.1f}" if isinstance(result[key], float) else f"{result[key]:>13,}" for key, _ in columns
+        ))
+
+
+def compare(results, baseline_path, tolerance):
+    """Scenarios whose warm median regressed past tolerance x the baseline"""
+    with open(baseline_path, 'r') as f:
+        baseline = {result['scenario']: result for result in json.load(f)}
+    failures = []
+    for result in results:
+        old = baseline.get(result['scenario'])
+        if old and result['warm_median_ms'] > tolerance * max(old['warm_median_ms'], 1.0):
+            failures.append(f"{result['scenario']}: warm median {old['warm_median_ms']:.1f}ms -> {result['warm_median_ms']:.1f}ms")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int_list, default=[1, 5, 20, 50])
+    parser.add_argument("--argument-chars", type=int_list, default=[200, 2000, 10000])
+    parser.add_argument("--records", type=int_list, default=[0, 100, 500])
+    parser.add_argument("--repeats", type=int, default=5, help="warm reruns per scenario")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds allowed per script run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed warm median slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    results = [run_scenario(name, rounds, chars, records, args.repeats, args.timeout)
+               for name, rounds, chars, records in scenarios(args)]
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failures = compare(results, args.baseline, args.tolerance) if args.baseline else []
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
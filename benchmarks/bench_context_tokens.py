@@ -0,0 +1,80 @@
+"""Prompt tokens per debate with and without the registered debate context.
+
+    python benchmarks/bench_context_tokens.py [--rounds 3,5,7,10] [--argument-chars 800]
+
+Plays debates of growing length against the fake model backend twice: with the
+debate context (rubric, topic, participants) registered on the model, and with it
+prepended to every request. Reports prompt tokens sent, tokens served from the
+(simulated) provider context cache, uncached tokens and the context hit rate.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from debate_fixtures import PARTY1, PARTY2, TOPICS, argument_text
+from debate_host import DebateHost
+from fake_model import FakeModel, get_fake_model
+from llm_metrics import LLMMetrics
+from model_routing import ModelRouter
+from score_parser import parse_scores
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def play(host, rounds, argument_chars, seed):
+    rng = random.Random(seed)
+    topic = f"{rng.choice(TOPICS)} (debate {seed})"
+    history = []
+    totals = [0, 0]
+    for number in range(1, rounds + 1):
+        party1_argument = argument_text(rng, argument_chars)
+        party2_argument = argument_text(rng, argument_chars)
+        analysis = host.analyze_arguments(PARTY1, party1_argument, PARTY2, party2_argument, number, topic, bypass_cache=True)
+        scores = parse_scores(analysis, PARTY1, PARTY2)['scores']
+        totals = [totals[0] + scores['party1']['total'], totals[1] + scores['party2']['total']]
+        history.append({'round': number, 'party1_name': PARTY1, 'party2_name': PARTY2, 'party1_argument': party1_argument,
+                        'party2_argument': party2_argument, 'analysis': analysis, 'scores': scores})
+    host.generate_final_verdict(history, topic, totals[0], totals[1], bypass_cache=True)
+
+
+def measure(mode, rounds, argument_chars, seed):
+    metrics = LLMMetrics(log_path=None)
+    if mode == 'registered':
+        host = DebateHost(router=ModelRouter(), model_loader=get_fake_model, metrics=metrics)
+    else:
+        host = DebateHost(model=FakeModel("fake-inline"), metrics=metrics)
+    play(host, rounds, argument_chars, seed)
+    calls = metrics.recent_calls()
+    prompt_tokens = sum(call['prompt_tokens'] or 0 for call in calls)
+    cached_tokens = sum(call['cached_tokens'] or 0 for call in calls)
+    return {
+        'prompt_tokens': prompt_tokens,
+        'cached_tokens': cached_tokens,
+        'uncached_tokens': prompt_tokens - cached_tokens,
+        'hit_rate': sum(1 for call in calls if call['cached_tokens']) / len(calls)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int_list, default=[3, 5, 7, 10])
+    parser.add_argument("--argument-chars", type=int, default=800)
+    args = parser.parse_args(argv)
+
+    print(f"{'rounds':>6}  {'context':<11}{'prompt':>10}{'cached':>10}{'uncached':>10}{'hit rate':>10}   (tokens per debate)")
+    for seed, rounds in enumerate(args.rounds):
+        for mode in ('inline', 'registered'):
+            result = measure(mode, rounds, args.argument_chars, seed)
+            print(f"{rounds:>6}  {mode:<11}{result['prompt_tokens']:>10,}{result['cached_tokens']:>10,}"
+                  f"{result['uncached_tokens']:>10,}{result['hit_rate']:>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Round latency of single-judge scoring vs the parallel judge ensemble.
+
+    python benchmarks/bench_judge_ensemble.py [--judges 3,5] [--rounds 5]
+                                              [--fake "latency=0.5,tokens_per_second=200"]
+
+Scores the same rounds against the fake model backend with one analysis call, and
+with JudgeEnsemble panels of growing size. Reports the mean round wall time, the
+mean time of the slowest judge and the sum of all judges (what running them one
+after another would cost), plus how often a panel stopped early or missed quorum.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from debate_fixtures import PARTY1, PARTY2, TOPICS, argument_text
+from debate_host import DebateHost
+from fake_model import get_fake_model, settings_from_env
+from judge_ensemble import PERSONAS, Judge, JudgeEnsemble
+from llm_metrics import LLMMetrics
+from model_routing import ModelRouter
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def make_host(settings):
+    return DebateHost(router=ModelRouter(), model_loader=lambda name, context=None: get_fake_model(name, context, **settings),
+                      metrics=LLMMetrics(log_path=None))
+
+
+def round_args(rounds, argument_chars):
+    rng = random.Random(0)
+    topic = rng.choice(TOPICS)
+    return [(PARTY1, argument_text(rng, argument_chars), PARTY2, argument_text(rng, argument_chars), number, topic)
+            for number in range(1, rounds + 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--judges", type=int_list, default=[3, 5])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--argument-chars", type=int, default=800)
+    parser.add_argument("--fake", default="latency=0.5,tokens_per_second=200", help="DEBATE_FAKE_MODEL settings")
+    args = parser.parse_args(argv)
+    settings = settings_from_env(args.fake)
+    rounds = round_args(args.rounds, args.argument_chars)
+
+    host = make_host(settings)
+    single = []
+    for round_ in rounds:
+        started = time.perf_counter()
+        host.analyze_arguments(*round_, bypass_cache=True)
+        single.append(time.perf_counter() - started)
+    print(f"{'scoring':<14}{'round s':>10}{'slowest s':>11}{'sum s':>9}{'early stop':>12}{'no quorum':>11}")
+    print(f"{'single':<14}{statistics.mean(single):>10.2f}{statistics.mean(single):>11.2f}{statistics.mean(single):>9.2f}")
+
+    for size in args.judges:
+        judges = [Judge(temperature=round(0.2 + 0.6 * index / max(1, size - 1), 2), persona=PERSONAS[index % len(PERSONAS)])
+                  for index in range(size)]
+        ensemble = JudgeEnsemble(make_host(settings), judges)
+        results = [ensemble.score_round(*round_, bypass_cache=True) for round_ in rounds]
+        judge_seconds = [[verdict['seconds'] for verdict in result['verdicts'] if verdict['seconds'] is not None] for result in results]
+        print(f"{f'{size} judges':<14}{statistics.mean(result['seconds'] for result in results):>10.2f}"
+              f"{statistics.mean(max(seconds) for seconds in judge_seconds):>11.2f}"
+              f"{statistics.mean(sum(seconds) for seconds in judge_seconds):>9.2f}"
+              f"{sum(result['early_stop'] for result in results):>12}{sum(not result['quorum_met'] for result in results):>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Quota collisions on a shared API key, with and without the call scheduler.
+
+    python benchmarks/bench_rate_limits.py [--sessions 20] [--rounds 2] [--quota 30] [--batch 10]
+                                           [--fake "latency=0.3"]
+
+Simulates a tournament burst: --sessions live debates on one API key click
+"Analyze This Round" at the same moment, each then ends with a final verdict,
+while --batch re-scoring calls run alongside. The fake model enforces a quota of
+--quota requests per minute per model and answers anything above it with a 429.
+
+"unscheduled" sends every call straight away (the call policy retries 429s with
+backoff); "scheduled" routes calls through a CallScheduler whose per-model limits
+match the quota. Reports calls that still failed after retries, wall time,
+per-priority completion-time percentiles and the p95 wait for a rate-limit slot.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from call_policy import CallPolicy
+from call_scheduler import CallScheduler
+from debate_fixtures import PARTY1, PARTY2, TOPICS, argument_text
+from debate_host import DebateHost, is_error_response
+from fake_model import FakeModel, settings_from_env
+from llm_metrics import LLMMetrics, percentile
+from model_routing import ModelRouter
+
+POLICIES = {task: CallPolicy(deadline=120.0, max_attempts=4, base_delay=1.0) for task in ('analysis', 'verdict')}
+
+
+def run(mode, args, settings):
+    # One fake model per name shared by all sessions, as on one Gemini API key
+    models = {}
+    lock = threading.Lock()
+
+    def load(name, context=None):
+        with lock:
+            model = models.get(name)
+            if model is None:
+                model = models[name] = FakeModel(name, rpm=args.quota, **settings)
+        return model if context is None else model.with_context(context)
+
+    scheduler = None
+    if mode == 'scheduled':
+        scheduler = CallScheduler(key_rpm=0, model_rpm={name: args.quota for name in ('gemini-2.5-pro', 'gemini-2.5-flash')})
+    metrics = LLMMetrics(log_path=None)
+    router = ModelRouter(quota_errors=10 ** 6)
+    finished = defaultdict(list)
+    failures = defaultdict(int)
+    started = time.perf_counter()
+
+    def host(session, priority=None):
+        return DebateHost(router=router, model_loader=load, metrics=metrics, policies=POLICIES, scheduler=scheduler,
+                          rate_key="shared-key", session_id=session, priority=priority)
+
+    def live(number):
+        rng = random.Random(number)
+        debate = host(f"session-{number}")
+        topic = rng.choice(TOPICS)
+        history = []
+        for round_number in range(1, args.rounds + 1):
+            analysis = debate.analyze_arguments(PARTY1, argument_text(rng, 400), PARTY2, argument_text(rng, 400), round_number, topic, bypass_cache=True)
+            finished['live'].append(time.perf_counter() - started)
+            failures['live'] += is_error_response(analysis)
+            history.append({'round': round_number, 'party1_name': PARTY1, 'party2_name': PARTY2, 'party1_argument': "",
+                            'party2_argument': "", 'analysis': analysis,
+                            'scores': {'party1': {'total': 20}, 'party2': {'total': 20}}})
+        verdict = debate.generate_final_verdict(history, topic, 20 * args.rounds, 20 * args.rounds, bypass_cache=True)
+        finished['verdict'].append(time.perf_counter() - started)
+        failures['verdict'] += is_error_response(verdict)
+
+    def batch(number):
+        rng = random.Random(-number)
+        analysis = host("batch", 'batch').analyze_arguments(PARTY1, argument_text(rng, 400), PARTY2, argument_text(rng, 400), 1,
+                                                             rng.choice(TOPICS), bypass_cache=True)
+        finished['batch'].append(time.perf_counter() - started)
+        failures['batch'] += is_error_response(analysis)
+
+    threads = [threading.Thread(target=live, args=(number,)) for number in range(args.sessions)]
+    threads += [threading.Thread(target=batch, args=(number,)) for number in range(args.batch)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    calls = metrics.recent_calls()
+    return {
+        'seconds': time.perf_counter() - started,
+        'failed': dict(failures),
+        'finished': {priority: (percentile(times, 50), percentile(times, 95)) for priority, times in finished.items()},
+        'queue_wait_p95': percentile([call['queue_wait'] for call in calls], 95)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=10, help="concurrent batch re-scoring calls")
+    parser.add_argument("--quota", type=float, default=30, help="simulated requests per minute per model")
+    parser.add_argument("--fake", default="latency=0.3", help="extra DEBATE_FAKE_MODEL settings")
+    args = parser.parse_args(argv)
+    settings = settings_from_env(args.fake)
+    settings.pop('rpm', None)
+
+    print(f"{'mode':<13}{'wall s':>8}{'failed':>8}   completion p50/p95 s per priority     queue wait p95 s")
+    for mode in ('unscheduled', 'scheduled'):
+        result = run(mode, args, settings)
+        completion = "  ".join(f"{priority} {p50:.0f}/{p95:.0f}" for priority, (p50, p95) in sorted(result['finished'].items()))
+        print(f"{mode:<13}{result['seconds']:>8.1f}{sum(result['failed'].values()):>8}   "
+              f"{completion:<37}{result['queue_wait_p95'] or 0:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Benchmark and fuzz check for score_parser.parse_scores.
+
+    python benchmarks/bench_score_parser.py [--fuzz-iterations 2000] [--seed 0]
+
+1. Times parse_scores on every corpus family at growing sizes and fails if any
+   family grows clearly faster than linearly (time ratio > 4x the size ratio).
+2. Times the previous regex parser on the adversarial families at small sizes for
+   comparison; it backtracks super-linearly, so it is not run on large inputs.
+3. Fuzzes parse_scores with mutated outputs and fails if it raises, returns an
+   unknown status, scores outside 0-10, or exceeds the per-KB time bound.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from score_parser import CRITERIA, MAX_SCORE, parse_scores
+from score_parser_corpus import FAMILIES, PARTY1, PARTY2, fuzz_cases
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+LEGACY_SIZES = (500, 1_000, 2_000, 4_000)
+LINEARITY_SLACK = 4.0
+MAX_SECONDS_PER_KB = 0.002
+
+
+def legacy_parse(analysis_text, party1_name, party2_name):
+    """The parser this module replaced, kept only for comparison"""
+    scores = {'party1': {}, 'party2': {}}
+    if "SCORES:" in analysis_text:
+        scores_section = analysis_text.split("SCORES:")[1].split("\n\n")[0]
+        for party, name in (('party1', party1_name), ('party2', party2_name)):
+            pattern = rf"{re.escape(name)}[:\s]+Argument[=\s]+(\d+).*?Evidence[=\s]+(\d+).*?Rebuttal[=\s]+(\d+).*?Clarity[=\s]+(\d+)"
+            match = re.search(pattern, scores_section, re.IGNORECASE | re.DOTALL)
+            if match:
+                scores[party] = dict(zip(CRITERIA, map(int, match.groups())))
+    return scores
+
+
+def best_time(function, text, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function(text, PARTY1, PARTY2)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_scaling():
+    failures = []
+    print(f"{'family':<24}" + "".join(f"{size:>12,}" for size in SIZES) + "   (seconds)")
+    for name, generate in FAMILIES.items():
+        timings = [best_time(parse_scores, generate(size)) for size in SIZES]
+        print(f"{name:<24}" + "".join(f"{seconds:>12.5f}" for seconds in timings))
+        for (small, small_time), (large, large_time) in zip(zip(SIZES, timings), zip(SIZES[1:], timings[1:])):
+            # Ignore sub-millisecond timings, which are dominated by noise
+            if large_time > 0.001 and large_time / max(small_time, 1e-6) > LINEARITY_SLACK * large / small:
+                failures.append(f"{name}: {small:,} -> {large:,} chars took {small_time:.5f}s -> {large_time:.5f}s")
+    return failures
+
+
+def run_legacy_comparison():
+    print(f"\nprevious regex parser\n{'family':<24}" + "".join(f"{size:>12,}" for size in LEGACY_SIZES) + "   (seconds)")
+    for name in ('unterminated_criteria', 'single_huge_line', 'well_formed'):
+        timings = [best_time(legacy_parse, FAMILIES[name](size), repeats=1) for size in LEGACY_SIZES]
+        print(f"{name:<24}" + "".join(f"{seconds:>12.5f}" for seconds in timings))
+
+
+def run_fuzz(iterations, seed):
+    failures = []
+    worst = 0.0
+    for case_number, text in enumerate(fuzz_cases(iterations, seed)):
+        started = time.perf_counter()
+        try:
+            result = parse_scores(text, PARTY1, PARTY2)
+        except Exception as e:
+            failures.append(f"case {case_number}: raised {type(e).__name__}: {e}")
+            continue
+        elapsed = time.perf_counter() - started
+        worst = max(worst, elapsed / max(len(text) / 1000, 1))
+
+        if result['status'] not in ('ok', 'partial', 'missing'):
+            failures.append(f"case {case_number}: unknown status {result['status']!r}")
+        if not 0.0 <= result['confidence'] <= 1.0:
+            failures.append(f"case {case_number}: confidence {result['confidence']} out of range")
+        for party in ('party1', 'party2'):
+            values = [result['scores'][party][criterion] for criterion in CRITERIA]
+            if any(not 0 <= value <= MAX_SCORE for value in values) or sum(values) != result['scores'][party]['total']:
+                failures.append(f"case {case_number}: bad scores {result['scores'][party]}")
+        if elapsed / max(len(text) / 1000, 1) > MAX_SECONDS_PER_KB:
+            failures.append(f"case {case_number}: {elapsed:.4f}s for {len(text):,} chars")
+
+    print(f"\nfuzz: {iterations} cases, worst {worst * 1e6:.1f} µs/KB, {len(failures)} failure(s)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fuzz-iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-legacy", action="store_true", help="do not time the previous regex parser")
+    args = parser.parse_args(argv)
+
+    failures = run_scaling()
+    if not args.skip_legacy:
+        run_legacy_comparison()
+    failures += run_fuzz(args.fuzz_iterations, args.seed)
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Cost of repairing unparseable round scores vs re-running the analysis.
+
+    python benchmarks/bench_score_repair.py [--rounds 40] [--score-format mixed] [--argument-chars 800]
+
+Scores rounds against the fake model backend with analyses in the given SCORES
+block format ("partial", "missing" and "mixed" produce unparseable ones), checks each with
+ScoreRepair and reports how many rounds needed a repair, how they were repaired,
+and the prompt and response tokens (and model) of the repair calls next to those
+of the analyses a full re-analysis would have repeated.
+"""
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from debate_fixtures import PARTY1, PARTY2, TOPICS, argument_text
+from debate_host import DebateHost
+from fake_model import SCORE_FORMATS, get_fake_model
+from llm_metrics import LLMMetrics
+from model_routing import ModelRouter
+from score_repair import ScoreRepair
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--score-format", choices=SCORE_FORMATS, default='mixed')
+    parser.add_argument("--argument-chars", type=int, default=800)
+    args = parser.parse_args(argv)
+
+    metrics = LLMMetrics(log_path=None)
+    host = DebateHost(router=ModelRouter(), metrics=metrics,
+                      model_loader=lambda name, context=None: get_fake_model(name, context, score_format=args.score_format))
+    repair = ScoreRepair(host)
+    rng = random.Random(0)
+    outcomes = Counter()
+    for number in range(1, args.rounds + 1):
+        round_args = (PARTY1, argument_text(rng, args.argument_chars), PARTY2, argument_text(rng, args.argument_chars),
+                      number, rng.choice(TOPICS))
+        for _ in repair.stream_analysis(*round_args, bypass_cache=True):
+            pass
+        outcomes[repair.last_result['repair'] or 'parsed'] += 1
+
+    print(f"{args.rounds} rounds ({args.score_format}): " + ", ".join(f"{count} {outcome}" for outcome, count in outcomes.most_common()))
+    print(f"{'calls':<16}{'model':<24}{'count':>7}{'prompt tok':>12}{'response tok':>14}   (mean per call)")
+    for row in metrics.summary():
+        print(f"{row['method']:<16}{row['model']:<24}{row['calls']:>7}{row['avg_prompt_tokens'] or 0:>12,.0f}{row['avg_response_tokens'] or 0:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Cold-start cost of the app: import-time breakdown and time to first paint.
+
+    python benchmarks/bench_startup.py [--repeats 3] [--top 15] [--json startup.json]
+
+1. Imports app.py in fresh interpreters with -X importtime and reports the
+   median import time spent in each top-level package, heaviest first.
+2. Runs the first script run of a fresh session in fresh interpreters with
+   streamlit.testing.v1.AppTest (what a user waits for after a container restart):
+   process start to first paint, the script run alone, and which heavy modules
+   were loaded by then. "setup" is a new visitor without an API key; "fake" is the
+   same page with the fake model backend configured, so the sidebar is populated.
+3. Fails if a module in --deferred was imported by `import app` or by the first
+   paint of either page (the sidebar's diagnostics panel included, which stays
+   closed until switched on); those must load only when first needed.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+DEFERRED = ("pandas", "google.generativeai", "google.ai.generativelanguage", "google.api_core")
+HEAVY = ("streamlit", "numpy", "pyarrow", "grpc", *DEFERRED)
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+FIRST_PAINT = r"""
+import json, os, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+painted = time.perf_counter()
+heavy = json.loads(sys.argv[2])
+print(json.dumps({
+    'streamlit_import': imported - started,
+    'script_run': painted - imported,
+    'exception': app.exception[0].message if app.exception else None,
+    'loaded': [name for name in heavy if name in sys.modules]
+}))
+"""
+
+
+def clean_env(**extra):
+    env = {key: value for key, value in os.environ.items() if key != "DEBATE_MODEL_BACKEND"}
+    env.update(extra)
+    return env
+
+
+def import_breakdown():
+    """Import seconds per top-level package for one `import app`, and the modules it loaded"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=clean_env(), capture_output=True, text=True, check=True
+    )
+    packages = defaultdict(float)
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_time, _, _, name = match.groups()
+        loaded.add(name)
+        # Self times add up without double counting nested imports
+        packages[name.split(".")[0]] += int(self_time) / 1e6
+    return packages, loaded
+
+
+def first_paint(env):
+    """Seconds from process start to the end of the first script run, plus the child's own timings"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", FIRST_PAINT, APP_PATH, json.dumps(HEAVY)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - started
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['process_to_paint'] = elapsed
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="packages to list in the import breakdown")
+    parser.add_argument("--deferred", default=",".join(DEFERRED),
+                        help="modules that must not load before first paint (empty to skip the check)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+    deferred = [name for name in args.deferred.split(",") if name]
+    failures = []
+
+    runs = [import_breakdown() for _ in range(args.repeats)]
+    packages = {name: statistics.median(run[0].get(name, 0.0) for run in runs) for name in runs[0][0]}
+    total = sum(packages.values())
+    print(f"import app: {total * 1000:,.0f} ms (median of {args.repeats})")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28}{seconds * 1000:>10,.1f} ms")
+    failures += [f"`import app` loaded {name}" for name in deferred if name in runs[0][1]]
+
+    scenarios = {
+        'setup': clean_env(),
+        'fake': clean_env(DEBATE_MODEL_BACKEND="fake")
+    }
+    paints = {}
+    print(f"\n{'first paint':<14}{'process ms':>12}{'streamlit ms':>14}{'script run ms':>15}   heavy modules loaded")
+    for name, env in scenarios.items():
+        reports = [first_paint(env) for _ in range(args.repeats)]
+        if reports[0]['exception']:
+            failures.append(f"{name}: first run raised {reports[0]['exception']}")
+        paints[name] = {
+            key: statistics.median(report[key] for report in reports)
+            for key in ('process_to_paint', 'streamlit_import', 'script_run')
+        }
+        paints[name]['loaded'] = reports[0]['loaded']
+        print(f"{name:<14}{paints[name]['process_to_paint'] * 1000:>12,.0f}{paints[name]['streamlit_import'] * 1000:>14,.0f}"
+              f"{paints[name]['script_run'] * 1000:>15,.0f}   {', '.join(reports[0]['loaded'])}")
+    failures += [f"first paint of the {page} page loaded {name}" for page in paints for name in deferred if name in paints[page]['loaded']]
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'import_ms': {name: seconds * 1000 for name, seconds in packages.items()},
+                       'first_paint': paints}, f, indent=2)
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Smoke check of the real (gemini) model loader without network access.
+
+    python benchmarks/check_gemini_loader.py
+
+Patches google.generativeai.GenerativeModel and the generativelanguage service
+clients with local stand-ins, then goes through model_loader(api_key, backend="gemini")
+the way the app does: plain models, reuse of a pooled model, a debate context small
+enough for a system instruction and one large enough for explicit cached content,
+and DebateHost calls (blocking and streamed) routed through the loader. Exits
+non-zero if any step fails or a call comes back as an error response.
+"""
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+
+from debate_context import MIN_CACHED_TOKENS, CHARS_PER_TOKEN
+from debate_host import DebateHost, is_error_response
+from llm_metrics import LLMMetrics
+from model_clients import ModelClientRegistry, model_loader
+from model_routing import ModelRouter
+
+API_KEY = "check-key"
+REPLY = "A stand-in reply from the stubbed Gemini model."
+
+
+class StubModel:
+    """Answers like genai.GenerativeModel, without a client"""
+
+    def __init__(self, model_name, system_instruction=None, **kwargs):
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self.system_instruction = system_instruction
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        usage = SimpleNamespace(prompt_token_count=12, candidates_token_count=9, total_token_count=21,
+                                cached_content_token_count=0)
+        if stream:
+            return [SimpleNamespace(text=word + " ", usage_metadata=usage) for word in REPLY.split()]
+        return SimpleNamespace(text=REPLY, usage_metadata=usage)
+
+
+def check(failures, name, passed, detail=""):
+    print(f"{'ok' if passed else 'FAIL'}  {name}{f'  ({detail})' if detail else ''}")
+    if not passed:
+        failures.append(name)
+
+
+def main():
+    failures = []
+    registry = ModelClientRegistry()
+    cache_service = mock.MagicMock()
+    cache_service.create_cached_content.return_value = SimpleNamespace(name="cachedContents/check")
+    with mock.patch.object(genai, "GenerativeModel", StubModel), \
+            mock.patch.object(glm, "GenerativeServiceClient", mock.MagicMock()), \
+            mock.patch.object(glm, "CacheServiceClient", mock.MagicMock(return_value=cache_service)), \
+            mock.patch("model_clients._registry", registry):
+        load = model_loader(API_KEY, backend="gemini")
+        try:
+            first = load("gemini-2.5-flash")
+            again = load("gemini-2.5-flash")
+            check(failures, "plain model", isinstance(first, StubModel) and first is again, f"stats {registry.stats()}")
+
+            small = load("gemini-2.5-flash", "Short debate context.")
+            check(failures, "context as system instruction", small.system_instruction == "Short debate context.")
+
+            large = load("gemini-2.5-pro", "x" * (MIN_CACHED_TOKENS * CHARS_PER_TOKEN + 1))
+            check(failures, "context as cached content", getattr(large, "_cached_content", None) == "cachedContents/check")
+
+            host = DebateHost(router=ModelRouter(), model_loader=load, metrics=LLMMetrics(log_path=None))
+            opening = host.generate_opening_statement("Remote work", bypass_cache=True)
+            check(failures, "host call", opening == REPLY and not is_error_response(opening), opening[:80])
+
+            streamed = "".join(host.stream_analysis("Alice", "For.", "Bob", "Against.", 1, "Remote work", bypass_cache=True))
+            check(failures, "streamed host call", streamed.strip() == REPLY and not is_error_response(streamed), streamed[:80])
+        except Exception as e:
+            check(failures, "loader", False, f"{type(e).__name__}: {e}")
+
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
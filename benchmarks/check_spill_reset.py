@@ -0,0 +1,102 @@
+"""Check that resetting a debate only discards its own spilled round text.
+
+    python benchmarks/check_spill_reset.py
+
+Plays the same debate (same names, topic and arguments, so identical round text) in
+two sessions of the app against the fake model backend, in a temporary directory.
+Resetting the first must delete its spill files and its checkpoint, while the second
+still renders its history and generates, saves and exports its verdict. Exits
+non-zero if it does not.
+"""
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+ROUNDS = 3
+
+
+def wait_for(app, condition, attempts=100):
+    for _ in range(attempts):
+        if condition():
+            return True
+        time.sleep(0.1)
+        app.run()
+    return condition()
+
+
+def play(app):
+    """Start the debate and record every round"""
+    app.run()
+    for widget in app.text_input:
+        if "Party 1 Name" in widget.label:
+            widget.input("Alice")
+        if "Party 2 Name" in widget.label:
+            widget.input("Bob")
+        if "Debate Topic" in widget.label:
+            widget.input("Remote work improves productivity")
+    [s for s in app.selectbox if "Number of Rounds" in s.label][0].select(ROUNDS)
+    [b for b in app.button if "Start Debate" in b.label][0].click()
+    app.run()
+    for number in range(1, ROUNDS + 1):
+        for widget in app.text_area:
+            widget.input(f"The same argument for round {number}. " * 10)
+        [b for b in app.button if "Analyze This Round" in b.label][0].click()
+        app.run()
+        wait_for(app, lambda: len(app.session_state.debate_rounds) >= number)
+
+
+def check(failures, name, passed, detail=""):
+    print(f"{'ok' if passed else 'FAIL'}  {name}{f'  ({detail})' if detail else ''}")
+    if not passed:
+        failures.append(name)
+
+
+def main():
+    os.environ["DEBATE_MODEL_BACKEND"] = "fake"
+    sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        first = AppTest.from_file(APP_PATH, default_timeout=60)
+        second = AppTest.from_file(APP_PATH, default_timeout=60)
+        play(first)
+        play(second)
+        handles = [[record['text'] for record in app.session_state.debate_rounds] for app in (first, second)]
+        spilled = len(glob.glob("records/spill/*/*.json.gz"))
+        check(failures, "debates spill separately", not set(handles[0]) & set(handles[1]) and spilled == 2 * ROUNDS,
+              f"{spilled} spill files")
+
+        from analysis_jobs import JobQueue
+        first_debate = (first.query_params["session"], first.session_state.debate_id)
+        check(failures, "debate checkpointed", JobQueue().load_state(*first_debate) is not None)
+        [b for b in first.button if "Reset Debate" in b.label][0].click()
+        first.run()
+        left = len(glob.glob("records/spill/*/*.json.gz"))
+        check(failures, "reset discards its own text only", left == ROUNDS, f"{left} spill files left")
+        check(failures, "reset drops its checkpoint", JobQueue().load_state(*first_debate) is None)
+
+        second.run()
+        check(failures, "other debate renders", not second.exception, "; ".join(e.message for e in second.exception))
+        [b for b in second.button if "Generate Final Analysis" in b.label][0].click()
+        second.run()
+        saved_path = lambda: second.session_state.debate_saved_path if "debate_saved_path" in second.session_state else None
+        wait_for(second, lambda: saved_path() or second.exception)
+        saved = saved_path()
+        record = json.load(open(saved)) if saved else {}
+        check(failures, "other debate saves its verdict", not second.exception and len(record.get('history', [])) == ROUNDS,
+              saved or "; ".join(e.message for e in second.exception))
+        os.chdir(ROOT)
+
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Check that failed streams end background jobs as errors, never as results.
+
+    python benchmarks/check_stream_errors.py
+
+Runs DebateHost stream calls through a JobQueue (in a temporary directory) with a
+stand-in model whose stream fails before its first chunk, after its first chunk,
+or not at all, both for the final verdict and for an analysis checked by ScoreRepair.
+A failure must leave the job with status 'error' and no result, with the text streamed
+before a failure part-way through kept in partial. Exits non-zero if any case does not.
+"""
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_jobs import FINISHED_STATUSES, JobQueue
+from call_policy import CallPolicy
+from debate_host import DebateHost
+from score_repair import ScoreRepair
+
+COMPLETE = "SCORES:\nAlice: Argument=7, Evidence=6, Rebuttal=8, Clarity=7\nBob: Argument=6, Evidence=7, Rebuttal=5, Clarity=8\n\nDone."
+HISTORY = [{'round': 1, 'party1_name': "Alice", 'party2_name': "Bob", 'party1_argument': "For.", 'party2_argument': "Against.",
+            'analysis': COMPLETE, 'scores': {'party1': {'total': 28}, 'party2': {'total': 26}}}]
+FIRST_CHUNK = COMPLETE[:16]
+
+
+class StreamModel:
+    """Streams text in two chunks, raising ConnectionError before the first chunk or after it when told to"""
+
+    def __init__(self, fail_after=None):
+        self.model_name = "models/stream-check"
+        self.fail_after = fail_after
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        if self.fail_after == 0:
+            raise ConnectionError("refused")
+
+        def chunks():
+            for index, text in enumerate((FIRST_CHUNK, COMPLETE[len(FIRST_CHUNK):])):
+                if index == self.fail_after:
+                    raise ConnectionError("reset by peer")
+                yield SimpleNamespace(text=text, usage_metadata=None)
+        return chunks()
+
+
+def run_job(queue, chunks):
+    job_id = queue.submit("check", "debate", "check", chunks)
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job['status'] in FINISHED_STATUSES:
+            return job
+        time.sleep(0.05)
+    return job
+
+
+def main():
+    failures = []
+    # One attempt and no hedging, so the stand-in's ConnectionError is not retried
+    policies = {task: CallPolicy(deadline=5.0, max_attempts=1) for task in ('analysis', 'verdict')}
+    with tempfile.TemporaryDirectory() as directory:
+        queue = JobQueue(path=os.path.join(directory, "jobs.sqlite3"))
+        for name, fail_after in (("fails before the first chunk", 0), ("fails after the first chunk", 1), ("completes", None)):
+            host = DebateHost(model=StreamModel(fail_after), policies=policies)
+            repair = ScoreRepair(host, reanalyze=False)
+            streams = {
+                'verdict': lambda: host.stream_final_verdict(HISTORY, "Remote work", 28, 26, bypass_cache=True),
+                'analysis': lambda: repair.stream_analysis("Alice", "For.", "Bob", "Against.", 1, "Remote work", bypass_cache=True)
+            }
+            for kind, chunks in streams.items():
+                job = run_job(queue, chunks)
+                if fail_after is None:
+                    passed = job['status'] == 'done' and job['result'] == COMPLETE
+                else:
+                    # Before the first chunk the only text is the error message itself
+                    passed = (job['status'] == 'error' and job['result'] is None and bool(job['error'])
+                              and (job['partial'] == FIRST_CHUNK if fail_after else True))
+                print(f"{'ok' if passed else 'FAIL'}  {kind} {name}: status={job['status']} result={job['result']!r:.40} "
+                      f"partial={job['partial']!r:.40} error={job['error']!r:.60}")
+                if not passed:
+                    failures.append(f"{kind} {name}")
+
+    print(f"\n{len(failures)} failure(s)" if failures else "\nall checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
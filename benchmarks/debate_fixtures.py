@@ -0,0 +1,142 @@
+"""Synthetic debates for offline app benchmarks, analyzed by the local fake model.
+
+Records have the same shape as the ones the app saves, and session_state_for()
+turns one into the session state of a debate in progress or just finished.
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from debate_host import DebateHost
+from debate_state import ScoreTable, compact_round
+from fake_model import FakeModel
+from record_store import RecordStore
+from score_parser import parse_scores
+from verdict_context import summarize_round
+
+PARTY1 = "Team Alpha"
+PARTY2 = "Team Beta"
+TOPICS = (
+    "Should AI replace human teachers?",
+    "Is nuclear power essential for decarbonisation?",
+    "Should social media be regulated like utilities?",
+    "Is remote work better for productivity?"
+)
+_WORDS = ("evidence", "policy", "students", "costs", "risk", "data", "outcomes", "trust", "market",
+          "safety", "history", "incentives", "access", "quality", "scale", "precedent")
+
+
+def argument_text(rng, chars):
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars].capitalize() + "."
+
+
+def make_debate(rounds=3, argument_chars=600, seed=0, finished=True, participants=(PARTY1, PARTY2)):
+    """A debate record with the given number of rounds, as save_debate_to_records writes it"""
+    rng = random.Random(seed)
+    host = DebateHost(model=FakeModel("fake-bench", seed=seed))
+    topic = rng.choice(TOPICS)
+    party1, party2 = participants
+    started = datetime(2025, 1, 1) + timedelta(minutes=seed)
+
+    history = []
+    round_scores = {party1: [], party2: []}
+    for number in range(1, rounds + 1):
+        party1_argument = argument_text(rng, argument_chars)
+        party2_argument = argument_text(rng, argument_chars)
+        analysis = host.analyze_arguments(party1, party1_argument, party2, party2_argument, number, topic)
+        score_parse = parse_scores(analysis, party1, party2)
+        round_data = {
+            'round': number,
+            'party1_name': party1,
+            'party1_argument': party1_argument,
+            'party2_name': party2,
+            'party2_argument': party2_argument,
+            'analysis': analysis,
+            'model': "fake-bench",
+            'scores': score_parse['scores'],
+            'score_parse': {
+                'status': score_parse['status'],
+                'confidence': score_parse['confidence'],
+                'issues': score_parse['issues']
+            },
+            'timestamp': (started + timedelta(seconds=number)).isoformat()
+        }
+        round_data['summary'] = summarize_round(round_data)
+        history.append(round_data)
+        round_scores[party1].append(score_parse['scores']['party1'])
+        round_scores[party2].append(score_parse['scores']['party2'])
+
+    final_scores = {name: sum(scores['total'] for scores in round_scores[name]) for name in participants}
+    record = {
+        'topic': topic,
+        'participants': list(participants),
+        'rounds': rounds,
+        'final_scores': final_scores,
+        'round_scores': round_scores,
+        'history': history,
+        'timestamp': (started + timedelta(seconds=rounds + 1)).isoformat()
+    }
+    if finished:
+        record['final_verdict'] = host.generate_final_verdict(history, topic, final_scores[party1], final_scores[party2])
+        record['verdict_model'] = "fake-bench"
+    return record
+
+
+def session_state_for(record, max_rounds=None, records_dir="records"):
+    """Session state for the record's debate: finished if it has a verdict, otherwise awaiting the next round.
+
+    Round text is spilled to the record store in records_dir, as the app does.
+    """
+    party1, party2 = record['participants']
+    finished = 'final_verdict' in record
+    rounds = len(record['history'])
+    max_rounds = max_rounds or (rounds if finished else rounds + 1)
+    store = RecordStore(records_dir)
+    scores = ScoreTable()
+    for round_data in record['history']:
+        scores.append(round_data['scores'])
+    debate_id = f"bench-{rounds}-{len(record['history'][0]['party1_argument']) if rounds else 0}"
+    state = {
+        'debate_id': debate_id,
+        'debate_started': True,
+        'current_round': rounds if finished else rounds + 1,
+        'debate_rounds': [compact_round(round_data, store, debate_id) for round_data in record['history']],
+        'debate_scores': scores,
+        'opening_statement': "Welcome to today's debate.",
+        'debate_topic': record['topic'],
+        'party1_name': party1,
+        'party2_name': party2,
+        'max_rounds': max_rounds,
+        'debate_finished': finished,
+        'debate_pending_job': None
+    }
+    if finished:
+        state.update({
+            'debate_verdict': record['final_verdict'],
+            'debate_verdict_model': record.get('verdict_model'),
+            'debate_saved_path': None,
+            'debate_finished_at': record['timestamp']
+        })
+    return state
+
+
+def write_records(records_dir, count, rounds=3, argument_chars=400, seed=0):
+    """Save count finished debates through RecordStore; returns their paths"""
+    store = RecordStore(records_dir)
+    names = [f"Speaker {number}" for number in range(max(4, count // 10))]
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        participants = tuple(rng.sample(names, 2))
+        record = make_debate(rounds, argument_chars, seed=seed + index, participants=participants)
+        paths.append(store.save(record)[1])
+    return paths
@@ -0,0 +1,276 @@
+"""Multi-session load test: N concurrent users running whole debates against the fake model.
+
+    python benchmarks/load_test.py [--users 1,5,10,20] [--rounds 3] [--argument-chars 800]
+                                   [--fake "latency=0.5,tokens_per_second=80"] [--poll 0.25]
+                                   [--think-time 0] [--json results.json]
+
+Every simulated user drives its own AppTest session of app.py, in one process, so
+the sessions share the job queue, model clients and stores exactly like browser
+tabs on one Streamlit server. Each user:
+
+    load -> setup_debate (opening statement) -> run_debate rounds (submit, poll until
+    analyzed) -> final verdict (submit, poll) -> Records tab (search, sort, page)
+
+For each concurrency level the harness reports completed debates per minute,
+script reruns per second, latency percentiles of every phase (script run time
+for submit/records phases, submit-to-result time for rounds and verdicts), the
+poll rerun latency, and how much each session's st.session_state grew from the
+first run to the end of the debate. --rounds 12/24/36/48 runs long-form debates.
+
+AppTest swaps in a process-global test runtime for every script run, so script
+runs from different sessions take turns; model calls, background jobs and user
+pauses still overlap. Script runs are mostly CPU-bound and share one GIL on a real
+server too, so the time spent waiting for a turn (queue_wait) is a fair proxy for
+rerun queueing, and phase latencies include it.
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), "app.py")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+os.environ["DEBATE_MODEL_BACKEND"] = "fake"
+
+from debate_fixtures import TOPICS, argument_text
+
+PHASES = ('load', 'setup', 'round_submit', 'round', 'verdict_submit', 'verdict', 'poll', 'records_search', 'records_browse', 'queue_wait')
+PERCENTILES = (50, 95, 99)
+# AppTest installs a process-global test runtime for the duration of each script run
+_SCRIPT_LOCK = threading.Lock()
+ROUND_CHOICES = (3, 5, 7)
+LONG_FORM_ROUND_CHOICES = (12, 24, 36, 48)
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def widget(widgets, label):
+    """The first widget whose label contains label"""
+    for item in widgets:
+        if label in item.label:
+            return item
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def state_bytes(app):
+    """Pickled size of the session's user state (keyless widget state excluded)"""
+    state = app.session_state
+    filtered = getattr(state, "filtered_state", None)
+    values = filtered if filtered is not None else state.to_dict()
+    size = 0
+    for key, value in values.items():
+        try:
+            size += len(pickle.dumps((key, value)))
+        except Exception:
+            size += len(repr(value))
+    return size
+
+
+class SimulatedUser:
+    """One browser tab going through a full debate"""
+
+    def __init__(self, number, rounds, argument_chars, poll, think_time, timeout, timings):
+        self.number = number
+        self.rounds = rounds
+        self.argument_chars = argument_chars
+        self.poll = poll
+        self.think_time = think_time
+        self.timeout = timeout
+        self.timings = timings
+        self.rng = random.Random(number)
+        self.reruns = 0
+        self.state_sizes = []
+        self.app = None
+
+    def run(self, phase):
+        """One script run, timed under phase including any wait for another session's run"""
+        started = time.perf_counter()
+        with _SCRIPT_LOCK:
+            self.timings['queue_wait'].append(time.perf_counter() - started)
+            self.app.run()
+        elapsed = time.perf_counter() - started
+        self.reruns += 1
+        self.timings[phase].append(elapsed)
+        if self.app.exception:
+            raise RuntimeError(f"user {self.number}, {phase}: {self.app.exception[0].message}")
+        return elapsed
+
+    def wait_for_job(self, phase, done):
+        """Rerun like the polling fragment until done() holds; returns submit-to-result time"""
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        while not done():
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"user {self.number}: {phase} did not finish within {self.timeout:.0f}s")
+            time.sleep(self.poll)
+            self.run('poll')
+        elapsed = time.perf_counter() - started
+        self.timings[phase].append(elapsed)
+        return elapsed
+
+    def think(self):
+        if self.think_time:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+
+    def debate(self):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(APP_PATH, default_timeout=self.timeout)
+        self.run('load')
+        self.state_sizes.append(state_bytes(self.app))
+
+        party1, party2 = f"User {self.number} Alpha", f"User {self.number} Beta"
+        widget(self.app.text_input, "Party 1 Name").input(party1)
+        widget(self.app.text_input, "Party 2 Name").input(party2)
+        widget(self.app.text_input, "Debate Topic").input(self.rng.choice(TOPICS))
+        if self.rounds in LONG_FORM_ROUND_CHOICES:
+            widget(self.app.toggle, "Long-form debate").set_value(True)
+            self.run('load')
+        widget(self.app.selectbox, "Number of Rounds").select(self.rounds)
+        widget(self.app.button, "Start Debate").click()
+        self.run('setup')
+        self.state_sizes.append(state_bytes(self.app))
+
+        for number in range(1, self.rounds + 1):
+            self.think()
+            widget(self.app.text_area, f"{party1}'s Argument").input(argument_text(self.rng, self.argument_chars))
+            widget(self.app.text_area, f"{party2}'s Argument").input(argument_text(self.rng, self.argument_chars))
+            widget(self.app.button, "Analyze This Round").click()
+            self.run('round_submit')
+            self.wait_for_job('round', lambda: len(self.app.session_state.debate_rounds) >= number)
+            self.state_sizes.append(state_bytes(self.app))
+
+        widget(self.app.button, "Generate Final Analysis").click()
+        self.run('verdict_submit')
+        self.wait_for_job('verdict', lambda: bool(self.app.session_state.get('debate_verdict')))
+        self.state_sizes.append(state_bytes(self.app))
+
+        self.think()
+        widget(self.app.text_input, "Search arguments").input(self.rng.choice(("evidence", "rebuttal policy", "trust")))
+        self.run('records_search')
+        widget(self.app.text_input, "Search arguments").input("")
+        self.run('records_browse')
+        widget(self.app.selectbox, "Sort by").select_index(1)
+        self.run('records_browse')
+        self.state_sizes.append(state_bytes(self.app))
+
+
+def run_level(users, args):
+    """Run users concurrent debates in a fresh working directory and summarize them"""
+    import streamlit as st
+
+    timings = defaultdict(list)
+    simulated = [SimulatedUser(number, args.rounds, args.argument_chars, args.poll, args.think_time,
+                               args.timeout, timings) for number in range(users)]
+    errors = []
+
+    def worker(user):
+        try:
+            user.debate()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            if args.verbose:
+                traceback.print_exc()
+
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="load_test_") as work_dir:
+        os.chdir(work_dir)
+        try:
+            # Each level starts with empty stores and fresh process-wide singletons
+            st.cache_resource.clear()
+            st.cache_data.clear()
+            threads = [threading.Thread(target=worker, args=(user,), daemon=True) for user in simulated]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            os.chdir(previous_dir)
+
+    completed = users - len(errors)
+    growth = [(user.state_sizes[-1] - user.state_sizes[0]) / 1024 for user in simulated if len(user.state_sizes) > 1]
+    final = [user.state_sizes[-1] / 1024 for user in simulated if user.state_sizes]
+    return {
+        'users': users,
+        'completed': completed,
+        'errors': errors,
+        'seconds': elapsed,
+        'debates_per_minute': completed / elapsed * 60,
+        'reruns_per_second': sum(user.reruns for user in simulated) / elapsed,
+        'phases': {
+            phase: {f"p{pct}": percentile(timings[phase], pct) * 1000 for pct in PERCENTILES} | {'count': len(timings[phase])}
+            for phase in PHASES if timings[phase]
+        },
+        'state_kb': {
+            'final_mean': statistics.mean(final) if final else 0.0,
+            'final_max': max(final, default=0.0),
+            'growth_mean': statistics.mean(growth) if growth else 0.0,
+            'growth_per_round': statistics.mean(growth) / args.rounds if growth else 0.0
+        }
+    }
+
+
+def print_level(result):
+    print(f"\n{result['users']} concurrent user(s): {result['completed']} debate(s) in {result['seconds']:.1f}s, "
+          f"{result['debates_per_minute']:.1f} debates/min, {result['reruns_per_second']:.1f} reruns/s")
+    print(f"  {'phase':<16}{'count':>8}" + "".join(f"{f'p{pct} ms':>12}" for pct in PERCENTILES))
+    for phase, stats in result['phases'].items():
+        print(f"  {phase:<16}{stats['count']:>8}" + "".join(f"{stats[f'p{pct}']:>12,.1f}" for pct in PERCENTILES))
+    state = result['state_kb']
+    print(f"  session_state: {state['final_mean']:.1f} KB mean / {state['final_max']:.1f} KB max at the end, "
+          f"+{state['growth_mean']:.1f} KB per debate ({state['growth_per_round']:.1f} KB per round)")
+    for error in result['errors']:
+        print(f"  ERROR {error}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int_list, default=[1, 5, 10, 20], help="concurrency levels to run")
+    parser.add_argument("--rounds", type=int, choices=ROUND_CHOICES + LONG_FORM_ROUND_CHOICES, default=3)
+    parser.add_argument("--argument-chars", type=int, default=800)
+    parser.add_argument("--fake", default="latency=0.5,tokens_per_second=80",
+                        help="DEBATE_FAKE_MODEL settings for the model stand-in")
+    parser.add_argument("--poll", type=float, default=0.25, help="seconds between polling reruns while a job runs")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds a user pauses between rounds")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds allowed per script run and per job")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="print tracebacks of failed sessions")
+    args = parser.parse_args(argv)
+
+    os.environ["DEBATE_FAKE_MODEL"] = args.fake
+    results = []
+    for users in args.users:
+        result = run_level(users, args)
+        print_level(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
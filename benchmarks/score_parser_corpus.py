@@ -0,0 +1,106 @@
+"""Adversarial and realistic model outputs for exercising score_parser.
+
+Each generator takes a target size in characters and returns analysis text for
+the parties PARTY1/PARTY2, so benchmarks can check how parse time grows with size.
+"""
+import random
+
+PARTY1 = "Team Alpha"
+PARTY2 = "Team Beta"
+
+_PROSE = (
+    "Team Alpha opened with a clear framing of the motion and supported it with two concrete examples. "
+    "Team Beta's rebuttal addressed the second example directly but left the framing largely unchallenged. "
+    "Argument strength was comparable, though evidence quality favoured Team Alpha this round. "
+)
+
+
+def _pad(text, size):
+    """Append analysis prose until text reaches size characters"""
+    if len(text) >= size:
+        return text
+    repeats = (size - len(text)) // len(_PROSE) + 1
+    return (text + "\n\n" + _PROSE * repeats)[:size]
+
+
+def well_formed(size):
+    return _pad(
+        "SCORES:\n"
+        f"{PARTY1}: Argument=8, Evidence=7, Rebuttal=6, Clarity=9\n"
+        f"{PARTY2}: Argument=5, Evidence=6, Rebuttal=7, Clarity=8\n",
+        size
+    )
+
+
+def markdown_table(size):
+    return _pad(
+        "**SCORES:**\n\n"
+        "| Party | Argument | Evidence | Rebuttal | Clarity |\n"
+        "|---|---|---|---|---|\n"
+        f"| **{PARTY1}** | Argument: 8 | Evidence: 7 | Rebuttal: 6 | Clarity: 9 |\n"
+        f"| **{PARTY2}** | Argument: 5 | Evidence: 6 | Rebuttal: 7 | Clarity: 8 |\n",
+        size
+    )
+
+
+def vertical_list(size):
+    return _pad(
+        "## Scores\n"
+        f"**\"{PARTY1}\"**\n- Argument Strength: 8/10\n- Evidence Quality: 7/10\n- Rebuttal Effectiveness: 6/10\n- Clarity & Delivery: 9/10\n"
+        f"**\"{PARTY2}\"**\n- Argument Strength: 5/10\n- Evidence Quality: 6/10\n- Rebuttal Effectiveness: 7/10\n- Clarity & Delivery: 8/10\n",
+        size
+    )
+
+
+def unterminated_criteria(size):
+    """Many name + partial-criteria runs with no Clarity and no blank line: worst case for backtracking regexes"""
+    unit = f"{PARTY1}: Argument=1 Evidence=1 Rebuttal=1 "
+    return "SCORES:\n" + unit * (max(size - 8, 0) // len(unit) + 1)
+
+
+def no_scores_block(size):
+    """Long analysis that never contains a SCORES block"""
+    return _pad("The model ignored the requested format entirely.", size)
+
+
+def single_huge_line(size):
+    """No line breaks at all, with criterion words sprinkled throughout"""
+    unit = "argument evidence rebuttal clarity = = = ( ( "
+    return "SCORES: " + unit * (size // len(unit) + 1)
+
+
+FAMILIES = {
+    'well_formed': well_formed,
+    'markdown_table': markdown_table,
+    'vertical_list': vertical_list,
+    'unterminated_criteria': unterminated_criteria,
+    'no_scores_block': no_scores_block,
+    'single_huge_line': single_huge_line
+}
+
+_NOISE = ["*", "**", "_", "`", "#", "|", "-", ":", "=", "\n", "\n\n", " ", "10", "/10", "(", ")", "\"", "'", "Argument", "Clarity", PARTY1, PARTY2, "SCORES:", "é", "​"]
+
+
+def mutate(text, rng, edits=8):
+    """Random insertions, deletions and duplications, as a model drifting off format might produce"""
+    chars = list(text)
+    for _ in range(edits):
+        position = rng.randrange(len(chars) + 1)
+        operation = rng.random()
+        if operation < 0.5:
+            chars[position:position] = list(rng.choice(_NOISE))
+        elif operation < 0.8 and chars:
+            del chars[position:position + rng.randint(1, 12)]
+        elif chars:
+            span = chars[position:position + rng.randint(1, 40)]
+            chars[position:position] = span * rng.randint(1, 20)
+    return "".join(chars)
+
+
+def fuzz_cases(iterations, seed=0, size=2000):
+    """Deterministic stream of mutated outputs drawn from every family"""
+    rng = random.Random(seed)
+    families = list(FAMILIES.values())
+    for _ in range(iterations):
+        base = rng.choice(families)(rng.choice([200, size, size * 5]))
+        yield mutate(base, rng, edits=rng.randint(1, 30))
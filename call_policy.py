@@ -0,0 +1,168 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+
+from llm_metrics import percentile
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Hedged requests run in their own threads so the caller can take whichever finishes first
+_hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="model-call")
+
+
+class CallDeadlineExceeded(TimeoutError):
+    """A model call did not produce a good response before its deadline"""
+
+
+@lru_cache(maxsize=None)
+def _exception_types():
+    """(quota, retryable) exception classes; google.api_core is only imported once an error needs classifying"""
+    from google.api_core import exceptions as api_exceptions
+
+    quota = (api_exceptions.TooManyRequests, api_exceptions.ResourceExhausted)
+    retryable = quota + (
+        api_exceptions.InternalServerError,
+        api_exceptions.BadGateway,
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.GatewayTimeout,
+        api_exceptions.DeadlineExceeded,
+        ConnectionError,
+        TimeoutError
+    )
+    return quota, retryable
+
+
+def is_retryable(error):
+    if isinstance(error, _exception_types()[1]):
+        return True
+    return getattr(error, 'code', None) in RETRYABLE_STATUS_CODES
+
+
+def is_quota_error(error):
+    return isinstance(error, _exception_types()[0]) or getattr(error, 'code', None) == 429
+
+
+class CallPolicy:
+    """Deadline, retry and hedging rules for one kind of model call.
+
+    deadline          -- total seconds for the call including retries and backoff
+    max_attempts      -- attempts on retryable errors (429, 5xx, timeouts)
+    base_delay        -- first backoff in seconds; doubles each retry, with +/-50% jitter
+    hedge_percentile  -- send a second request once the first has run longer than this
+                         percentile of recent latencies (None disables hedging)
+    hedge_after       -- hedge delay in seconds until min_samples latencies are known
+    hedge_to_fallback -- hedge with the fallback model instead of repeating the same request
+    """
+
+    def __init__(self, deadline=60.0, max_attempts=3, base_delay=1.0, max_delay=16.0,
+                 hedge_percentile=None, hedge_after=None, hedge_to_fallback=False, min_samples=20):
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.hedge_to_fallback = hedge_to_fallback
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=500)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None if this policy does not hedge"""
+        if self.hedge_percentile is None and self.hedge_after is None:
+            return None
+        with self._lock:
+            latencies = list(self._latencies)
+        if self.hedge_percentile is not None and len(latencies) >= self.min_samples:
+            return percentile(latencies, self.hedge_percentile)
+        return self.hedge_after
+
+    def backoff(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+
+DEFAULT_POLICIES = {
+    'opening': CallPolicy(deadline=45.0, max_attempts=3),
+    'analysis': CallPolicy(deadline=90.0, max_attempts=3, hedge_percentile=95, hedge_after=45.0, hedge_to_fallback=True),
+    'verdict': CallPolicy(deadline=180.0, max_attempts=2),
+    'repair': CallPolicy(deadline=30.0, max_attempts=2)
+}
+
+
+def _attempt(policy, primary, hedge, timeout):
+    """One attempt, hedged if the policy says so; returns (result, hedged, used_hedge)"""
+    hedge_delay = policy.hedge_delay()
+    if hedge_delay is None or hedge_delay >= timeout:
+        return primary(timeout), False, False
+
+    started = time.monotonic()
+    first = _hedge_pool.submit(primary, timeout)
+    done, _ = wait([first], timeout=hedge_delay)
+    if done:
+        return first.result(), False, False
+
+    second = _hedge_pool.submit(hedge, max(timeout - (time.monotonic() - started), 0.1))
+    pending = {first, second}
+    error = None
+    while pending:
+        remaining = timeout - (time.monotonic() - started)
+        done, pending = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                return future.result(), True, future is second
+            except Exception as e:
+                # Keep waiting for the other request; report this error only if both fail
+                error = e
+    # The losing request keeps running in the background; its result is discarded
+    if error is not None:
+        raise error
+    raise CallDeadlineExceeded(f"no response within {timeout:.1f}s")
+
+
+def call_with_policy(policy, primary, fallback=None, latency_of=None):
+    """Run primary(timeout) under the policy's deadline, retries and hedging.
+
+    fallback(timeout) is used for hedged requests when policy.hedge_to_fallback is set.
+    latency_of(result), if given, is the latency recorded for hedging instead of the
+    attempt's wall time, e.g. one that leaves out waiting for a rate-limit slot, so a
+    queue backlog does not look like a slow model.
+    Returns (result, info) where info has attempts, hedged, used_fallback and latency.
+    Raises the last error (or CallDeadlineExceeded) when no good response arrives in time.
+    """
+    hedge = fallback if policy.hedge_to_fallback and fallback is not None else primary
+    deadline = time.monotonic() + policy.deadline
+    info = {'attempts': 0, 'hedged': False, 'used_fallback': False, 'latency': None}
+
+    while True:
+        info['attempts'] += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CallDeadlineExceeded(f"deadline of {policy.deadline:.0f}s exceeded after {info['attempts'] - 1} attempt(s)")
+
+        started = time.monotonic()
+        try:
+            result, hedged, used_hedge = _attempt(policy, primary, hedge, remaining)
+        except Exception as e:
+            if not is_retryable(e) or info['attempts'] >= policy.max_attempts:
+                raise
+            delay = policy.backoff(info['attempts'])
+            if time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+            continue
+
+        info['latency'] = latency_of(result) if latency_of is not None else time.monotonic() - started
+        policy.observe(info['latency'])
+        info['hedged'] = info['hedged'] or hedged
+        info['used_fallback'] = used_hedge and hedge is fallback
+        return result, info
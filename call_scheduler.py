@@ -0,0 +1,242 @@
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from llm_metrics import percentile
+from model_clients import key_id
+from model_routing import resolve_model
+
+# Lower runs first: verdicts end a debate, live rounds have a user waiting, batch work can wait
+PRIORITIES = ('verdict', 'live', 'batch')
+TASK_PRIORITIES = {'verdict': 'verdict', 'analysis': 'live', 'opening': 'live', 'repair': 'live'}
+
+LIMITS_ENV = "DEBATE_RATE_LIMITS"
+# Requests per minute: per API key (0 for no key-wide limit) and per model on each key
+DEFAULT_KEY_RPM = 0
+DEFAULT_MODEL_RPM = {'gemini-2.5-pro': 150, 'gemini-2.5-flash': 1000, 'gemini-2.5-flash-lite': 4000}
+# A full bucket allows this many seconds' worth of requests at once
+BURST_SECONDS = 10.0
+# A bucket that got a 429 anyway stays closed this long
+QUOTA_COOLDOWN = 5.0
+MAX_SESSIONS = 10000
+
+
+class SchedulerTimeout(TimeoutError):
+    """A model call waited for its rate-limit slot past its deadline"""
+
+
+def limits_from_env(value=None):
+    """(key rpm, {model: rpm}) from "key=600,pro=150,fast=1000" (DEBATE_RATE_LIMITS by default);
+    unlisted models keep their defaults and 0 disables a limit"""
+    value = os.environ.get(LIMITS_ENV, "") if value is None else value
+    key_rpm = DEFAULT_KEY_RPM
+    model_rpm = dict(DEFAULT_MODEL_RPM)
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, rpm = (part.strip() for part in item.split("=", 1))
+        if name == 'key':
+            key_rpm = float(rpm)
+        elif name:
+            model_rpm[resolve_model(name)] = float(rpm)
+    return key_rpm, model_rpm
+
+
+class TokenBucket:
+    """rate tokens per second up to capacity; not thread-safe (CallScheduler holds its lock)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.closed_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill(now)
+        if now < self.closed_until:
+            return self.closed_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def close(self, now, seconds):
+        """Empty the bucket and refuse tokens for seconds (after a quota error)"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0)
+        self.closed_until = max(self.closed_until, now + seconds)
+
+
+class CallScheduler:
+    """Process-wide admission control for model calls.
+
+    Every call first takes a token from its API key's bucket and from the bucket of
+    its model on that key, so simultaneous sessions sharing a key stay under its
+    quota instead of colliding into 429s. Calls that must wait are queued: higher
+    priority first (PRIORITIES), then the session served least recently, then
+    arrival order, so one busy session cannot starve the others. A waiting call
+    whose buckets are empty does not hold up calls for other keys or models.
+    """
+
+    def __init__(self, key_rpm=None, model_rpm=None, burst_seconds=BURST_SECONDS, quota_cooldown=QUOTA_COOLDOWN):
+        env_key_rpm, env_model_rpm = limits_from_env()
+        self.key_rpm = env_key_rpm if key_rpm is None else key_rpm
+        self.model_rpm = env_model_rpm if model_rpm is None else model_rpm
+        self.burst_seconds = burst_seconds
+        self.quota_cooldown = quota_cooldown
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._waiting = []
+        self._sequence = itertools.count()
+        # session -> grant number of its latest call, for the fair order
+        self._served = {}
+        self._grants = itertools.count(1)
+        self._waits = defaultdict(lambda: deque(maxlen=1000))
+        self._granted = defaultdict(int)
+        self._throttled = defaultdict(int)
+        self._timeouts = defaultdict(int)
+        self._max_depth = defaultdict(int)
+        self.quota_errors = 0
+
+    def _bucket(self, name, rpm):
+        """The bucket for name, or None when rpm is unlimited"""
+        if not rpm:
+            return None
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            # Burst plus refill never exceeds rpm in any 60-second window, as provider quotas count them
+            rate = rpm / (60.0 + self.burst_seconds)
+            bucket = self._buckets[name] = TokenBucket(rate, max(1.0, rate * self.burst_seconds))
+        return bucket
+
+    def _buckets_for(self, rate_key, model_name):
+        digest = key_id(rate_key)
+        buckets = (self._bucket(('key', digest), self.key_rpm),
+                   self._bucket(('model', digest, model_name), self.model_rpm.get(model_name, 0)))
+        return [bucket for bucket in buckets if bucket is not None]
+
+    def acquire(self, rate_key, model_name, priority='live', session_id=None, timeout=None):
+        """Block until the call may be sent; returns the seconds spent waiting.
+
+        Raises SchedulerTimeout if no slot is free within timeout seconds.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._lock:
+            ticket = {
+                'rank': PRIORITIES.index(priority),
+                'priority': priority,
+                'session': session_id,
+                'sequence': next(self._sequence),
+                'buckets': self._buckets_for(rate_key, model_name),
+                'wake': threading.Condition(self._lock)
+            }
+            self._waiting.append(ticket)
+            depth = sum(1 for waiting in self._waiting if waiting['priority'] == priority)
+            self._max_depth[priority] = max(self._max_depth[priority], depth)
+            throttled = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    granted, retry_in = self._next_grant(now)
+                    if granted is ticket:
+                        break
+                    if deadline is not None and now >= deadline:
+                        self._timeouts[priority] += 1
+                        raise SchedulerTimeout(f"no {model_name} rate-limit slot within {timeout:.1f}s")
+                    throttled = True
+                    if granted is not None:
+                        granted['wake'].notify()
+                    wait = retry_in
+                    if deadline is not None:
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    ticket['wake'].wait(wait)
+            finally:
+                self._waiting.remove(ticket)
+                self._wake_next()
+
+            for bucket in ticket['buckets']:
+                bucket.take()
+            if session_id is not None:
+                self._served[session_id] = next(self._grants)
+                if len(self._served) > MAX_SESSIONS:
+                    # Forget the sessions served longest ago; they simply count as new
+                    for session in sorted(self._served, key=self._served.get)[:MAX_SESSIONS // 10]:
+                        del self._served[session]
+            waited = time.monotonic() - started
+            self._waits[priority].append(waited)
+            self._granted[priority] += 1
+            if throttled:
+                self._throttled[priority] += 1
+            return waited
+
+    def _wake_next(self):
+        """Wake the ticket that may go now, or everyone to recompute their waits if none may"""
+        granted, _ = self._next_grant(time.monotonic())
+        for waiting in [granted] if granted is not None else self._waiting:
+            waiting['wake'].notify()
+
+    def _next_grant(self, now):
+        """(first waiting ticket in fair order whose buckets all have a token or None, seconds until one may)"""
+        retry_in = None
+        for ticket in sorted(self._waiting, key=lambda waiting: (waiting['rank'], self._served.get(waiting['session'], 0), waiting['sequence'])):
+            wait = max((bucket.wait_time(now) for bucket in ticket['buckets']), default=0.0)
+            if wait <= 0:
+                return ticket, None
+            retry_in = wait if retry_in is None else min(retry_in, wait)
+        return None, retry_in
+
+    def report_quota_error(self, rate_key, model_name):
+        """A call was rejected for quota anyway: close its buckets for a while"""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self._buckets_for(rate_key, model_name):
+                bucket.close(now, self.quota_cooldown)
+            self.quota_errors += 1
+            self._wake_next()
+
+    def stats(self):
+        """Queue depth and wait-time percentiles per priority, plus limit settings"""
+        with self._lock:
+            depths = defaultdict(int)
+            for ticket in self._waiting:
+                depths[ticket['priority']] += 1
+            priorities = {}
+            for priority in PRIORITIES:
+                waits = list(self._waits[priority])
+                priorities[priority] = {
+                    'depth': depths[priority],
+                    'max_depth': self._max_depth[priority],
+                    'granted': self._granted[priority],
+                    'throttled': self._throttled[priority],
+                    'timeouts': self._timeouts[priority],
+                    'p50_wait_s': percentile(waits, 50),
+                    'p95_wait_s': percentile(waits, 95),
+                    'max_wait_s': max(waits, default=None)
+                }
+            return {
+                'queued': len(self._waiting),
+                'priorities': priorities,
+                'buckets': len(self._buckets),
+                'quota_errors': self.quota_errors,
+                'key_rpm': self.key_rpm,
+                'model_rpm': dict(self.model_rpm)
+            }
+
+
+_scheduler = CallScheduler()
+
+
+def get_scheduler():
+    """The scheduler shared by every session and worker thread in this process"""
+    return _scheduler
@@ -0,0 +1,90 @@
+import hashlib
+
+# Explicit cached content is only accepted above a per-model minimum size; smaller
+# contexts are sent as a system instruction, which the provider caches implicitly
+MIN_CACHED_TOKENS = 2048
+CONTEXT_TTL_SECONDS = 3600
+CHARS_PER_TOKEN = 4
+
+# First line of each request kind; they never appear in the context itself
+ROUND_REQUEST = "ROUND {round_number} ARGUMENTS"
+VERDICT_REQUEST = "FINAL VERDICT REQUEST"
+
+
+def debate_context(topic, party1_name, party2_name):
+    """The static part of every analysis and verdict prompt of one debate.
+
+    It is registered with the model once per debate (see context_id); each call
+    then sends only the round's arguments or the verdict's record and scores.
+    """
+    return f"""
+        You are the impartial AI debate analyst and judge of a debate.
+
+        Topic: {topic}
+        Participants: {party1_name} and {party2_name}
+
+        ROUND ANALYSIS
+        Each round message gives both parties' arguments for one round. Analyze the round objectively, covering:
+
+        1. SCORING (Rate each party on these criteria from 0-10):
+           - Argument Strength: Logic, reasoning, and validity of claims
+           - Evidence Quality: Use of facts, data, examples, and sources
+           - Rebuttal Effectiveness: Addressing opponent's points
+           - Clarity & Delivery: Communication quality and structure
+
+           Format your scores EXACTLY like this at the START of your response:
+           SCORES:
+           {party1_name}: Argument=X, Evidence=X, Rebuttal=X, Clarity=X
+           {party2_name}: Argument=X, Evidence=X, Rebuttal=X, Clarity=X
+
+        2. DETAILED ANALYSIS (for each party):
+           - Strengths in this round
+           - Weaknesses or areas to improve
+           - Key points made
+
+        3. ROUND ASSESSMENT:
+           - Which argument was stronger this round and why
+           - Critical moments or turning points
+           - Impact on overall debate trajectory
+
+        Be fair, constructive, and specific in your feedback.
+
+        FINAL VERDICT
+        The final message gives a compact record of the debate and the final scores. Provide a comprehensive final verdict that includes:
+
+        1. OVERALL PERFORMANCE SUMMARY:
+           - Strengths and weaknesses of each debater
+           - Quality of arguments throughout the debate
+           - Score breakdown analysis
+
+        2. KEY MOMENTS:
+           - Most compelling arguments from each side
+           - Critical turning points in the debate
+           - Best rounds for each debater
+
+        3. FINAL JUDGMENT:
+           - Which side presented the stronger overall case
+           - Reasoning for your decision based on scores and performance
+           - Margin of victory assessment
+
+        4. CONSTRUCTIVE FEEDBACK:
+           - Areas for improvement for both parties
+           - Positive highlights from the debate
+           - Lessons learned
+
+        Be thorough, fair, and provide educational value in your analysis.
+        """
+
+
+def context_id(context):
+    """Stable identifier of a context; models loaded with a context carry it as .debate_context"""
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+def has_context(model, context):
+    """Whether model was loaded with context registered, so requests can omit it"""
+    return context is not None and getattr(model, 'debate_context', None) == context_id(context)
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import threading
+import time
+
+from call_policy import DEFAULT_POLICIES, call_with_policy, is_quota_error
+from call_scheduler import TASK_PRIORITIES, SchedulerTimeout
+from debate_context import ROUND_REQUEST, VERDICT_REQUEST, context_id, debate_context, has_context
+from llm_metrics import CallTracker
+from model_clients import DEFAULT_MODEL
+from score_parser import SCORES_SCHEMA, parse_scores
+from verdict_context import build_verdict_context, DEFAULT_TOKEN_BUDGET, DEFAULT_PIVOTAL_ROUNDS
+
+# DebateHost method -> (call policy task, prefix of the error text returned when the call fails)
+METHOD_TASKS = {
+    'generate_opening_statement': ('opening', "Error generating opening statement"),
+    'analyze_arguments': ('analysis', "Error analyzing arguments"),
+    'stream_analysis': ('analysis', "Error analyzing arguments"),
+    'judge_round': ('analysis', "Error analyzing arguments"),
+    'extract_scores': ('repair', "Error extracting scores"),
+    'generate_final_verdict': ('verdict', "Error generating final verdict"),
+    'stream_final_verdict': ('verdict', "Error generating final verdict")
+}
+
+class StreamInterrupted(Exception):
+    """A streamed call failed after some of its text was yielded; str() is the error message.
+
+    The text is incomplete, so it is raised rather than yielded: an error message appended
+    to partial output would not be recognised by is_error_response.
+    """
+
+
+def is_error_response(text):
+    """Whether a DebateHost result is an error message rather than model output"""
+    return any(text.startswith(f"{prefix}:") for _, prefix in METHOD_TASKS.values())
+
+def _gemini_model(model_name, context=None):
+    """GenerativeModel using the process-wide genai configuration; the SDK is imported on first use"""
+    import google.generativeai as genai
+    if context is None:
+        return genai.GenerativeModel(model_name)
+    model = genai.GenerativeModel(model_name, system_instruction=context)
+    model.debate_context = context_id(context)
+    return model
+
+def _party_names(debate_history):
+    first_round = debate_history[0] if debate_history else {}
+    return first_round.get('party1_name', "Party 1"), first_round.get('party2_name', "Party 2")
+
+def _model_name(model):
+    return model.model_name.split('/')[-1]
+
+def _config_tag(generation_config):
+    """Short stable tag of a generation config, so differently configured responses are cached apart"""
+    return hashlib.sha256(json.dumps(generation_config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def _context_status(model, context):
+    """How the debate context reaches the model: 'off' (none), 'registered' or 'inline' (prepended)"""
+    if context is None:
+        return 'off'
+    return 'registered' if has_context(model, context) else 'inline'
+
+class DebateHost:
+    def __init__(self, cache=None, verdict_token_budget=DEFAULT_TOKEN_BUDGET, pivotal_rounds=DEFAULT_PIVOTAL_ROUNDS, model=None, metrics=None,
+                 fallback_model=None, policies=None, router=None, model_loader=None, scheduler=None, rate_key=None,
+                 session_id=None, priority=None):
+        # With a router each task gets its own model (loaded by name via model_loader);
+        # an explicit model pins every task to it
+        self.router = router
+        self.model_loader = model_loader or _gemini_model
+        self.model = model if model is not None or router is not None else _gemini_model(DEFAULT_MODEL)
+        self.cache = cache
+        self.metrics = metrics
+        # Deadlines, retries and hedging per task; hedges may go to the (faster) fallback model
+        self.fallback_model = fallback_model
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        # With a scheduler every request waits for its API key's and model's rate limit, queued
+        # by priority (by task unless given, e.g. 'batch') and fairly across sessions
+        self.scheduler = scheduler
+        self.rate_key = rate_key
+        self.session_id = session_id
+        self.priority = priority
+        # The final verdict sees round summaries and score tables, plus raw text for the most pivotal rounds
+        self.verdict_token_budget = verdict_token_budget
+        self.pivotal_rounds = pivotal_rounds
+        # Model that produced each task's latest result, per thread (hosts are shared by batch workers)
+        self._last_models = threading.local()
+        
+    def models_for(self, task, context=None, model_name=None):
+        """(primary model, fallback model or None) for a task, loaded with the debate context if given.
+        
+        model_name overrides the routed model (ignored when the host is pinned to one model).
+        """
+        if self.model is not None:
+            return self.model, self.fallback_model
+        name = model_name or self.router.route(task)
+        fallback_name = self.router.fallback_for(name)
+        load = self.model_loader if context is None else (lambda model_name: self.model_loader(model_name, context))
+        return load(name), load(fallback_name) if fallback_name else None
+    
+    def last_model(self, task):
+        """Name of the model that produced this thread's latest result for task, if any"""
+        return getattr(self._last_models, task, None)
+    
+    def generate_opening_statement(self, topic, bypass_cache=False):
+        prompt = f"""
+        You are an AI debate host. Generate a professional opening statement for a debate on the topic: "{topic}"
+        
+        Your opening should:
+        1. Welcome participants
+        2. Clearly state the debate topic
+        3. Explain the format (alternating arguments, AI analysis after each round)
+        4. Set ground rules for respectful discourse
+        5. Encourage both parties to present their strongest arguments
+        
+        Keep it concise but authoritative.
+        """
+        
+        return self._generate(prompt, 'generate_opening_statement', bypass_cache)
+    
+    def _analysis_request(self, party1_name, party1_argument, party2_name, party2_argument, round_number):
+        return f"""
+        {ROUND_REQUEST.format(round_number=round_number)}
+        
+        {party1_name}'s Argument:
+        {party1_argument}
+        
+        {party2_name}'s Argument:
+        {party2_argument}
+        """
+    
+    def analyze_arguments(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic, bypass_cache=False):
+        request = self._analysis_request(party1_name, party1_argument, party2_name, party2_argument, round_number)
+        return self._generate(request, 'analyze_arguments', bypass_cache, debate_context(topic, party1_name, party2_name))
+    
+    def stream_analysis(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic, bypass_cache=False):
+        """Yield the round analysis in chunks as the model generates it"""
+        request = self._analysis_request(party1_name, party1_argument, party2_name, party2_argument, round_number)
+        return self._stream_text(request, 'stream_analysis', bypass_cache, debate_context(topic, party1_name, party2_name))
+    
+    def judge_round(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic,
+                    model_name=None, temperature=None, persona=None, bypass_cache=False):
+        """One ensemble judge's analysis: an optional model, sampling temperature and rubric emphasis (see judge_ensemble.py)"""
+        request = self._analysis_request(party1_name, party1_argument, party2_name, party2_argument, round_number)
+        if persona:
+            request += f"\n        Judging emphasis for this analysis: {persona}\n"
+        return self._generate(request, 'judge_round', bypass_cache, debate_context(topic, party1_name, party2_name),
+                              model_name=model_name, generation_config=None if temperature is None else {'temperature': temperature})
+    
+    def extract_scores(self, analysis_text, party1_name, party2_name, bypass_cache=False):
+        """Read the rubric scores out of an analysis as JSON (SCORES_SCHEMA) with the small repair model;
+        returns the JSON text, or an error message if the call fails"""
+        prompt = f"""
+        Below is a debate judge's analysis of one round between {party1_name} (party1) and {party2_name} (party2).
+        Report the scores the judge gave each party, from 0 to 10, for: argument (argument strength),
+        evidence (evidence quality), rebuttal (rebuttal effectiveness) and clarity (clarity & delivery).
+        Use only scores stated or unambiguously implied by the analysis; give null for any score it
+        does not state, never an estimate.
+        
+        ANALYSIS:
+        {analysis_text}
+        """
+        generation_config = {'response_mime_type': 'application/json', 'response_schema': SCORES_SCHEMA, 'temperature': 0}
+        return self._generate(prompt, 'extract_scores', bypass_cache, generation_config=generation_config)
+    
+    def _verdict_request(self, debate_history, party1_total_score, party2_total_score):
+        party1_name, party2_name = _party_names(debate_history)
+        return f"""
+        {VERDICT_REQUEST}
+        
+        Here is a compact record of the debate:
+        {build_verdict_context(debate_history, self.verdict_token_budget, self.pivotal_rounds)}
+        
+        FINAL SCORES:
+        {party1_name} Total: {party1_total_score} points
+        {party2_name} Total: {party2_total_score} points
+        """
+    
+    def generate_final_verdict(self, debate_history, topic, party1_total_score, party2_total_score, bypass_cache=False):
+        request = self._verdict_request(debate_history, party1_total_score, party2_total_score)
+        return self._generate(request, 'generate_final_verdict', bypass_cache, debate_context(topic, *_party_names(debate_history)))
+    
+    def stream_final_verdict(self, debate_history, topic, party1_total_score, party2_total_score, bypass_cache=False):
+        """Yield the final verdict in chunks as the model generates it"""
+        request = self._verdict_request(debate_history, party1_total_score, party2_total_score)
+        return self._stream_text(request, 'stream_final_verdict', bypass_cache, debate_context(topic, *_party_names(debate_history)))
+    
+    def _cached_response(self, model_name, prompt, bypass_cache):
+        """Return (cached text or None, cache status for metrics)"""
+        if self.cache is None:
+            return None, 'off'
+        if bypass_cache:
+            return None, 'bypass'
+        cached = self.cache.get(model_name, prompt)
+        return cached, 'hit' if cached is not None else 'miss'
+    
+    def _store_response(self, model_name, prompt, text):
+        # Only successful responses are cached; error strings are never stored
+        if self.cache is not None and text:
+            self.cache.put(model_name, prompt, text)
+    
+    def _observe(self, task, model_name, seconds=None, error=None):
+        """Feed the call's latency (counted from when its request was sent) or error to the router
+        and remember which model answered"""
+        setattr(self._last_models, task, model_name)
+        if self.router is not None:
+            self.router.observe(task, model_name, seconds, error)
+    
+    def _call_model(self, prompt, task, primary, fallback, stream=False, context=None, generation_config=None, queue_waits=None):
+        """Call the model under the task's call policy; returns (response, model name, policy info).
+        
+        Models loaded with the context only get the request; others get the context prepended.
+        Each attempt's wait for a rate-limit slot is appended to queue_waits, also when the call fails;
+        info['latency'] is the answering request's own time, from after its slot was granted.
+        """
+        options = {} if generation_config is None else {'generation_config': generation_config}
+        priority = self.priority or TASK_PRIORITIES[task]
+        queue_waits = [] if queue_waits is None else queue_waits
+        
+        def call(model):
+            contents = prompt if context is None or has_context(model, context) else context + prompt
+            name = _model_name(model)
+            
+            def send(timeout):
+                # Retries and hedges each wait for their own rate-limit slot
+                if self.scheduler is not None:
+                    asked = time.monotonic()
+                    try:
+                        waited = self.scheduler.acquire(self.rate_key, name, priority, self.session_id, timeout)
+                    except SchedulerTimeout:
+                        queue_waits.append(time.monotonic() - asked)
+                        raise
+                    queue_waits.append(waited)
+                    timeout = max(timeout - waited, 0.1)
+                sent = time.monotonic()
+                try:
+                    return model, model.generate_content(contents, stream=stream, request_options={'timeout': timeout}, **options), time.monotonic() - sent
+                except Exception as e:
+                    if self.scheduler is not None and is_quota_error(e):
+                        self.scheduler.report_quota_error(self.rate_key, name)
+                    raise
+            return send
+        
+        (model, response, _), info = call_with_policy(self.policies[task], call(primary), call(fallback) if fallback is not None else None,
+                                                      latency_of=lambda result: result[2])
+        info['queue_wait'] = sum(queue_waits)
+        return response, _model_name(model), info
+    
+    def _generate(self, prompt, method, bypass_cache=False, context=None, model_name=None, generation_config=None):
+        """Return the response text, or an error message if the call fails.
+        
+        bypass_cache skips the cache lookup but still refreshes the stored entry.
+        context is the debate's static prompt, registered with the model instead of resent.
+        """
+        task, error_prefix = METHOD_TASKS[method]
+        primary, fallback = self.models_for(task, context, model_name)
+        primary_name = _model_name(primary)
+        # Cached responses are keyed by the whole prompt, context included, and the generation config
+        full_prompt = prompt if context is None else context + prompt
+        cache_name = primary_name if generation_config is None else f"{primary_name}@{_config_tag(generation_config)}"
+        tracker = CallTracker(self.metrics, method, primary_name, full_prompt, context=_context_status(primary, context))
+        cached, cache_status = self._cached_response(cache_name, full_prompt, bypass_cache)
+        if cached is not None:
+            tracker.finish(cached, cache=cache_status)
+            setattr(self._last_models, task, primary_name)
+            return cached
+        
+        queue_waits = []
+        try:
+            response, answered_by, info = self._call_model(prompt, task, primary, fallback, context=context,
+                                                           generation_config=generation_config, queue_waits=queue_waits)
+            text = response.text
+        except Exception as e:
+            tracker.finish(error=e, cache=cache_status, queue_wait=sum(queue_waits))
+            self._observe(task, primary_name, error=e)
+            return f"{error_prefix}: {str(e)}"
+        
+        latency = info.pop('latency')
+        tracker.finish(text, response=response, cache=cache_status, model=answered_by, **info)
+        self._observe(task, answered_by, latency)
+        # Only cache what the primary model produced, so hedged fallbacks do not stick
+        if answered_by == primary_name:
+            self._store_response(cache_name, full_prompt, text)
+        return text
+    
+    def _stream_text(self, prompt, method, bypass_cache=False, context=None):
+        """Yield response text chunks; a call that fails yields just an error message.
+        
+        Retries and hedging apply until the first chunk arrives; a stream that fails
+        part-way through is not restarted but raises StreamInterrupted after the text
+        already yielded.
+        """
+        task, error_prefix = METHOD_TASKS[method]
+        primary, fallback = self.models_for(task, context)
+        primary_name = _model_name(primary)
+        full_prompt = prompt if context is None else context + prompt
+        tracker = CallTracker(self.metrics, method, primary_name, full_prompt, streamed=True, context=_context_status(primary, context))
+        cached, cache_status = self._cached_response(primary_name, full_prompt, bypass_cache)
+        if cached is not None:
+            tracker.first_byte()
+            tracker.finish(cached, cache=cache_status)
+            setattr(self._last_models, task, primary_name)
+            yield cached
+            return
+        
+        chunks = []
+        last_chunk = None
+        model_name = primary_name
+        info = {}
+        queue_waits = []
+        try:
+            # The SDK fetches the first chunk before returning the stream
+            response, model_name, info = self._call_model(prompt, task, primary, fallback, stream=True, context=context, queue_waits=queue_waits)
+            # The rest of the stream counts towards the latency of the request that answered
+            first_chunk_latency = info.pop('latency')
+            streaming_since = time.monotonic()
+            for chunk in response:
+                tracker.first_byte()
+                # Usage metadata arrives with the final chunk
+                last_chunk = chunk
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety or finish markers)
+                    continue
+                if text:
+                    chunks.append(text)
+                    yield text
+        except Exception as e:
+            info.pop('latency', None)
+            info['queue_wait'] = sum(queue_waits)
+            tracker.finish("".join(chunks), error=e, cache=cache_status, model=model_name, **info)
+            self._observe(task, model_name, error=e)
+            if chunks:
+                raise StreamInterrupted(f"{error_prefix}: {str(e)}") from e
+            yield f"{error_prefix}: {str(e)}"
+            return
+        
+        full_text = "".join(chunks)
+        tracker.finish(full_text, response=last_chunk, cache=cache_status, model=model_name, **info)
+        self._observe(task, model_name, first_chunk_latency + time.monotonic() - streaming_since)
+        # Only cache what the primary model produced, so hedged fallbacks do not stick
+        if model_name == primary_name:
+            self._store_response(primary_name, full_prompt, full_text)
+
+def parse_scores_from_analysis(analysis_text, party1_name, party2_name):
+    """Extract scores from AI analysis text (unparsed values are 0; use parse_scores for status)"""
+    return parse_scores(analysis_text, party1_name, party2_name)['scores']
+
+def parse_streamed_scores(partial_text, party1_name, party2_name):
+    """Extract scores from a partial analysis once its SCORES: block is complete"""
+    result = parse_scores(partial_text, party1_name, party2_name)
+    
+    # Until the last score line ends, its final value may still be arriving
+    if result['status'] != 'ok' or not result['terminated']:
+        return None
+    
+    return result['scores']
@@ -0,0 +1,125 @@
+import pickle
+from array import array
+from itertools import accumulate
+
+from score_parser import CRITERIA
+
+PARTIES = ('party1', 'party2')
+# Bytes per round in a ScoreTable: every criterion of both parties
+ROW_SIZE = len(PARTIES) * len(CRITERIA)
+# Caption fields of a judge ensemble summary kept in session; the full summary is spilled
+ENSEMBLE_CAPTION_KEYS = ('judges', 'valid', 'aggregate', 'confidence', 'quorum_met', 'early_stop')
+# Round fields written to the record store instead of session state
+SPILLED_KEYS = ('party1_argument', 'party2_argument', 'analysis', 'summary', 'ensemble')
+
+
+class ScoreTable:
+    """Per-criterion round scores of both parties, one byte per score.
+
+    This is the only copy of a debate's scores in session state: round breakdowns,
+    running totals and cumulative series are all derived from it on demand.
+    """
+
+    def __init__(self, values=b""):
+        self._values = array('B', values)
+
+    def __len__(self):
+        return len(self._values) // ROW_SIZE
+
+    def append(self, scores):
+        """Add a round's scores (the parse_scores shape); totals are not stored"""
+        self._values.extend(scores[party][criterion] for party in PARTIES for criterion in CRITERIA)
+
+    def round_scores(self, index):
+        """{'party1': {criterion: score, 'total': sum}, 'party2': ...} for round index (0-based)"""
+        row = self._values[index * ROW_SIZE:(index + 1) * ROW_SIZE]
+        scores = {}
+        for offset, party in enumerate(PARTIES):
+            values = row[offset * len(CRITERIA):(offset + 1) * len(CRITERIA)]
+            scores[party] = dict(zip(CRITERIA, values))
+            scores[party]['total'] = sum(values)
+        return scores
+
+    def party_rounds(self, party):
+        """Every round's scores for one party, as stored in exported records"""
+        return [self.round_scores(index)[party] for index in range(len(self))]
+
+    def round_totals(self, party):
+        offset = PARTIES.index(party) * len(CRITERIA)
+        return [sum(self._values[start + offset:start + offset + len(CRITERIA)]) for start in range(0, len(self._values), ROW_SIZE)]
+
+    def totals(self):
+        """Running totals, {'party1': points, 'party2': points}"""
+        return {party: sum(self.round_totals(party)) for party in PARTIES}
+
+    def cumulative(self, party):
+        """Total after each round"""
+        return list(accumulate(self.round_totals(party)))
+
+    def to_state(self):
+        """Hex string for the JSON debate checkpoint"""
+        return self._values.tobytes().hex()
+
+    @classmethod
+    def from_state(cls, value):
+        return cls(bytes.fromhex(value))
+
+    @property
+    def nbytes(self):
+        return len(self._values) * self._values.itemsize
+
+
+def compact_round(round_data, store, debate_id):
+    """Session record for a finished round: its text spilled to store and its scores left to the ScoreTable.
+
+    round_data has the shape of an exported history entry; expand_round reverses this.
+    The text is spilled under debate_id, so discarding it never affects another debate.
+    """
+    handle, spilled_bytes = store.spill({key: round_data[key] for key in SPILLED_KEYS if key in round_data}, debate_id)
+    record = {
+        'round': round_data['round'],
+        'text': handle,
+        'spilled_bytes': spilled_bytes,
+        'model': round_data.get('model'),
+        'score_parse': round_data.get('score_parse'),
+        'timestamp': round_data.get('timestamp')
+    }
+    ensemble = round_data.get('ensemble')
+    if ensemble:
+        details = ensemble['details'] or {}
+        record['ensemble'] = {key: ensemble[key] for key in ENSEMBLE_CAPTION_KEYS}
+        record['ensemble']['max_spread'] = max((detail['spread'] for party in details.values() for detail in party.values()), default=0)
+    return record
+
+
+def expand_round(record, scores, party1_name, party2_name, store):
+    """The full round (as in debate_history before compaction) from its session record and ScoreTable scores"""
+    text = store.load_spilled(record['text'])
+    round_data = {
+        'round': record['round'],
+        'party1_name': party1_name,
+        'party1_argument': text['party1_argument'],
+        'party2_name': party2_name,
+        'party2_argument': text['party2_argument'],
+        'analysis': text['analysis'],
+        'model': record['model'],
+        'scores': scores,
+        'score_parse': record['score_parse'],
+        'timestamp': record['timestamp']
+    }
+    if 'ensemble' in text:
+        round_data['ensemble'] = text['ensemble']
+    if 'summary' in text:
+        round_data['summary'] = text['summary']
+    return round_data
+
+
+def state_bytes(values):
+    """{key: pickled size} of session state values, largest first"""
+    sizes = {}
+    for key, value in values.items():
+        try:
+            sizes[key] = len(pickle.dumps(value))
+        except Exception:
+            sizes[key] = len(repr(value))
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
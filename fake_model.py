@@ -0,0 +1,303 @@
+"""Deterministic local stand-in for a Gemini GenerativeModel.
+
+Select it with DEBATE_MODEL_BACKEND=fake and tune it with DEBATE_FAKE_MODEL, e.g.
+DEBATE_FAKE_MODEL="latency=0.5,tokens_per_second=80,error_rate=0.05,score_format=mixed,rpm=60".
+It implements the part of the SDK DebateHost uses (generate_content with stream,
+request_options and generation_config -- temperature and JSON output --, .text, chunk
+iteration and usage_metadata), so the app, the batch scorer and the benchmarks run
+unchanged and offline.
+"""
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+from debate_context import ROUND_REQUEST, VERDICT_REQUEST, context_id
+from score_parser import CRITERIA, parse_scores
+
+FAKE_MODEL_ENV = "DEBATE_FAKE_MODEL"
+SCORE_FORMATS = ('strict', 'markdown', 'vertical', 'partial', 'missing', 'mixed')
+CHARS_PER_TOKEN = 4
+CHUNK_TOKENS = 16
+MAX_CONTEXT_VIEWS = 256
+
+_ROUND_RE = re.compile(ROUND_REQUEST.format(round_number=r"\d+"))
+_PARTY_RE = re.compile(r"^\s*(.+?)'s Argument:\s*$", re.MULTILINE)
+_TOPIC_RE = re.compile(r'(?:topic:|debate on:)\s*"?([^"\n]+)"?', re.IGNORECASE)
+# The 'partial' format spells one score out, which the parser does not read but a model does
+_NUMBER_WORDS = ('zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten')
+_SPELLED_SCORE_RE = re.compile(r"=(" + "|".join(_NUMBER_WORDS) + r")\b")
+_FILLER = (
+    "The argument was structured clearly and addressed the motion directly. "
+    "Evidence was cited, though not every claim was supported by a source. "
+    "The rebuttal engaged with the opponent's strongest point rather than a weaker one. "
+    "Delivery was concise, with a clear summary at the end. "
+)
+
+
+class FakeServiceUnavailable(Exception):
+    """Injected transient failure; code 503 makes call policies treat it as retryable"""
+    code = 503
+
+
+class FakeTooManyRequests(Exception):
+    """Raised when calls exceed the simulated per-model quota; code 429 marks it as a quota error"""
+    code = 429
+
+
+class FakeTimeout(Exception):
+    """Raised when a fake call would run past its request_options timeout"""
+    code = 504
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, response_tokens, cached_tokens=0):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = response_tokens
+        self.total_token_count = prompt_tokens + response_tokens
+        self.cached_content_token_count = cached_tokens
+
+
+class _Chunk:
+    def __init__(self, text, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class _Response:
+    def __init__(self, text, usage_metadata):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class _Stream:
+    """Streams chunks at the configured token rate; the first chunk is ready on return, like the SDK"""
+
+    def __init__(self, chunks, usage, seconds_per_chunk):
+        self._chunks = chunks
+        self._usage = usage
+        self._seconds_per_chunk = seconds_per_chunk
+
+    def __iter__(self):
+        for index, text in enumerate(self._chunks):
+            if index:
+                time.sleep(self._seconds_per_chunk)
+            last = index == len(self._chunks) - 1
+            yield _Chunk(text, self._usage if last else None)
+
+
+class _ContextCache:
+    """Simulated provider-side prefix cache: context digest -> expiry, shared by a model's context views"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._expiry = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, context):
+        """True if context was sent within the TTL; registers it either way"""
+        key = hashlib.sha256(context.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            hit = self._expiry.get(key, 0.0) > now
+            self._expiry[key] = now + self.ttl
+        return hit
+
+
+class FakeModel:
+    """A GenerativeModel look-alike with configurable latency, token rate, error rate and score formatting.
+
+    latency           -- seconds before the first token
+    tokens_per_second -- output rate after the first token (0 for instant)
+    error_rate        -- probability that a call raises FakeServiceUnavailable
+    score_format      -- SCORES block style: strict, markdown, vertical, partial (one score in words), missing or mixed
+    response_tokens   -- approximate length of analyses and verdicts
+    seed              -- outputs depend only on seed, model name, prompt and temperature
+    context_ttl       -- seconds a debate context stays in the simulated provider cache
+    rpm               -- simulated quota: calls beyond this many per minute raise FakeTooManyRequests (0 for none)
+
+    with_context() returns a view with a debate context registered as its system
+    instruction; a context sent again within context_ttl is reported as cached
+    prompt tokens (usage_metadata.cached_content_token_count), like Gemini does.
+    """
+
+    def __init__(self, model_name="fake-model", latency=0.0, tokens_per_second=0.0, error_rate=0.0,
+                 score_format='strict', response_tokens=400, seed=0, context_ttl=3600.0, rpm=0):
+        if score_format not in SCORE_FORMATS:
+            raise ValueError(f"score_format must be one of {', '.join(SCORE_FORMATS)}")
+        self.model_name = f"models/{model_name}"
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.score_format = score_format
+        self.response_tokens = response_tokens
+        self.seed = seed
+        self.rpm = rpm
+        self.calls = 0
+        self.system_instruction = None
+        self._lock = threading.Lock()
+        # Errors are drawn from one sequence per model, so retries of the same prompt can succeed
+        self._error_rng = random.Random(seed)
+        self._contexts = _ContextCache(context_ttl)
+        # Start times of the calls admitted in the last minute, shared with context views
+        self._admitted = deque()
+        self._views = OrderedDict()
+
+    def with_context(self, context):
+        """This model with context as its system instruction; views share settings, errors and the context cache"""
+        digest = context_id(context)
+        with self._lock:
+            view = self._views.get(digest)
+            if view is None:
+                view = copy.copy(self)
+                view.system_instruction = context
+                view.debate_context = digest
+                view._views = OrderedDict()
+                self._views[digest] = view
+                while len(self._views) > MAX_CONTEXT_VIEWS:
+                    self._views.popitem(last=False)
+            return view
+
+    def _rng(self, prompt, temperature=None):
+        digest = hashlib.sha256(f"{self.seed}:{self.model_name}:{temperature}:{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def generate_content(self, prompt, stream=False, request_options=None, generation_config=None):
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._admitted and self._admitted[0] <= now - 60:
+                self._admitted.popleft()
+            over_quota = bool(self.rpm) and len(self._admitted) >= self.rpm
+            if not over_quota:
+                self._admitted.append(now)
+            fail = self._error_rng.random() < self.error_rate
+        if over_quota:
+            raise FakeTooManyRequests(f"fake model: quota of {self.rpm:g} requests per minute exceeded")
+        timeout = (request_options or {}).get('timeout')
+
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise FakeTimeout(f"fake model did not respond within {timeout:.1f}s")
+        time.sleep(self.latency)
+        if fail:
+            raise FakeServiceUnavailable("fake model: injected 503")
+
+        context = self.system_instruction or ""
+        cached_tokens = len(context) // CHARS_PER_TOKEN if context and self._contexts.lookup(context) else 0
+        generation_config = generation_config or {}
+        if generation_config.get('response_mime_type') == 'application/json':
+            text = self._extraction(prompt)
+        else:
+            text = self.respond(context + prompt, generation_config.get('temperature'))
+        usage = _Usage((len(context) + len(prompt)) // CHARS_PER_TOKEN, len(text) // CHARS_PER_TOKEN, cached_tokens)
+        chunk_chars = CHUNK_TOKENS * CHARS_PER_TOKEN
+        seconds_per_chunk = CHUNK_TOKENS / self.tokens_per_second if self.tokens_per_second else 0.0
+        if stream:
+            chunks = [text[start:start + chunk_chars] for start in range(0, len(text), chunk_chars)] or [""]
+            return _Stream(chunks, usage, seconds_per_chunk)
+        time.sleep(seconds_per_chunk * (len(text) // chunk_chars))
+        return _Response(text, usage)
+
+    def respond(self, prompt, temperature=None):
+        """The full response text for a prompt (sampled differently for each temperature)"""
+        rng = self._rng(prompt, temperature)
+        if VERDICT_REQUEST in prompt:
+            return self._verdict(prompt, rng)
+        if _ROUND_RE.search(prompt):
+            return self._analysis(prompt, rng)
+        topic = _TOPIC_RE.search(prompt)
+        return (f"Welcome to today's debate on \"{topic.group(1).strip() if topic else 'the motion'}\". "
+                "Each side will present an argument per round, and every round is analyzed and scored "
+                "on argument strength, evidence, rebuttal and clarity. Please keep the exchange respectful.")
+
+    def _filler(self, rng, tokens):
+        sentences = _FILLER.split(". ")
+        text = ""
+        while len(text) < tokens * CHARS_PER_TOKEN:
+            text += rng.choice(sentences).strip(". ") + ". "
+        return text.strip()
+
+    def _analysis(self, prompt, rng):
+        names = [name.strip() for name in _PARTY_RE.findall(prompt)][:2]
+        while len(names) < 2:
+            names.append(f"Party {len(names) + 1}")
+        scores = [[rng.randint(3, 10) for _ in range(4)] for _ in names]
+        score_format = rng.choice(SCORE_FORMATS[:-1]) if self.score_format == 'mixed' else self.score_format
+
+        if score_format == 'strict':
+            block = "SCORES:\n" + "".join(
+                f"{name}: Argument={a}, Evidence={e}, Rebuttal={r}, Clarity={c}\n" for name, (a, e, r, c) in zip(names, scores)
+            )
+        elif score_format == 'partial':
+            # The strict block with one score spelled out
+            spelled = rng.randrange(len(names) * 4)
+            values = [[_NUMBER_WORDS[value] if row * 4 + column == spelled else value for column, value in enumerate(party_scores)]
+                      for row, party_scores in enumerate(scores)]
+            block = "SCORES:\n" + "".join(
+                f"{name}: Argument={a}, Evidence={e}, Rebuttal={r}, Clarity={c}\n" for name, (a, e, r, c) in zip(names, values)
+            )
+        elif score_format == 'markdown':
+            block = "**SCORES:**\n\n| Party | Argument | Evidence | Rebuttal | Clarity |\n|---|---|---|---|---|\n" + "".join(
+                f"| **{name}** | Argument: {a} | Evidence: {e} | Rebuttal: {r} | Clarity: {c} |\n" for name, (a, e, r, c) in zip(names, scores)
+            )
+        elif score_format == 'vertical':
+            block = "## Scores\n" + "".join(
+                f"**{name}**\n- Argument Strength: {a}/10\n- Evidence Quality: {e}/10\n- Rebuttal Effectiveness: {r}/10\n- Clarity & Delivery: {c}/10\n"
+                for name, (a, e, r, c) in zip(names, scores)
+            )
+        else:
+            block = ""
+
+        body = self._filler(rng, self.response_tokens)
+        return f"{block}\n**DETAILED ANALYSIS**\n\n{body}\n\n**ROUND ASSESSMENT**\n\n{names[0] if sum(scores[0]) >= sum(scores[1]) else names[1]} had the stronger round."
+
+    def _extraction(self, prompt):
+        """Structured-output answer to a score extraction request: the scores in the text (spelled-out ones
+        included) if all eight are there, else nulls, as SCORES_SCHEMA asks instead of guessing"""
+        names = re.search(r"between (.+?) \(party1\) and (.+?) \(party2\)", prompt)
+        readable = _SPELLED_SCORE_RE.sub(lambda match: f"={_NUMBER_WORDS.index(match.group(1))}", prompt)
+        parsed = parse_scores(readable, *names.groups()) if names else None
+        found = parsed is not None and parsed['status'] == 'ok'
+        return json.dumps({party: {criterion: parsed['scores'][party][criterion] if found else None for criterion in CRITERIA}
+                           for party in ('party1', 'party2')})
+
+    def _verdict(self, prompt, rng):
+        return ("**OVERALL PERFORMANCE SUMMARY**\n\n" + self._filler(rng, self.response_tokens // 2) +
+                "\n\n**FINAL JUDGMENT**\n\n" + self._filler(rng, self.response_tokens // 2))
+
+
+def settings_from_env(value=None):
+    """FakeModel keyword arguments from "key=value,..." (DEBATE_FAKE_MODEL by default)"""
+    value = os.environ.get(FAKE_MODEL_ENV, "") if value is None else value
+    settings = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        key, raw = (part.strip() for part in item.split("=", 1))
+        if key == 'score_format':
+            settings[key] = raw
+        elif key in ('seed', 'response_tokens'):
+            settings[key] = int(raw)
+        elif key in ('latency', 'tokens_per_second', 'error_rate', 'context_ttl', 'rpm'):
+            settings[key] = float(raw)
+    return settings
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_fake_model(model_name, context=None, **settings):
+    """Shared FakeModel per model name, configured from DEBATE_FAKE_MODEL unless settings are given"""
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = FakeModel(model_name, **(settings or settings_from_env()))
+            _models[model_name] = model
+    return model if context is None else model.with_context(context)
@@ -0,0 +1,223 @@
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from call_policy import DEFAULT_POLICIES
+from debate_host import METHOD_TASKS, is_error_response
+from model_routing import resolve_model
+from score_parser import CRITERIA, parse_scores
+
+AGGREGATES = ('median', 'trimmed_mean')
+JUDGES_ENV = "DEBATE_JUDGES"
+# Rubric emphases cycled across judges, so their errors are less correlated
+PERSONAS = (
+    None,
+    "Weigh the quality and sourcing of evidence most heavily.",
+    "Weigh rebuttals and direct engagement with the opponent most heavily."
+)
+
+# Judges of all sessions share one pool; each judge call may hedge on the call policy pool as well
+_judge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="judge")
+
+
+class Judge:
+    """One ensemble member: a model (tier alias or name; None for the routed analysis model),
+    a sampling temperature (None for the model default) and an optional rubric emphasis"""
+
+    def __init__(self, model=None, temperature=None, persona=None):
+        self.model = resolve_model(model) if model else None
+        self.temperature = temperature
+        self.persona = persona
+
+    @property
+    def label(self):
+        label = self.model or "routed"
+        return label if self.temperature is None else f"{label}@{self.temperature:g}"
+
+
+DEFAULT_JUDGES = (
+    Judge(temperature=0.2),
+    Judge(temperature=0.7, persona=PERSONAS[1]),
+    Judge(temperature=0.7, persona=PERSONAS[2])
+)
+
+
+def judges_from_env(value=None):
+    """Judges from "model@temperature,..." (DEBATE_JUDGES by default), e.g. "fast@0.2,fast@0.8,pro";
+    rubric emphases are assigned in turn. Returns DEFAULT_JUDGES when unset."""
+    value = os.environ.get(JUDGES_ENV, "") if value is None else value
+    judges = []
+    for index, item in enumerate(part.strip() for part in value.split(",") if part.strip()):
+        model, _, temperature = item.partition("@")
+        judges.append(Judge(model or None, float(temperature) if temperature else None, PERSONAS[index % len(PERSONAS)]))
+    return tuple(judges) or DEFAULT_JUDGES
+
+
+def trimmed_mean(values, proportion=0.2):
+    """Mean after dropping proportion of the values from each end (at least one each side from 3 values up)"""
+    ordered = sorted(values)
+    cut = int(len(ordered) * proportion) if len(ordered) >= 5 else (1 if len(ordered) >= 3 else 0)
+    kept = ordered[cut:len(ordered) - cut] or ordered
+    return sum(kept) / len(kept)
+
+
+def aggregate_scores(score_sets, method='median'):
+    """Combine per-judge scores into (scores, details).
+
+    scores has the parse_scores shape with each criterion rounded to a whole point;
+    details has the unrounded value, population variance and spread (max - min)
+    of every criterion per party.
+    """
+    if method not in AGGREGATES:
+        raise ValueError(f"aggregate must be one of {', '.join(AGGREGATES)}")
+    combine = statistics.median if method == 'median' else trimmed_mean
+    scores = {}
+    details = {}
+    for party in ('party1', 'party2'):
+        scores[party] = {}
+        details[party] = {}
+        for criterion in CRITERIA:
+            values = [score_set[party][criterion] for score_set in score_sets]
+            value = combine(values)
+            scores[party][criterion] = int(round(value))
+            details[party][criterion] = {
+                'value': value,
+                'variance': statistics.pvariance(values),
+                'spread': max(values) - min(values)
+            }
+        scores[party]['total'] = sum(scores[party][criterion] for criterion in CRITERIA)
+    return scores, details
+
+
+def max_spread(score_sets):
+    """Largest disagreement between judges on any criterion of either party"""
+    return max(
+        max(score_set[party][criterion] for score_set in score_sets) - min(score_set[party][criterion] for score_set in score_sets)
+        for party in ('party1', 'party2')
+        for criterion in CRITERIA
+    )
+
+
+class JudgeEnsemble:
+    """Scores a round with several judges in parallel and aggregates their scores.
+
+    All judges are sent at once, so wall time is that of the slowest judge needed.
+    Only analyses whose SCORES block parses cleanly count. As soon as quorum judges
+    agree within agreement points on every criterion the remaining judges are not
+    waited for; after timeout seconds whatever has arrived is used, and a round with
+    fewer than quorum valid judges is still scored but marked quorum_met=False.
+    """
+
+    def __init__(self, host, judges=None, aggregate='median', quorum=None, agreement=1, timeout=None):
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"aggregate must be one of {', '.join(AGGREGATES)}")
+        self.host = host
+        self.judges = tuple(judges or judges_from_env())
+        self.aggregate = aggregate
+        # A simple majority by default
+        self.quorum = quorum or len(self.judges) // 2 + 1
+        self.agreement = agreement
+        self.timeout = timeout or DEFAULT_POLICIES['analysis'].deadline
+        self.last_result = None
+
+    def _judge(self, judge, args, bypass_cache):
+        started = time.monotonic()
+        analysis = self.host.judge_round(*args, model_name=judge.model, temperature=judge.temperature,
+                                         persona=judge.persona, bypass_cache=bypass_cache)
+        return analysis, self.host.last_model('analysis'), time.monotonic() - started
+
+    def score_round(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic, bypass_cache=False):
+        """Run the judges and return the aggregated result (None for scores if no judge produced valid scores)"""
+        args = (party1_name, party1_argument, party2_name, party2_argument, round_number, topic)
+        started = time.monotonic()
+        futures = {_judge_pool.submit(self._judge, judge, args, bypass_cache): judge for judge in self.judges}
+        pending = set(futures)
+        verdicts = []
+        early_stop = False
+
+        while pending:
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                judge = futures[future]
+                try:
+                    analysis, model, seconds = future.result()
+                except Exception as e:
+                    verdicts.append({'judge': judge.label, 'model': judge.model, 'status': 'error',
+                                     'error': f"{type(e).__name__}: {e}", 'seconds': None, 'analysis': None, 'scores': None})
+                    continue
+                if is_error_response(analysis):
+                    verdicts.append({'judge': judge.label, 'model': model, 'status': 'error',
+                                     'error': analysis, 'seconds': seconds, 'analysis': None, 'scores': None})
+                    continue
+                parsed = parse_scores(analysis, party1_name, party2_name)
+                verdicts.append({'judge': judge.label, 'model': model, 'status': parsed['status'], 'error': None,
+                                 'seconds': seconds, 'analysis': analysis, 'scores': parsed['scores']})
+            valid = [verdict['scores'] for verdict in verdicts if verdict['status'] == 'ok']
+            if pending and len(valid) >= self.quorum and max_spread(valid) <= self.agreement:
+                early_stop = True
+                break
+
+        # Judges still running finish in the background; their results are ignored
+        for future in pending:
+            future.cancel()
+            verdicts.append({'judge': futures[future].label, 'model': futures[future].model, 'status': 'skipped' if early_stop else 'timeout',
+                             'error': None, 'seconds': None, 'analysis': None, 'scores': None})
+
+        valid = [verdict for verdict in verdicts if verdict['status'] == 'ok']
+        result = {
+            'aggregate': self.aggregate,
+            'judges': len(self.judges),
+            'valid': len(valid),
+            'quorum': self.quorum,
+            'quorum_met': len(valid) >= self.quorum,
+            'early_stop': early_stop,
+            'seconds': time.monotonic() - started,
+            'verdicts': verdicts,
+            'scores': None,
+            'details': None,
+            'confidence': 0.0,
+            'model': None,
+            'analysis': None
+        }
+        if valid:
+            scores, details = aggregate_scores([verdict['scores'] for verdict in valid], self.aggregate)
+            mean_deviation = statistics.mean(
+                criterion['variance'] ** 0.5 for party in details.values() for criterion in party.values()
+            )
+            # Full marks for a complete, unanimous panel; less for missing judges or a spread of several points
+            confidence = len(valid) / len(self.judges) * max(0.0, 1.0 - mean_deviation / 5.0)
+            # The judge closest to the aggregate explains the round
+            representative = min(valid, key=lambda verdict: sum(
+                abs(verdict['scores'][party][criterion] - scores[party][criterion])
+                for party in ('party1', 'party2') for criterion in CRITERIA
+            ))
+            result.update(scores=scores, details=details, confidence=round(confidence, 3),
+                          model=representative['model'], analysis=representative['analysis'])
+        self.last_result = result
+        return result
+
+    def stream_analysis(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic, bypass_cache=False):
+        """Yield the representative analysis once the panel is done (or an error message), like DebateHost.stream_analysis.
+
+        The aggregated scores are left in last_result / summary().
+        """
+        result = self.score_round(party1_name, party1_argument, party2_name, party2_argument, round_number, topic, bypass_cache)
+        if result['analysis'] is None:
+            failures = "; ".join(f"{verdict['judge']}: {verdict['error'] or verdict['status']}" for verdict in result['verdicts'])
+            yield f"{METHOD_TASKS['judge_round'][1]}: no judge returned usable scores ({failures})"
+            return
+        yield result['analysis']
+
+    def summary(self):
+        """JSON-serialisable record of the last round's panel, without the judges' full analyses"""
+        if self.last_result is None:
+            return None
+        summary = {key: value for key, value in self.last_result.items() if key not in ('verdicts', 'analysis')}
+        summary['verdicts'] = [
+            {key: value for key, value in verdict.items() if key != 'analysis'} for verdict in self.last_result['verdicts']
+        ]
+        return summary
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+from score_parser import CRITERIA
+
+DEFAULT_LEADERBOARD_PATH = os.path.join("cache", "leaderboard.sqlite3")
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+
+
+def participant_key(name):
+    """Ratings are shared by names that differ only in case or surrounding whitespace"""
+    return " ".join(name.split()).casefold()
+
+
+def expected_score(rating, opponent_rating):
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400.0))
+
+
+def debate_result(debate_data):
+    """The rateable outcome of a saved debate, or None if it lacks two named, scored participants.
+
+    Returns {'names': (party1, party2), 'outcome': party1's result (1, 0.5 or 0),
+    'rounds': (n1, n2), 'criteria': ({criterion: sum}, {criterion: sum}), 'timestamp': ...}
+    """
+    participants = debate_data.get('participants') or []
+    final_scores = debate_data.get('final_scores') or {}
+    if len(participants) != 2 or any(name not in final_scores for name in participants):
+        return None
+    if participant_key(participants[0]) == participant_key(participants[1]):
+        return None
+
+    party1, party2 = participants
+    if final_scores[party1] > final_scores[party2]:
+        outcome = 1.0
+    elif final_scores[party1] < final_scores[party2]:
+        outcome = 0.0
+    else:
+        outcome = 0.5
+
+    round_scores = debate_data.get('round_scores') or {}
+    rounds = []
+    criteria = []
+    for name in participants:
+        party_rounds = round_scores.get(name) or []
+        rounds.append(len(party_rounds))
+        criteria.append({criterion: sum(scores.get(criterion, 0) for scores in party_rounds) for criterion in CRITERIA})
+
+    return {
+        'names': (party1, party2),
+        'outcome': outcome,
+        'rounds': tuple(rounds),
+        'criteria': tuple(criteria),
+        'timestamp': debate_data.get('timestamp') or ""
+    }
+
+
+class Leaderboard:
+    """Materialized Elo ratings and per-criterion score totals for every participant.
+
+    apply_record() updates the two participants of one newly saved debate in a single
+    transaction, so viewing the leaderboard never reads record files. rebuild()
+    recomputes everything from the full archive in timestamp order.
+    """
+
+    def __init__(self, path=DEFAULT_LEADERBOARD_PATH, k_factor=K_FACTOR):
+        self.path = path
+        self.k_factor = k_factor
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        criteria_columns = ", ".join(f"{criterion} INTEGER NOT NULL DEFAULT 0" for criterion in CRITERIA)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS ratings (
+                    key TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    rating REAL NOT NULL,
+                    debates INTEGER NOT NULL DEFAULT 0,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    losses INTEGER NOT NULL DEFAULT 0,
+                    draws INTEGER NOT NULL DEFAULT 0,
+                    rounds INTEGER NOT NULL DEFAULT 0,
+                    {criteria_columns},
+                    last_played TEXT
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS applied (record_id TEXT PRIMARY KEY)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def applied_ids(self):
+        """Ids of the records already counted"""
+        with closing(self._connect()) as conn:
+            return {row['record_id'] for row in conn.execute("SELECT record_id FROM applied")}
+
+    def apply_record(self, record_id, debate_data):
+        """Count one saved debate; returns False if it was already counted or is not rateable"""
+        result = debate_result(debate_data)
+        with self._lock, closing(self._connect()) as conn, conn:
+            if conn.execute("SELECT 1 FROM applied WHERE record_id = ?", (record_id,)).fetchone():
+                return False
+            conn.execute("INSERT INTO applied (record_id) VALUES (?)", (record_id,))
+            if result is None:
+                return False
+
+            rows = []
+            for name in result['names']:
+                row = conn.execute("SELECT * FROM ratings WHERE key = ?", (participant_key(name),)).fetchone()
+                row = dict(row) if row else {
+                    'rating': INITIAL_RATING, 'debates': 0, 'wins': 0, 'losses': 0, 'draws': 0, 'rounds': 0,
+                    **{criterion: 0 for criterion in CRITERIA}
+                }
+                row['key'] = participant_key(name)
+                row['name'] = name
+                rows.append(row)
+
+            delta = self.k_factor * (result['outcome'] - expected_score(rows[0]['rating'], rows[1]['rating']))
+            for index, (row, outcome) in enumerate(zip(rows, (result['outcome'], 1.0 - result['outcome']))):
+                row['rating'] += delta if index == 0 else -delta
+                row['debates'] += 1
+                row['wins'] += outcome == 1.0
+                row['losses'] += outcome == 0.0
+                row['draws'] += outcome == 0.5
+                row['rounds'] += result['rounds'][index]
+                for criterion in CRITERIA:
+                    row[criterion] += result['criteria'][index][criterion]
+                row['last_played'] = max(row.get('last_played') or "", result['timestamp'])
+            self._write(conn, rows)
+            return True
+
+    @staticmethod
+    def _write(conn, rows):
+        columns = ['key', 'name', 'rating', 'debates', 'wins', 'losses', 'draws', 'rounds', *CRITERIA, 'last_played']
+        conn.executemany(
+            f"INSERT OR REPLACE INTO ratings ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            [tuple(row[column] for column in columns) for row in rows]
+        )
+
+    def rebuild(self, records):
+        """Recompute every participant from (record_id, debate_data) pairs; returns the number of rated debates.
+
+        Win/loss and criterion totals are aggregated with pandas; only the Elo pass,
+        which depends on match order, walks the matches, over plain NumPy arrays.
+        """
+        # Only a rebuild needs pandas; importing it lazily keeps it off the app's startup path
+        import numpy as np
+        import pandas as pd
+
+        record_ids = []
+        results = []
+        for record_id, debate_data in records:
+            record_ids.append(record_id)
+            result = debate_result(debate_data)
+            if result is not None:
+                results.append(result)
+        results.sort(key=lambda result: result['timestamp'])
+
+        # One row per participant per debate
+        frame = pd.DataFrame([
+            {
+                'key': participant_key(result['names'][index]),
+                'name': result['names'][index],
+                'outcome': result['outcome'] if index == 0 else 1.0 - result['outcome'],
+                'rounds': result['rounds'][index],
+                'timestamp': result['timestamp'],
+                **result['criteria'][index]
+            }
+            for result in results
+            for index in (0, 1)
+        ], columns=['key', 'name', 'outcome', 'rounds', 'timestamp', *CRITERIA])
+
+        rows = []
+        if not frame.empty:
+            frame['wins'] = (frame['outcome'] == 1.0).astype(int)
+            frame['losses'] = (frame['outcome'] == 0.0).astype(int)
+            frame['draws'] = (frame['outcome'] == 0.5).astype(int)
+            totals = frame.groupby('key', sort=False).agg(
+                name=('name', 'last'),
+                debates=('outcome', 'size'),
+                wins=('wins', 'sum'),
+                losses=('losses', 'sum'),
+                draws=('draws', 'sum'),
+                rounds=('rounds', 'sum'),
+                last_played=('timestamp', 'max'),
+                **{criterion: (criterion, 'sum') for criterion in CRITERIA}
+            )
+
+            codes, keys = pd.factorize(frame['key'])
+            party1_codes = codes[0::2]
+            party2_codes = codes[1::2]
+            outcomes = frame['outcome'].to_numpy()[0::2]
+            ratings = np.full(len(keys), INITIAL_RATING)
+            for party1, party2, outcome in zip(party1_codes, party2_codes, outcomes):
+                delta = self.k_factor * (outcome - expected_score(ratings[party1], ratings[party2]))
+                ratings[party1] += delta
+                ratings[party2] -= delta
+            totals['rating'] = pd.Series(ratings, index=keys)
+
+            for key, row in totals.iterrows():
+                row = row.to_dict()
+                row['key'] = key
+                for column in ('debates', 'wins', 'losses', 'draws', 'rounds', *CRITERIA):
+                    row[column] = int(row[column])
+                row['rating'] = float(row['rating'])
+                rows.append(row)
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM ratings")
+            conn.execute("DELETE FROM applied")
+            self._write(conn, rows)
+            conn.executemany("INSERT INTO applied (record_id) VALUES (?)", [(record_id,) for record_id in record_ids])
+        return len(results)
+
+    def standings(self, min_debates=1):
+        """Participants by rating, with per-round criterion averages"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM ratings WHERE debates >= ? ORDER BY rating DESC", (min_debates,)).fetchall()
+
+        standings = []
+        for row in rows:
+            entry = {
+                'participant': row['name'],
+                'rating': round(row['rating']),
+                'debates': row['debates'],
+                'wins': row['wins'],
+                'losses': row['losses'],
+                'draws': row['draws']
+            }
+            for criterion in CRITERIA:
+                entry[f"avg_{criterion}"] = round(row[criterion] / row['rounds'], 2) if row['rounds'] else None
+            entry['last_played'] = row['last_played']
+            standings.append(entry)
+        return standings
@@ -0,0 +1,225 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+DEFAULT_LOG_PATH = os.path.join("logs", "llm_calls.jsonl")
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def call_latency(call):
+    """A call record's wall time less its wait for rate-limit slots"""
+    return call['wall_time'] - (call['queue_wait'] or 0.0)
+
+
+def _usage(response):
+    """Token usage reported by the API, if any"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return {}
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+        'response_tokens': getattr(usage, 'candidates_token_count', None),
+        'total_tokens': getattr(usage, 'total_token_count', None),
+        # Prompt tokens served from the provider's context cache (explicit or implicit)
+        'cached_tokens': getattr(usage, 'cached_content_token_count', None)
+    }
+
+
+class CallTracker:
+    """Times one model call and hands the finished record to LLMMetrics (no-op without metrics)"""
+
+    def __init__(self, metrics, method, model, prompt, streamed=False, context='off'):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self.record = {
+            'timestamp': datetime.now().isoformat(),
+            'method': method,
+            'model': model,
+            'streamed': streamed,
+            'prompt_chars': len(prompt),
+            'prompt_tokens': None,
+            'response_chars': 0,
+            'response_tokens': None,
+            'total_tokens': None,
+            'cached_tokens': None,
+            'wall_time': None,
+            'time_to_first_byte': None,
+            'status': 'ok',
+            'error_class': None,
+            'cache': 'off',
+            'context': context,
+            'attempts': 0,
+            'hedged': False,
+            'used_fallback': False,
+            'queue_wait': 0.0
+        }
+
+    def first_byte(self):
+        if self.record['time_to_first_byte'] is None:
+            self.record['time_to_first_byte'] = time.perf_counter() - self.started
+
+    def finish(self, text="", response=None, error=None, cache=None, model=None, **call_info):
+        """Complete the record; call_info carries attempts/hedged/used_fallback from the call policy
+        and queue_wait, the seconds spent waiting for rate-limit slots"""
+        self.record['wall_time'] = time.perf_counter() - self.started
+        self.record['response_chars'] = len(text)
+        self.record.update(call_info)
+        if cache is not None:
+            self.record['cache'] = cache
+        if model is not None:
+            self.record['model'] = model
+        if response is not None:
+            self.record.update({key: value for key, value in _usage(response).items() if value is not None})
+        if error is not None:
+            self.record['status'] = 'error'
+            self.record['error_class'] = type(error).__name__
+        if self.metrics is not None:
+            self.metrics.record(self.record)
+
+
+class LLMMetrics:
+    """Collects one record per model call.
+
+    Keeps the most recent calls in memory for the diagnostics panel, appends every
+    call to a JSONL log, and maintains process-lifetime counters and latency
+    histograms that can be exported in the Prometheus text format.
+    """
+
+    def __init__(self, log_path=DEFAULT_LOG_PATH, textfile_path=None, max_recent=1000):
+        self.log_path = log_path
+        self.textfile_path = textfile_path
+        self._recent = deque(maxlen=max_recent)
+        self._lock = threading.Lock()
+        self._calls = defaultdict(int)
+        self._tokens = defaultdict(int)
+        self._latency_sum = defaultdict(float)
+        self._queue_wait_sum = defaultdict(float)
+        self._latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+        for path in (log_path, textfile_path):
+            directory = os.path.dirname(path) if path else None
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+
+    def record(self, call):
+        labels = (call['method'], call['model'])
+        with self._lock:
+            self._recent.append(call)
+            self._calls[labels + (call['status'], call['cache'])] += 1
+            self._tokens[labels + ('prompt',)] += call['prompt_tokens'] or 0
+            self._tokens[labels + ('response',)] += call['response_tokens'] or 0
+            self._tokens[labels + ('cached',)] += call['cached_tokens'] or 0
+            # Waiting for a rate-limit slot is queueing, not model latency, so it is counted apart
+            latency = call_latency(call)
+            self._latency_sum[labels] += latency
+            self._queue_wait_sum[labels] += call['queue_wait'] or 0.0
+            buckets = self._latency_buckets[labels]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    buckets[i] += 1
+            buckets[-1] += 1
+
+            if self.log_path:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(call) + "\n")
+
+        if self.textfile_path:
+            self.write_textfile(self.textfile_path)
+
+    def recent_calls(self):
+        with self._lock:
+            return list(self._recent)
+
+    def summary(self):
+        """Per-method call counts, error counts, latency percentiles (without waits for rate-limit slots, which
+        are reported as p95_queue_s) and token averages over recent calls"""
+        by_method = defaultdict(list)
+        for call in self.recent_calls():
+            by_method[(call['method'], call['model'])].append(call)
+
+        rows = []
+        for (method, model), calls in sorted(by_method.items()):
+            latencies = [call_latency(call) for call in calls if call['cache'] != 'hit']
+            first_bytes = [call['time_to_first_byte'] for call in calls if call['time_to_first_byte'] is not None]
+            queue_waits = [call['queue_wait'] for call in calls if call['cache'] != 'hit']
+            prompt_tokens = [call['prompt_tokens'] for call in calls if call['prompt_tokens'] is not None]
+            response_tokens = [call['response_tokens'] for call in calls if call['response_tokens'] is not None]
+            cache_lookups = [call for call in calls if call['cache'] in ('hit', 'miss')]
+            # A context hit is an API call that was billed some prompt tokens at the cached rate
+            context_calls = [call for call in calls if call['context'] != 'off' and call['prompt_tokens'] is not None]
+            context_prompt_tokens = sum(call['prompt_tokens'] for call in context_calls)
+            cached_tokens = sum(call['cached_tokens'] or 0 for call in context_calls)
+            rows.append({
+                'method': method,
+                'model': model,
+                'calls': len(calls),
+                'errors': sum(1 for call in calls if call['status'] == 'error'),
+                'cache_hit_rate': (sum(1 for call in cache_lookups if call['cache'] == 'hit') / len(cache_lookups)) if cache_lookups else None,
+                'context_hit_rate': (sum(1 for call in context_calls if call['cached_tokens']) / len(context_calls)) if context_calls else None,
+                'cached_token_share': cached_tokens / context_prompt_tokens if context_prompt_tokens else None,
+                'p50_s': percentile(latencies, 50),
+                'p95_s': percentile(latencies, 95),
+                'p99_s': percentile(latencies, 99),
+                'p50_ttfb_s': percentile(first_bytes, 50),
+                'p95_queue_s': percentile(queue_waits, 95),
+                'avg_prompt_tokens': sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else None,
+                'avg_response_tokens': sum(response_tokens) / len(response_tokens) if response_tokens else None
+            })
+        return rows
+
+    def render_prometheus(self):
+        """Process-lifetime counters and latency histograms in the Prometheus text format"""
+        lines = [
+            "# HELP debate_llm_calls_total Model calls made by DebateHost.",
+            "# TYPE debate_llm_calls_total counter"
+        ]
+        with self._lock:
+            for (method, model, status, cache), count in sorted(self._calls.items()):
+                lines.append(f'debate_llm_calls_total{{method="{method}",model="{model}",status="{status}",cache="{cache}"}} {count}')
+
+            lines += [
+                "# HELP debate_llm_tokens_total Tokens reported by the API.",
+                "# TYPE debate_llm_tokens_total counter"
+            ]
+            for (method, model, kind), count in sorted(self._tokens.items()):
+                lines.append(f'debate_llm_tokens_total{{method="{method}",model="{model}",kind="{kind}"}} {count}')
+
+            lines += [
+                "# HELP debate_llm_call_seconds Wall time of model calls, not counting waits for rate-limit slots.",
+                "# TYPE debate_llm_call_seconds histogram"
+            ]
+            for (method, model), buckets in sorted(self._latency_buckets.items()):
+                labels = f'method="{method}",model="{model}"'
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'debate_llm_call_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'debate_llm_call_seconds_bucket{{{labels},le="+Inf"}} {buckets[-1]}')
+                lines.append(f'debate_llm_call_seconds_sum{{{labels}}} {self._latency_sum[(method, model)]:.6f}')
+                lines.append(f'debate_llm_call_seconds_count{{{labels}}} {buckets[-1]}')
+
+            lines += [
+                "# HELP debate_llm_queue_wait_seconds_total Time model calls spent waiting for rate-limit slots.",
+                "# TYPE debate_llm_queue_wait_seconds_total counter"
+            ]
+            for (method, model), seconds in sorted(self._queue_wait_sum.items()):
+                lines.append(f'debate_llm_queue_wait_seconds_total{{method="{method}",model="{model}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Write the Prometheus export atomically, e.g. for node_exporter's textfile collector"""
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from debate_context import CONTEXT_TTL_SECONDS, MIN_CACHED_TOKENS, context_id, estimate_tokens
+
+DEFAULT_MODEL = 'gemini-2.5-pro'
+MAX_API_KEYS = 64
+MAX_CONTEXTS_PER_KEY = 256
+BACKEND_ENV = "DEBATE_MODEL_BACKEND"
+
+
+def key_id(api_key):
+    """Digest of an API key, so raw keys are never used as dictionary keys or shown in stats"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ModelClientRegistry:
+    """Process-wide pool of Gemini clients keyed by API key and model.
+
+    Each API key gets one GenerativeServiceClient, so every model and every session
+    using that key shares the same underlying connection pool. Clients are created
+    on first use under a lock and reused afterwards; the least recently used keys are
+    dropped once more than max_keys are in use.
+    """
+
+    def __init__(self, max_keys=MAX_API_KEYS, max_contexts=MAX_CONTEXTS_PER_KEY,
+                 min_cached_tokens=MIN_CACHED_TOKENS, context_ttl=CONTEXT_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.max_contexts = max_contexts
+        self.min_cached_tokens = min_cached_tokens
+        self.context_ttl = context_ttl
+        self._lock = threading.Lock()
+        # key id -> {'service': GenerativeServiceClient, 'cache_service': CacheServiceClient,
+        #            'models': {model name: GenerativeModel},
+        #            'contexts': {(model name, context id): {'model': GenerativeModel, 'expires': monotonic time or None}}}
+        self._clients = OrderedDict()
+        self.created = 0
+        self.reused = 0
+        self.contexts_created = 0
+        self.contexts_reused = 0
+        self.contexts_explicit = 0
+        self.context_errors = 0
+
+    def get_model(self, api_key, model_name=DEFAULT_MODEL, context=None):
+        """Shared GenerativeModel for this key and model, created on first use.
+
+        With a debate context (see debate_context.py) the model has it registered
+        once: as explicit cached content when it is large enough for the provider,
+        otherwise as a system instruction, whose repeated prefix the provider caches
+        implicitly. Either way later calls send only the request.
+        """
+        # The SDK takes about a second to import, so it is only loaded once a key is in use
+        import google.generativeai as genai
+        from google.ai import generativelanguage as glm
+
+        digest = key_id(api_key)
+        with self._lock:
+            entry = self._clients.get(digest)
+            if entry is None:
+                entry = {
+                    'service': glm.GenerativeServiceClient(client_options={'api_key': api_key}),
+                    'cache_service': glm.CacheServiceClient(client_options={'api_key': api_key}),
+                    'models': {},
+                    'contexts': OrderedDict()
+                }
+                self._clients[digest] = entry
+                while len(self._clients) > self.max_keys:
+                    self._clients.popitem(last=False)
+            self._clients.move_to_end(digest)
+
+            if context is None:
+                model = entry['models'].get(model_name)
+                if model is None:
+                    model = genai.GenerativeModel(model_name)
+                    # Bind the model to this key's client instead of the process-global genai.configure key
+                    model._client = entry['service']
+                    entry['models'][model_name] = model
+                    self.created += 1
+                else:
+                    self.reused += 1
+                return model
+
+            context_key = (model_name, context_id(context))
+            registered = entry['contexts'].get(context_key)
+            if registered is not None and (registered['expires'] is None or registered['expires'] > time.monotonic()):
+                entry['contexts'].move_to_end(context_key)
+                self.contexts_reused += 1
+                return registered['model']
+
+        # Creating cached content is a network call, so it happens outside the lock
+        model, expires = self._register_context(genai, glm, entry, model_name, context)
+        with self._lock:
+            entry['contexts'][context_key] = {'model': model, 'expires': expires}
+            while len(entry['contexts']) > self.max_contexts:
+                entry['contexts'].popitem(last=False)
+            self.contexts_created += 1
+            if expires is not None:
+                self.contexts_explicit += 1
+        return model
+
+    def _register_context(self, genai, glm, entry, model_name, context):
+        """(model with the context registered, expiry of its cached content or None)"""
+        model = None
+        expires = None
+        if estimate_tokens(context) >= self.min_cached_tokens:
+            try:
+                cached = entry['cache_service'].create_cached_content(glm.CreateCachedContentRequest(
+                    cached_content=glm.CachedContent(
+                        model=f"models/{model_name}",
+                        system_instruction=glm.Content(parts=[glm.Part(text=context)]),
+                        ttl=timedelta(seconds=self.context_ttl)
+                    )
+                ))
+                model = genai.GenerativeModel(model_name)
+                model._cached_content = cached.name
+                # Re-register a little before the provider drops the content
+                expires = time.monotonic() + self.context_ttl * 0.9
+            except Exception:
+                # Unsupported model or below its minimum size: fall back to a system instruction
+                with self._lock:
+                    self.context_errors += 1
+        if model is None:
+            model = genai.GenerativeModel(model_name, system_instruction=context)
+        model._client = entry['service']
+        model.debate_context = context_id(context)
+        return model, expires
+
+    def invalidate(self, api_key=None):
+        """Drop pooled clients for a key (all keys if None); they are rebuilt on next use.
+
+        Calls already in flight keep their client until they finish.
+        """
+        with self._lock:
+            if api_key is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(key_id(api_key), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'api_keys': len(self._clients),
+                'models': sum(len(entry['models']) for entry in self._clients.values()),
+                'created': self.created,
+                'reused': self.reused,
+                'contexts': sum(len(entry['contexts']) for entry in self._clients.values()),
+                'contexts_created': self.contexts_created,
+                'contexts_reused': self.contexts_reused,
+                'contexts_explicit': self.contexts_explicit,
+                'context_errors': self.context_errors
+            }
+
+
+_registry = ModelClientRegistry()
+
+
+def get_registry():
+    """The registry shared by every session and worker thread in this process"""
+    return _registry
+
+
+def get_backend():
+    """Configured model backend: 'gemini' (default) or 'fake' for the local stand-in"""
+    return os.environ.get(BACKEND_ENV, "gemini").strip().lower() or "gemini"
+
+
+def model_loader(api_key, backend=None):
+    """Callable returning the shared model object for a model name (and optional debate context) on the configured backend"""
+    if (backend or get_backend()) == "fake":
+        # Imported only when selected, so production deployments never load the stand-in
+        from fake_model import get_fake_model
+        return get_fake_model
+    return lambda model_name, context=None: _registry.get_model(api_key, model_name, context)
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from collections import deque
+
+from call_policy import is_quota_error
+from llm_metrics import percentile
+
+# Most capable first; automatic downgrades step down this list
+MODEL_TIERS = ('gemini-2.5-pro', 'gemini-2.5-flash', 'gemini-2.5-flash-lite')
+TIER_ALIASES = {'pro': 'gemini-2.5-pro', 'fast': 'gemini-2.5-flash', 'lite': 'gemini-2.5-flash-lite'}
+
+# Openings and per-round scoring do not need the largest model; the verdict does.
+# Reading scores back out of an analysis (repair) is a small structured-output task
+DEFAULT_ROUTES = {'opening': 'fast', 'analysis': 'fast', 'verdict': 'pro', 'repair': 'lite'}
+# p95 latency, in seconds, above which a task is moved to the next faster tier
+DEFAULT_LATENCY_SLOS = {'opening': 20.0, 'analysis': 45.0, 'verdict': 120.0, 'repair': 15.0}
+
+ROUTES_ENV = "DEBATE_MODEL_ROUTES"
+
+
+def resolve_model(name):
+    """Full model name for a tier alias ('pro', 'fast', 'lite') or model name"""
+    return TIER_ALIASES.get(name.strip().lower(), name.strip())
+
+
+def routes_from_env(value=None):
+    """Route overrides from "task=model,task=model" (DEBATE_MODEL_ROUTES by default)"""
+    value = os.environ.get(ROUTES_ENV, "") if value is None else value
+    routes = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        task, model = item.split("=", 1)
+        if task.strip() and model.strip():
+            routes[task.strip()] = resolve_model(model)
+    return routes
+
+
+def next_tier(model_name):
+    """The next faster/cheaper model, or None for the last tier and unknown models"""
+    if model_name not in MODEL_TIERS:
+        return None
+    index = MODEL_TIERS.index(model_name)
+    return MODEL_TIERS[index + 1] if index + 1 < len(MODEL_TIERS) else None
+
+
+class ModelRouter:
+    """Picks the model for each task, downgrading temporarily when a model misbehaves.
+
+    A task moves one tier down for cooldown seconds when, over the last window seconds,
+    its current model's p95 latency exceeds the task's SLO (with at least min_samples
+    calls) or it has hit quota_errors quota errors (429 / resource exhausted). Repeated
+    breaches keep stepping down; the configured model is restored after the cooldown.
+    """
+
+    def __init__(self, routes=None, latency_slos=None, window=300.0, min_samples=5,
+                 quota_errors=3, cooldown=600.0):
+        self.routes = {task: resolve_model(model) for task, model in {**DEFAULT_ROUTES, **(routes or {})}.items()}
+        self.latency_slos = {**DEFAULT_LATENCY_SLOS, **(latency_slos or {})}
+        self.window = window
+        self.min_samples = min_samples
+        self.quota_errors = quota_errors
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        # (task, model) -> deque of (timestamp, seconds or None, quota error)
+        self._samples = {}
+        # task -> {'model', 'until', 'reason'}
+        self._downgrades = {}
+
+    def route(self, task):
+        """Model name to use for task right now"""
+        with self._lock:
+            return self._current(task, time.monotonic())
+
+    def _current(self, task, now):
+        downgrade = self._downgrades.get(task)
+        if downgrade is not None:
+            if now < downgrade['until']:
+                return downgrade['model']
+            del self._downgrades[task]
+        return self.routes.get(task, MODEL_TIERS[0])
+
+    def fallback_for(self, model_name):
+        """Model to hedge or fail over to from model_name, or None"""
+        return next_tier(model_name)
+
+    def observe(self, task, model_name, seconds=None, error=None):
+        """Record one call's outcome and downgrade the task if it breaches its SLO or quota"""
+        now = time.monotonic()
+        with self._lock:
+            samples = self._samples.setdefault((task, model_name), deque(maxlen=500))
+            samples.append((now, seconds if error is None else None, error is not None and is_quota_error(error)))
+            while samples and samples[0][0] < now - self.window:
+                samples.popleft()
+
+            # Only the model currently serving the task can push it further down
+            if model_name != self._current(task, now):
+                return
+            latencies = [sample[1] for sample in samples if sample[1] is not None]
+            quota_errors = sum(1 for sample in samples if sample[2])
+            slo = self.latency_slos.get(task)
+            reason = None
+            if quota_errors >= self.quota_errors:
+                reason = f"{quota_errors} quota errors in {self.window:.0f}s"
+            elif slo is not None and len(latencies) >= self.min_samples and percentile(latencies, 95) > slo:
+                reason = f"p95 {percentile(latencies, 95):.1f}s over {slo:.0f}s SLO"
+            if reason is None:
+                return
+
+            downgraded = next_tier(model_name)
+            if downgraded is None:
+                return
+            self._downgrades[task] = {'model': downgraded, 'until': now + self.cooldown, 'reason': f"{model_name}: {reason}"}
+            samples.clear()
+
+    def status(self):
+        """Configured and current model per task, with the reason for any active downgrade"""
+        now = time.monotonic()
+        with self._lock:
+            rows = []
+            for task, configured in sorted(self.routes.items()):
+                current = self._current(task, now)
+                downgrade = self._downgrades.get(task)
+                rows.append({
+                    'task': task,
+                    'configured': configured,
+                    'current': current,
+                    'downgraded_for_s': round(downgrade['until'] - now) if downgrade else None,
+                    'reason': downgrade['reason'] if downgrade else None
+                })
+            return rows
+
+
+_router = ModelRouter(routes=routes_from_env())
+
+
+def get_router():
+    """The router shared by every session and worker thread, with this deployment's DEBATE_MODEL_ROUTES"""
+    return _router
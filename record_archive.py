@@ -0,0 +1,410 @@
+"""Compact archive for debate records, with a migration tool from the records directory.
+
+    python record_archive.py migrate records/ [--archive archive/] [--remove-source]
+    python record_archive.py show <record id> [--archive archive/]
+
+Text lives in append-only segment files made of one gzip member per record, so a
+record is read with one index lookup, one seek and one small decompression. Scores
+go to Parquet files (one row per participant per round) for columnar analytics.
+Records are stored without the fields the app duplicates (round_scores, party names
+in every round, final_scores) and expanded back to the app's format on read.
+
+The app appends every debate it saves and lists archived records in the Records
+tab, keyed by their original file name, so migrated record files can be removed.
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing
+
+from record_store import iter_record_paths
+from score_parser import CRITERIA
+
+DEFAULT_ARCHIVE_DIR = "archive"
+MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+# Score parts written by single-record appends are merged once there are this many
+MAX_SCORE_PARTS = 32
+SCORE_COLUMNS = ['record_id', 'timestamp', 'topic', 'round', 'party', 'participant', *CRITERIA, 'total']
+
+
+def record_id_for(path, debate_data=None):
+    """A record's id: its own record_id field if it has one, otherwise the file name without .json"""
+    if debate_data and debate_data.get('record_id'):
+        return debate_data['record_id']
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _derived_round_scores(debate_data):
+    participants = debate_data.get('participants') or []
+    if len(participants) != 2:
+        return None
+    history = debate_data.get('history') or []
+    if any('scores' not in round_data for round_data in history):
+        return None
+    return {
+        participants[0]: [round_data['scores']['party1'] for round_data in history],
+        participants[1]: [round_data['scores']['party2'] for round_data in history]
+    }
+
+
+def _derived_final_scores(debate_data):
+    round_scores = _derived_round_scores(debate_data)
+    if round_scores is None:
+        return None
+    return {name: sum(scores['total'] for scores in rounds) for name, rounds in round_scores.items()}
+
+
+def pack(debate_data):
+    """Drop every field that can be rebuilt exactly from the rest of the record"""
+    packed = dict(debate_data)
+    participants = debate_data.get('participants') or []
+
+    if 'round_scores' in packed and packed['round_scores'] == _derived_round_scores(debate_data):
+        del packed['round_scores']
+        packed['_derived'] = packed.get('_derived', []) + ['round_scores']
+    if 'final_scores' in packed and packed['final_scores'] == _derived_final_scores(debate_data):
+        del packed['final_scores']
+        packed['_derived'] = packed.get('_derived', []) + ['final_scores']
+    if packed.get('rounds') == len(debate_data.get('history') or []):
+        del packed['rounds']
+        packed['_derived'] = packed.get('_derived', []) + ['rounds']
+
+    if len(participants) == 2 and 'history' in packed:
+        history = []
+        for round_data in packed['history']:
+            round_data = dict(round_data)
+            # Party names are the record's participants in nearly every round
+            if round_data.get('party1_name') == participants[0] and round_data.get('party2_name') == participants[1]:
+                del round_data['party1_name']
+                del round_data['party2_name']
+            history.append(round_data)
+        packed['history'] = history
+
+    if expand(packed) != debate_data:
+        # Anything unusual is kept exactly as it was
+        return {'_raw': debate_data}
+    return packed
+
+
+def expand(packed):
+    """The record in the app's format, as it was before pack()"""
+    if '_raw' in packed:
+        return packed['_raw']
+
+    debate_data = {key: value for key, value in packed.items() if key != '_derived'}
+    participants = debate_data.get('participants') or []
+    if len(participants) == 2 and 'history' in debate_data:
+        history = []
+        for round_data in debate_data['history']:
+            if 'party1_name' not in round_data:
+                round_data = {'party1_name': participants[0], 'party2_name': participants[1], **round_data}
+            history.append(round_data)
+        debate_data['history'] = history
+
+    derived = packed.get('_derived', [])
+    if 'rounds' in derived:
+        debate_data['rounds'] = len(debate_data.get('history') or [])
+    if 'final_scores' in derived:
+        debate_data['final_scores'] = _derived_final_scores(debate_data)
+    if 'round_scores' in derived:
+        debate_data['round_scores'] = _derived_round_scores(debate_data)
+    return _ordered_like_app(debate_data)
+
+
+# Key order of records written by the app, so expanded records serialize the same way
+_APP_KEY_ORDER = ['record_id', 'topic', 'participants', 'rounds', 'final_scores', 'round_scores', 'history', 'final_verdict', 'timestamp']
+_APP_ROUND_KEY_ORDER = ['round', 'party1_name', 'party1_argument', 'party2_name', 'party2_argument', 'analysis', 'scores', 'timestamp']
+
+
+def _ordered(data, key_order):
+    ordered = {key: data[key] for key in key_order if key in data}
+    ordered.update((key, value) for key, value in data.items() if key not in ordered)
+    return ordered
+
+
+def _ordered_like_app(debate_data):
+    if isinstance(debate_data.get('history'), list):
+        debate_data['history'] = [_ordered(round_data, _APP_ROUND_KEY_ORDER) for round_data in debate_data['history']]
+    return _ordered(debate_data, _APP_KEY_ORDER)
+
+
+def score_rows(record_id, debate_data):
+    """One row per participant per round for the Parquet score files"""
+    participants = debate_data.get('participants') or []
+    rows = []
+    for index, round_data in enumerate(debate_data.get('history') or [], 1):
+        for party_number, party in enumerate(('party1', 'party2'), 1):
+            scores = (round_data.get('scores') or {}).get(party)
+            if not scores:
+                continue
+            rows.append({
+                'record_id': record_id,
+                'timestamp': debate_data.get('timestamp'),
+                'topic': debate_data.get('topic'),
+                'round': round_data.get('round', index),
+                'party': party_number,
+                'participant': round_data.get(f"{party}_name") or (participants[party_number - 1] if len(participants) == 2 else None),
+                **{criterion: scores.get(criterion, 0) for criterion in CRITERIA},
+                'total': scores.get('total', 0)
+            })
+    return rows
+
+
+class RecordArchive:
+    """Append-only compressed segments for record text, Parquet for scores, SQLite for the id index"""
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR, max_segment_bytes=MAX_SEGMENT_BYTES):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.segments_dir = os.path.join(directory, "segments")
+        self.scores_dir = os.path.join(directory, "scores")
+        self._lock = threading.Lock()
+
+        for path in (self.segments_dir, self.scores_dir):
+            os.makedirs(path, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    record_id TEXT PRIMARY KEY,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    topic TEXT,
+                    participants TEXT,
+                    timestamp TEXT,
+                    archived_at REAL NOT NULL,
+                    filename TEXT
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+            if 'filename' not in columns:
+                # Archives written before the app read from them
+                conn.execute("ALTER TABLE records ADD COLUMN filename TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS records_filename ON records (filename)")
+            conn.execute("CREATE INDEX IF NOT EXISTS records_archived_at ON records (archived_at)")
+
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30)
+
+    def _current_segment(self):
+        segments = sorted(name for name in os.listdir(self.segments_dir) if name.endswith(".jsonl.gz"))
+        if segments:
+            path = os.path.join(self.segments_dir, segments[-1])
+            if os.path.getsize(path) < self.max_segment_bytes:
+                return segments[-1]
+            number = int(segments[-1].split("-")[1].split(".")[0]) + 1
+        else:
+            number = 1
+        return f"segment-{number:06d}.jsonl.gz"
+
+    def append_records(self, records):
+        """Archive (record_id, debate_data, filename) triples; returns how many were new.
+
+        filename is the record's name in the records directory, which the app uses as
+        its id. Every record becomes its own gzip member, so the segment stays one valid
+        gzip stream of JSON lines while any record can be decompressed on its own.
+        """
+        records = list(records)
+        with self._lock, closing(self._connect()) as conn, conn:
+            existing = {row[0] for row in conn.execute("SELECT record_id FROM records")}
+            index_rows = []
+            scores = []
+            segment = None
+            handle = None
+            try:
+                for record_id, debate_data, filename in records:
+                    if record_id in existing:
+                        continue
+                    existing.add(record_id)
+                    member = gzip.compress((json.dumps(pack(debate_data), separators=(",", ":")) + "\n").encode("utf-8"))
+
+                    if handle is None or handle.tell() + len(member) > self.max_segment_bytes:
+                        if handle is not None:
+                            handle.close()
+                        segment = self._current_segment()
+                        handle = open(os.path.join(self.segments_dir, segment), 'ab')
+                    offset = handle.tell()
+                    handle.write(member)
+
+                    index_rows.append((
+                        record_id, segment, offset, len(member), debate_data.get('topic'),
+                        json.dumps(debate_data.get('participants', [])), debate_data.get('timestamp'), time.time(), filename
+                    ))
+                    scores.extend(score_rows(record_id, debate_data))
+                if handle is not None:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            finally:
+                if handle is not None:
+                    handle.close()
+
+            if scores:
+                import pandas as pd
+                part = os.path.join(self.scores_dir, f"part-{time.time_ns()}.parquet")
+                pd.DataFrame(scores, columns=SCORE_COLUMNS).to_parquet(part, index=False)
+            # The index is committed last: a crash before this leaves only unreferenced bytes behind
+            conn.executemany(
+                "INSERT INTO records (record_id, segment, offset, length, topic, participants, timestamp, archived_at, filename) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                index_rows
+            )
+        if scores and len(self._score_parts()) > MAX_SCORE_PARTS:
+            self.compact_scores()
+        return len(index_rows)
+
+    def append_record(self, record_id, debate_data, filename=None):
+        return self.append_records([(record_id, debate_data, filename)]) == 1
+
+    def get(self, record_id):
+        """One record in the app's format, or None; reads only that record's bytes"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT segment, offset, length FROM records WHERE record_id = ?", (record_id,)).fetchone()
+        if row is None:
+            return None
+        segment, offset, length = row
+        with open(os.path.join(self.segments_dir, segment), 'rb') as f:
+            f.seek(offset)
+            return expand(json.loads(gzip.decompress(f.read(length))))
+
+    def get_by_filename(self, filename):
+        """The record archived from the records-directory file filename, or None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT record_id FROM records WHERE {_FILENAME} = ?", (filename,)).fetchone()
+        return self.get(row[0]) if row else None
+
+    def archived_since(self, position=0):
+        """[(filename, record_id)] archived after position, and the position to resume from next time"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT rowid, {_FILENAME}, record_id FROM records WHERE rowid > ? ORDER BY rowid", (position,)).fetchall()
+        return [(filename, record_id) for _, filename, record_id in rows], (rows[-1][0] if rows else position)
+
+    def filenames(self):
+        """File names of every archived record"""
+        with closing(self._connect()) as conn:
+            return {row[0] for row in conn.execute(f"SELECT {_FILENAME} FROM records")}
+
+    def list_records(self):
+        """Summaries of archived records, most recent first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT record_id, topic, participants, timestamp FROM records ORDER BY timestamp DESC").fetchall()
+        return [
+            {'record_id': record_id, 'topic': topic, 'participants': json.loads(participants), 'timestamp': timestamp}
+            for record_id, topic, participants, timestamp in rows
+        ]
+
+    def _score_parts(self):
+        return sorted(os.path.join(self.scores_dir, name) for name in os.listdir(self.scores_dir) if name.endswith(".parquet"))
+
+    def scores(self, columns=None):
+        """Every archived round score as a DataFrame (one row per participant per round)"""
+        import pandas as pd
+        parts = self._score_parts()
+        if not parts:
+            return pd.DataFrame(columns=columns or SCORE_COLUMNS)
+        return pd.concat([pd.read_parquet(part, columns=columns) for part in parts], ignore_index=True)
+
+    def compact_scores(self):
+        """Merge the Parquet parts written by individual appends into one file"""
+        import pandas as pd
+        with self._lock:
+            parts = self._score_parts()
+            if len(parts) < 2:
+                return
+            merged = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+            target = os.path.join(self.scores_dir, f"part-{time.time_ns()}.parquet")
+            merged.to_parquet(target + ".tmp", index=False)
+            os.replace(target + ".tmp", target)
+            for part in parts:
+                os.remove(part)
+
+    def disk_usage(self):
+        """Bytes used by segments, score files and the index"""
+        usage = {'segments': 0, 'scores': 0, 'index': 0}
+        for key, directory in (('segments', self.segments_dir), ('scores', self.scores_dir)):
+            for name in os.listdir(directory):
+                usage[key] += os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(self.directory):
+            if name.startswith("index.sqlite3"):
+                usage['index'] += os.path.getsize(os.path.join(self.directory, name))
+        return usage
+
+
+# Rows archived before file names were recorded are named like legacy flat record files
+_FILENAME = "COALESCE(filename, record_id || '.json')"
+
+
+def iter_record_files(records_dir):
+    """(path, debate data) for every readable record file, flat and sharded"""
+    for path in iter_record_paths(records_dir):
+        try:
+            with open(path, 'r') as f:
+                yield path, json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"skipping {path}: {e}", file=sys.stderr)
+
+
+def migrate(records_dir, archive, remove_source=False, batch_size=500):
+    """Copy every record file into the archive, verifying each round trip; returns (archived, source bytes)"""
+    archived = 0
+    source_bytes = 0
+    batch = []
+
+    def flush():
+        nonlocal archived
+        archived += archive.append_records((record_id, data, os.path.basename(path)) for path, record_id, data in batch)
+        for path, record_id, data in batch:
+            if archive.get(record_id) != data:
+                raise RuntimeError(f"{path} did not round-trip through the archive")
+            if remove_source:
+                os.remove(path)
+        batch.clear()
+
+    for path, data in iter_record_files(records_dir):
+        source_bytes += os.path.getsize(path)
+        batch.append((path, record_id_for(path, data), data))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    archive.compact_scores()
+    return archived, source_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact debate record archive.")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_DIR, help="archive directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = commands.add_parser("migrate", help="copy a records directory into the archive")
+    migrate_parser.add_argument("records_dir", nargs="?", default="records")
+    migrate_parser.add_argument("--remove-source", action="store_true",
+                                help="delete each record file once it is archived and verified; the app keeps listing it from the archive")
+    show_parser = commands.add_parser("show", help="print one archived record as JSON")
+    show_parser.add_argument("record_id")
+    args = parser.parse_args(argv)
+
+    archive = RecordArchive(args.archive)
+    if args.command == "show":
+        debate_data = archive.get(args.record_id)
+        if debate_data is None:
+            print(f"No archived record {args.record_id}", file=sys.stderr)
+            return 1
+        print(json.dumps(debate_data, indent=2))
+        return 0
+
+    started = time.perf_counter()
+    archived, source_bytes = migrate(args.records_dir, archive, args.remove_source)
+    usage = archive.disk_usage()
+    print(f"Archived {archived} record(s) in {time.perf_counter() - started:.1f}s; "
+          f"{source_bytes / 1024:.0f} KB of JSON -> {usage['segments'] / 1024:.0f} KB segments, "
+          f"{usage['scores'] / 1024:.0f} KB scores, {usage['index'] / 1024:.0f} KB index", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
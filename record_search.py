@@ -0,0 +1,121 @@
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+
+DEFAULT_SEARCH_PATH = os.path.join("cache", "records_search.sqlite3")
+
+# bm25() weights for the indexed columns; record_id and round are stored but not indexed
+COLUMN_WEIGHTS = {'topic': 2.0, 'party1_argument': 1.0, 'party2_argument': 1.0, 'analysis': 0.75, 'final_verdict': 0.75}
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+SNIPPET_TOKENS = 24
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_query(text):
+    """FTS5 query requiring every word in text, with the last word matched as a prefix.
+
+    User input is reduced to plain words, so quotes and operators never cause syntax errors.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return " ".join(terms)
+
+
+class RecordSearchIndex:
+    """BM25-ranked full-text index over saved arguments, analyses and verdicts.
+
+    Backed by an SQLite FTS5 inverted index with one document per round (plus one for
+    the final verdict), updated per record as records are saved, so a search is a
+    single index query that never opens record files.
+    """
+
+    def __init__(self, path=DEFAULT_SEARCH_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+                    record_id UNINDEXED,
+                    round UNINDEXED,
+                    {', '.join(COLUMN_WEIGHTS)},
+                    tokenize = 'porter unicode61'
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS indexed (record_id TEXT PRIMARY KEY)")
+            # Records that could not be read, so backfills do not retry them every time
+            conn.execute("CREATE TABLE IF NOT EXISTS unreadable (record_id TEXT PRIMARY KEY)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def indexed_ids(self):
+        with closing(self._connect()) as conn:
+            return {row['record_id'] for row in conn.execute("SELECT record_id FROM indexed")}
+
+    def known_ids(self):
+        """Records that are indexed or were found unreadable"""
+        with closing(self._connect()) as conn:
+            return {row['record_id'] for row in conn.execute("SELECT record_id FROM indexed UNION SELECT record_id FROM unreadable")}
+
+    def mark_unreadable(self, record_ids):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR IGNORE INTO unreadable (record_id) VALUES (?)", [(record_id,) for record_id in record_ids])
+
+    def index_record(self, record_id, debate_data):
+        """Add or replace one record's documents"""
+        topic = debate_data.get('topic') or ""
+        documents = [
+            (record_id, round_data.get('round', number), topic,
+             round_data.get('party1_argument') or "", round_data.get('party2_argument') or "",
+             round_data.get('analysis') or "", "")
+            for number, round_data in enumerate(debate_data.get('history') or [], 1)
+        ]
+        if debate_data.get('final_verdict'):
+            documents.append((record_id, None, topic, "", "", "", debate_data['final_verdict']))
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM documents WHERE record_id = ?", (record_id,))
+            conn.executemany("INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)", documents)
+            conn.execute("INSERT OR IGNORE INTO indexed (record_id) VALUES (?)", (record_id,))
+            conn.execute("DELETE FROM unreadable WHERE record_id = ?", (record_id,))
+
+    def remove_records(self, record_ids):
+        with self._lock, closing(self._connect()) as conn, conn:
+            for record_id in record_ids:
+                conn.execute("DELETE FROM documents WHERE record_id = ?", (record_id,))
+                conn.execute("DELETE FROM indexed WHERE record_id = ?", (record_id,))
+                conn.execute("DELETE FROM unreadable WHERE record_id = ?", (record_id,))
+
+    def search(self, text, limit=20, offset=0):
+        """Matching rounds and verdicts, best first.
+
+        Each hit has record_id, round (None for a final verdict), topic, score
+        (higher is better) and a snippet with matches wrapped in ** for markdown.
+        """
+        query = to_match_query(text)
+        if query is None:
+            return []
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS.values())
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"""SELECT record_id, round, topic, -bm25(documents, 0, 0, {weights}) AS score,
+                           snippet(documents, -1, ?, ?, '…', ?) AS snippet
+                    FROM documents WHERE documents MATCH ?
+                    ORDER BY bm25(documents, 0, 0, {weights}) LIMIT ? OFFSET ?""",
+                (HIGHLIGHT_START, HIGHLIGHT_END, SNIPPET_TOKENS, query, limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+
+MANIFEST_NAME = "manifest.jsonl"
+# Round text of debates in progress, kept out of session state (see RecordStore.spill)
+SPILL_DIR = "spill"
+
+
+def new_record_id(when=None):
+    """Sortable, collision-free id: save time plus a random suffix"""
+    when = when or datetime.now()
+    return f"{when:%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+
+
+class RecordStore:
+    """Writes debate records atomically into date-sharded directories.
+
+    Each record gets a unique id and is written to a temporary file in its shard
+    (records/YYYY/MM/DD/), fsynced and renamed into place, so readers never see a
+    partial file and concurrent saves never overwrite each other. Every saved record
+    is then appended to records/manifest.jsonl, which lets the catalog pick up new
+    records without listing any directory.
+    """
+
+    def __init__(self, records_dir="records"):
+        self.records_dir = records_dir
+        self.manifest_path = os.path.join(records_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        os.makedirs(records_dir, exist_ok=True)
+
+    def save(self, debate_data):
+        """Write a record and return (record id, path)"""
+        now = datetime.now()
+        record_id = new_record_id(now)
+        directory = os.path.join(self.records_dir, f"{now:%Y}", f"{now:%m}", f"{now:%d}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"debate_{record_id}.json")
+
+        # The .part suffix keeps unfinished files out of every *.json scan
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".debate_", suffix=".json.part")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'record_id': record_id, **debate_data}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._append_manifest({
+            'record_id': record_id,
+            'path': os.path.relpath(path, self.records_dir),
+            'saved_at': now.isoformat()
+        })
+        return record_id, path
+
+    def spill(self, data, owner=""):
+        """Write a JSON-serializable value to the spill area; returns (handle, bytes on disk).
+
+        Files are named by a hash of the owner (a debate id) and the content, so one owner
+        spilling the same value twice (e.g. a round restored from a checkpoint) writes
+        nothing new, while values of different owners never share a file and can be
+        discarded independently.
+        """
+        payload = json.dumps(data, sort_keys=True).encode("utf-8")
+        handle = hashlib.sha256(owner.encode("utf-8") + b"\0" + payload).hexdigest()[:32]
+        path = self._spill_path(handle)
+        if os.path.exists(path):
+            # Reused values count as new, so expire_spilled leaves them alone
+            os.utime(path)
+            return handle, os.path.getsize(path)
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        compressed = gzip.compress(payload, compresslevel=6)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".spill_", suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return handle, len(compressed)
+
+    def load_spilled(self, handle):
+        """The value spilled under handle (shared, so callers must not modify it)"""
+        return _read_spilled(self._spill_path(handle))
+
+    def discard_spilled(self, handles):
+        """Delete spilled values, e.g. the round text of a debate that was reset; missing ones are skipped"""
+        for handle in handles:
+            try:
+                os.remove(self._spill_path(handle))
+            except FileNotFoundError:
+                pass
+        _read_spilled.cache_clear()
+
+    def expire_spilled(self, max_age_seconds):
+        """Delete spilled values (and unfinished temporary files) not written for max_age_seconds,
+        left behind by debates that were never reset; returns how many were deleted"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.records_dir, SPILL_DIR)):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        if removed:
+            _read_spilled.cache_clear()
+        return removed
+
+    def _spill_path(self, handle):
+        return os.path.join(self.records_dir, SPILL_DIR, handle[:2], f"{handle}.json.gz")
+
+    def _append_manifest(self, entry):
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        # A single O_APPEND write per entry, so lines from concurrent writers never interleave
+        with self._lock:
+            fd = os.open(self.manifest_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+
+@lru_cache(maxsize=256)
+def _read_spilled(path):
+    # Spilled files never change, so recently shown rounds are served from memory
+    with gzip.open(path, 'rb') as f:
+        return json.loads(f.read())
+
+
+def read_manifest(records_dir, offset=0):
+    """Manifest entries after byte offset, and the offset to resume from next time.
+
+    A trailing line that is still being written is left for the next read; if the
+    manifest has shrunk (e.g. was recreated), reading restarts from the beginning.
+    """
+    path = os.path.join(records_dir, MANIFEST_NAME)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return [], 0
+    if size < offset:
+        offset = 0
+
+    entries = []
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data[:data.rfind(b"\n") + 1]
+    for line in complete.splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries, offset + len(complete)
+
+
+def iter_record_paths(records_dir):
+    """Every record file under records_dir, flat (legacy) and sharded, in sorted order"""
+    for root, directories, files in os.walk(records_dir):
+        directories[:] = sorted(name for name in directories if not (root == records_dir and name == SPILL_DIR))
+        for name in sorted(files):
+            if name.endswith(".json"):
+                yield os.path.join(root, name)
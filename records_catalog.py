@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import timedelta
+
+from record_store import iter_record_paths, read_manifest
+
+DEFAULT_CATALOG_PATH = os.path.join("cache", "records_catalog.sqlite3")
+SCHEMA_VERSION = "2"
+
+SORT_ORDERS = {
+    'newest': "timestamp DESC, filename DESC",
+    'oldest': "timestamp ASC, filename ASC",
+    'highest_score': "top_score DESC, filename DESC",
+    'lowest_score': "top_score ASC, filename DESC",
+    'topic': "topic COLLATE NOCASE ASC, filename DESC"
+}
+
+
+class RecordsCatalog:
+    """SQLite index of the debate records directory.
+
+    Stores the summary fields the Records tab lists (topic, participants, rounds,
+    final scores, timestamp) and re-parses a record file only when its mtime or
+    size changes, so listing records never touches the JSON files themselves.
+    With an archive (RecordArchive), archived records are listed too, under the
+    file name they were archived from, whether or not that file still exists.
+    """
+
+    def __init__(self, records_dir="records", path=DEFAULT_CATALOG_PATH, archive=None):
+        self.records_dir = records_dir
+        self.path = path
+        self.archive = archive
+        self._lock = threading.Lock()
+
+        # The catalog lives outside the records directory so its own journal files
+        # never change the directory mtime that refresh() relies on
+        for directory in (records_dir, os.path.dirname(path)):
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+            # The catalog can always be rebuilt from the record files, so schema changes just reindex
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if not row or row[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS records")
+                conn.execute("DELETE FROM meta")
+                conn.execute("INSERT INTO meta (key, value) VALUES ('schema_version', ?)", (SCHEMA_VERSION,))
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    filename TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    topic TEXT,
+                    participants TEXT,
+                    rounds INTEGER,
+                    final_scores TEXT,
+                    top_score INTEGER,
+                    timestamp TEXT,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS records_timestamp ON records (timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS records_top_score ON records (top_score)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def refresh(self, force=False):
+        """Bring the index up to date with the records directory; returns the number of changed entries.
+
+        Records saved through RecordStore are picked up from its manifest, read on from
+        where the last refresh stopped, so no shard directory is listed. The top level
+        (legacy flat records) is only listed when its own mtime has changed; force walks
+        every shard as well and drops entries whose files are gone.
+        """
+        dir_mtime = str(os.stat(self.records_dir).st_mtime_ns)
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            changed = 0
+
+            entries, manifest_offset = read_manifest(self.records_dir, int(meta.get('manifest_offset', 0)))
+            for entry in entries:
+                path = os.path.join(self.records_dir, entry['path'])
+                if os.path.exists(path):
+                    self._upsert(conn, path, os.stat(path))
+                    changed += 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('manifest_offset', ?)", (str(manifest_offset),))
+
+            if self.archive is not None:
+                changed += self._add_archived(conn, int(meta.get('archive_position', 0)))
+
+            if force:
+                paths = list(iter_record_paths(self.records_dir))
+            elif meta.get('dir_mtime_ns') != dir_mtime:
+                with os.scandir(self.records_dir) as dir_entries:
+                    paths = [entry.path for entry in dir_entries if entry.name.endswith(".json") and entry.is_file()]
+            else:
+                return changed
+
+            indexed = {
+                filename: (path, mtime_ns, size)
+                for filename, path, mtime_ns, size in conn.execute("SELECT filename, path, mtime_ns, size FROM records")
+            }
+
+            seen = set()
+            for path in paths:
+                filename = os.path.basename(path)
+                seen.add(filename)
+                stat = os.stat(path)
+                if filename in indexed and indexed[filename][1:] == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                self._upsert(conn, path, stat)
+                changed += 1
+
+            # Without force only the top level was listed, so only flat records can be known to be gone;
+            # archived records stay listed without their files
+            archived = self.archive.filenames() if self.archive is not None else set()
+            removed = [
+                (filename,) for filename, (path, _, _) in indexed.items()
+                if filename not in seen and filename not in archived and (force or os.path.dirname(path) == self.records_dir)
+            ]
+            conn.executemany("DELETE FROM records WHERE filename = ?", removed)
+
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime_ns', ?)", (dir_mtime,))
+            return changed + len(removed)
+
+    def _add_archived(self, conn, position):
+        """List records archived since position that the catalog does not know yet; returns how many"""
+        archived, position = self.archive.archived_since(position)
+        known = {row[0] for row in conn.execute("SELECT filename FROM records")}
+        added = 0
+        for filename, record_id in archived:
+            if filename in known:
+                continue
+            self._insert(conn, filename, "", 0, 0, lambda: self.archive.get(record_id))
+            added += 1
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('archive_position', ?)", (str(position),))
+        return added
+
+    def index_file(self, file_path):
+        """Add or update a single record, e.g. right after it has been saved"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._upsert(conn, file_path, os.stat(file_path))
+
+    def _upsert(self, conn, file_path, stat):
+        def load():
+            with open(file_path, 'r') as f:
+                return json.load(f)
+        self._insert(conn, os.path.basename(file_path), file_path, stat.st_mtime_ns, stat.st_size, load)
+
+    def _insert(self, conn, filename, file_path, mtime_ns, size, load):
+        """Store the summary of the record load() returns (file_path is empty for archived-only records)"""
+        topic = participants = rounds = final_scores = top_score = timestamp = error = None
+        try:
+            debate_data = load()
+            topic = debate_data.get('topic')
+            participants = json.dumps(debate_data.get('participants', []))
+            rounds = debate_data.get('rounds')
+            if debate_data.get('final_scores'):
+                final_scores = json.dumps(debate_data['final_scores'])
+                top_score = max(debate_data['final_scores'].values())
+            timestamp = debate_data.get('timestamp')
+        except Exception as e:
+            error = str(e)
+
+        conn.execute(
+            """INSERT OR REPLACE INTO records
+               (filename, path, mtime_ns, size, topic, participants, rounds, final_scores, top_score, timestamp, error)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (filename, file_path, mtime_ns, size, topic, participants, rounds, final_scores, top_score, timestamp, error)
+        )
+
+    def query_records(self, topic=None, participant=None, date_from=None, date_to=None,
+                      min_score=None, sort='newest', limit=20, offset=0):
+        """One page of record summaries matching the filters, plus the total number of matches.
+
+        topic and participant are case-insensitive substring matches, date_from/date_to
+        are inclusive dates and min_score applies to the higher of the final scores.
+        """
+        clauses = []
+        params = []
+        if topic:
+            clauses.append("topic LIKE ?")
+            params.append(f"%{topic}%")
+        if participant:
+            clauses.append("participants LIKE ?")
+            params.append(f"%{participant}%")
+        if date_from:
+            clauses.append("timestamp >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            clauses.append("timestamp < ?")
+            params.append((date_to + timedelta(days=1)).isoformat())
+        if min_score is not None:
+            clauses.append("top_score >= ?")
+            params.append(min_score)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM records {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""SELECT filename, path, topic, participants, rounds, final_scores, timestamp, error
+                    FROM records {where} ORDER BY {SORT_ORDERS[sort]} LIMIT ? OFFSET ?""",
+                params + [limit, offset]
+            ).fetchall()
+
+        records = [
+            {
+                'filename': filename,
+                'path': path,
+                'topic': topic,
+                'participants': json.loads(participants) if participants else [],
+                'rounds': rounds,
+                'final_scores': json.loads(final_scores) if final_scores else None,
+                'timestamp': timestamp,
+                'error': error
+            }
+            for filename, path, topic, participants, rounds, final_scores, timestamp, error in rows
+        ]
+        return records, total
+
+    def list_records(self):
+        """Summaries of all indexed records, most recent first"""
+        records, _ = self.query_records(limit=-1)
+        return records
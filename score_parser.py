@@ -0,0 +1,259 @@
+"""Single-pass extraction of the SCORES: block from a round analysis.
+
+Every pattern is precompiled and only ever applied to one line at a time, with
+bounded repetition, so parse time grows linearly with the analysis length no
+matter how malformed the model output is.
+"""
+import json
+import re
+
+CRITERIA = ('argument', 'evidence', 'rebuttal', 'clarity')
+MAX_SCORE = 10
+MAX_BLOCK_LINES = 24
+
+# "SCORES:", "**SCORES**", "## Scores", "1. SCORING" after markdown has been stripped
+_HEADER_RE = re.compile(r"\s*(?:\d+\.\s*)?scor(es|ing)\b[^:\n]{0,40}?:?", re.IGNORECASE)
+# "Argument=8", "Argument Strength: 8", "Clarity & Delivery - 7/10", "Evidence (6)"
+_CRITERION_RE = re.compile(
+    r"\b(argument|evidence|rebuttal|clarity)\b[a-z &()/-]{0,24}?\s*[=:]?\s*\(?(\d{1,3}(?:\.\d+)?)",
+    re.IGNORECASE
+)
+# Structured-output schema for extracting the scores from an analysis as JSON (see scores_from_json);
+# a score the analysis does not state is null, so the model is never forced to make one up
+_PARTY_SCHEMA = {
+    'type': 'object',
+    'properties': {criterion: {'type': 'integer', 'nullable': True, 'description': f"0-{MAX_SCORE}, or null if not stated"}
+                   for criterion in CRITERIA},
+    'required': list(CRITERIA)
+}
+SCORES_SCHEMA = {
+    'type': 'object',
+    'properties': {'party1': _PARTY_SCHEMA, 'party2': _PARTY_SCHEMA},
+    'required': ['party1', 'party2']
+}
+
+_MARKDOWN_RE = re.compile(r"[*_`#>|]+")
+_NAME_JUNK_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _clean(line):
+    """Drop markdown emphasis, table pipes and list bullets"""
+    return _MARKDOWN_RE.sub(" ", line).lstrip(" \t-•+")
+
+
+def _normalize_name(text):
+    return _WHITESPACE_RE.sub(" ", _NAME_JUNK_RE.sub(" ", text.casefold())).strip()
+
+
+def _match_party(prefix, names):
+    """Which party a line prefix names: (party key, exact match) or (None, False)"""
+    normalized = _normalize_name(prefix)
+    if not normalized:
+        return None, False
+
+    for party, name in names.items():
+        if normalized == name:
+            return party, True
+
+    # Tolerate quoting, numbering or short labels around the name ("1. Team Alpha (Pro)"),
+    # preferring the longest matching name when one name contains the other
+    candidates = []
+    for party, name in names.items():
+        if name and name in normalized and len(normalized) <= len(name) + 24:
+            candidates.append((len(name), party))
+        elif len(normalized) >= 3 and normalized in name:
+            candidates.append((len(normalized), party))
+    if candidates:
+        return max(candidates)[1], False
+    return None, False
+
+
+def _score_groups(line):
+    """Split a line's criterion matches into per-party groups: [(prefix text, {criterion: value})]"""
+    groups = []
+    previous_end = 0
+    values = None
+    prefix_start = 0
+    for match in _CRITERION_RE.finditer(line):
+        criterion = match.group(1).lower()
+        # A repeated criterion means a second party's scores on the same line
+        if values is None or criterion in values:
+            if values is not None:
+                groups.append((line[prefix_start:group_start], values))
+            values = {}
+            prefix_start = previous_end
+            group_start = match.start()
+        values[criterion] = float(match.group(2))
+        previous_end = match.end()
+    if values is not None:
+        groups.append((line[prefix_start:group_start], values))
+    return groups
+
+
+def _empty_scores():
+    scores = {}
+    for party in ('party1', 'party2'):
+        scores[party] = {criterion: 0 for criterion in CRITERIA}
+        scores[party]['total'] = 0
+    return scores
+
+
+def _find_header(lines):
+    """Index of the SCORES header line and the text after it, preferring "SCORES" over "SCORING" """
+    fallback = None
+    for index, line in enumerate(lines):
+        cleaned = _clean(line)
+        header = _HEADER_RE.match(cleaned)
+        if not header:
+            continue
+        if header.group(1).lower() == 'es':
+            return index, cleaned[header.end():]
+        if fallback is None:
+            fallback = (index, cleaned[header.end():])
+    return fallback or (None, None)
+
+
+def parse_scores(analysis_text, party1_name, party2_name):
+    """Extract per-criterion scores for both parties.
+
+    Returns a dict with:
+      scores     -- {'party1': {...}, 'party2': {...}} in the shape the app stores (missing values are 0)
+      status     -- 'ok' (all eight scores found), 'partial' or 'missing'
+      confidence -- 0.0-1.0, lowered for fuzzy name matches, order-based assignment,
+                    out-of-range values or a missing SCORES header
+      issues     -- human-readable reasons for any lowered confidence
+      terminated -- whether the last score line is followed by a line break, i.e. no score
+                    can still be growing (useful while streaming)
+    """
+    names = {'party1': _normalize_name(party1_name), 'party2': _normalize_name(party2_name)}
+    lines = analysis_text.splitlines()
+    issues = []
+
+    # Locate the SCORES header; without one, fall back to scanning every line
+    block_start, header_rest = _find_header(lines)
+    if block_start is None:
+        candidate_lines = [_clean(line) for line in lines]
+        issues.append("no SCORES header")
+    else:
+        candidate_lines = [header_rest] + [_clean(line) for line in lines[block_start + 1:block_start + MAX_BLOCK_LINES]]
+
+    found = {'party1': {}, 'party2': {}}
+    unassigned = []
+    current_party = None
+    fuzzy = False
+    terminated = False
+    seen_scores = False
+    last_scores_line = None
+
+    for line_index, cleaned in enumerate(candidate_lines):
+        if not cleaned.strip():
+            if block_start is not None and seen_scores:
+                terminated = True
+                break
+            continue
+
+        groups = _score_groups(cleaned)
+        if not groups:
+            # A line that is just a party name introduces scores listed one per line below it
+            party, exact = _match_party(cleaned, names)
+            if party:
+                current_party = party
+                fuzzy = fuzzy or not exact
+            continue
+
+        for prefix, values in groups:
+            party, exact = _match_party(prefix, names)
+            if party:
+                current_party = party
+                fuzzy = fuzzy or not exact
+            elif block_start is None or prefix.strip():
+                # Unlabelled scores in free text (or labelled with an unknown name) are only trusted as a full set
+                party = None
+            else:
+                party = current_party
+
+            if block_start is None and len(values) < 3:
+                continue
+            seen_scores = True
+            last_scores_line = line_index
+
+            if party is None:
+                unassigned.append(values)
+                continue
+            for criterion, value in values.items():
+                found[party].setdefault(criterion, value)
+
+    if seen_scores and not terminated:
+        terminated = last_scores_line < len(candidate_lines) - 1 or analysis_text.endswith(("\n", "\r"))
+
+    # Fall back to order: the first unlabelled set belongs to whichever party is still missing
+    order_assigned = False
+    for values in unassigned:
+        missing = [party for party in ('party1', 'party2') if not found[party]]
+        if not missing:
+            break
+        found[missing[0]] = dict(values)
+        order_assigned = True
+
+    scores = _empty_scores()
+    clamped = False
+    for party in ('party1', 'party2'):
+        for criterion, value in found[party].items():
+            if value > MAX_SCORE:
+                value = MAX_SCORE
+                clamped = True
+            scores[party][criterion] = int(round(value))
+        scores[party]['total'] = sum(scores[party][criterion] for criterion in CRITERIA)
+
+    found_count = sum(len(found[party]) for party in found)
+    if found_count == 2 * len(CRITERIA):
+        status = 'ok'
+        confidence = 1.0
+    elif found_count:
+        status = 'partial'
+        confidence = found_count / (2 * len(CRITERIA))
+        issues.append(f"{2 * len(CRITERIA) - found_count} of {2 * len(CRITERIA)} scores missing")
+    else:
+        return {'scores': scores, 'status': 'missing', 'confidence': 0.0, 'issues': issues + ["no scores found"], 'terminated': terminated}
+
+    if block_start is None:
+        confidence -= 0.15
+    if fuzzy:
+        confidence -= 0.1
+        issues.append("party name matched approximately")
+    if order_assigned:
+        confidence -= 0.25
+        issues.append("scores assigned to parties by order")
+    if clamped:
+        confidence -= 0.2
+        issues.append(f"scores above {MAX_SCORE} clamped")
+
+    return {
+        'scores': scores,
+        'status': status,
+        'confidence': round(max(confidence, 0.0), 2),
+        'issues': issues,
+        'terminated': terminated
+    }
+
+
+def scores_from_json(text):
+    """Scores in the parse_scores shape from a SCORES_SCHEMA response, or None unless all eight are valid
+    (a missing or null score means the analysis did not state it, so the extraction failed)"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    scores = _empty_scores()
+    for party in ('party1', 'party2'):
+        values = data.get(party) if isinstance(data, dict) else None
+        if not isinstance(values, dict):
+            return None
+        for criterion in CRITERIA:
+            value = values.get(criterion)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= MAX_SCORE:
+                return None
+            scores[party][criterion] = int(round(value))
+        scores[party]['total'] = sum(scores[party][criterion] for criterion in CRITERIA)
+    return scores
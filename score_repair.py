@@ -0,0 +1,82 @@
+from debate_host import is_error_response
+from score_parser import parse_scores, scores_from_json
+
+# How a round's scores were obtained, recorded as score_parse['repair']
+REPAIR_METHODS = ('extracted', 'reanalyzed', 'failed')
+# Scores read back by the repair model are trusted a little less than a clean SCORES block
+EXTRACTED_CONFIDENCE = 0.9
+REANALYZED_CONFIDENCE = 0.8
+
+
+class ScoreRepair:
+    """Recovers the scores of an analysis whose SCORES block does not parse cleanly.
+
+    When some scores were found, the analysis text alone first goes to the small repair
+    model with a JSON schema (DebateHost.extract_scores), which costs a fraction of the
+    analysis itself. Analyses without any scores have nothing to extract, so they (and
+    failed extractions) are analyzed again, and the new analysis replaces the old one
+    when its scores parse. Rounds that cannot be repaired keep the partial scores
+    with repair='failed', so they are flagged rather than silently counted as zeros.
+    """
+
+    def __init__(self, host, reanalyze=True):
+        self.host = host
+        self.reanalyze = reanalyze
+        self.last_result = None
+
+    def check(self, analysis, party1_name, party2_name, round_args=None, bypass_cache=False):
+        """Parse and, if needed, repair an analysis; round_args (analyze_arguments' arguments) enable re-analysis.
+
+        Returns the parse_scores result plus 'repair' (None when no repair was needed),
+        'repair_model' and 'analysis' (the analysis the scores belong to).
+        """
+        parsed = parse_scores(analysis, party1_name, party2_name)
+        result = {**parsed, 'repair': None, 'repair_model': None, 'analysis': analysis}
+        if parsed['status'] == 'ok':
+            return result
+
+        scores = None
+        if parsed['status'] == 'partial':
+            extracted = self.host.extract_scores(analysis, party1_name, party2_name, bypass_cache)
+            scores = None if is_error_response(extracted) else scores_from_json(extracted)
+        if scores is not None:
+            result.update(scores=scores, status='ok', confidence=EXTRACTED_CONFIDENCE,
+                          issues=parsed['issues'] + ["scores extracted from the analysis text"],
+                          repair='extracted', repair_model=self.host.last_model('repair'))
+            return result
+
+        if self.reanalyze and round_args is not None:
+            # A fresh call, not the cached analysis that failed to parse
+            reanalysis = self.host.analyze_arguments(*round_args, bypass_cache=True)
+            reparsed = None if is_error_response(reanalysis) else parse_scores(reanalysis, party1_name, party2_name)
+            if reparsed and reparsed['status'] == 'ok':
+                result.update(reparsed, confidence=min(reparsed['confidence'], REANALYZED_CONFIDENCE),
+                              issues=parsed['issues'] + reparsed['issues'] + ["round analyzed again"],
+                              repair='reanalyzed', repair_model=self.host.last_model('analysis'), analysis=reanalysis)
+                return result
+
+        result.update(issues=parsed['issues'] + ["score repair failed"], repair='failed')
+        return result
+
+    def stream_analysis(self, party1_name, party1_argument, party2_name, party2_argument, round_number, topic, bypass_cache=False):
+        """DebateHost.stream_analysis, checked and repaired once the stream ends (see last_result / summary())"""
+        round_args = (party1_name, party1_argument, party2_name, party2_argument, round_number, topic)
+        self.last_result = None
+        chunks = []
+        for chunk in self.host.stream_analysis(*round_args, bypass_cache=bypass_cache):
+            chunks.append(chunk)
+            yield chunk
+        analysis = "".join(chunks)
+        if not is_error_response(analysis):
+            self.last_result = self.check(analysis, party1_name, party2_name, round_args, bypass_cache)
+
+    def summary(self):
+        """JSON-serialisable record of the last check: scores, status, confidence, issues, repair and repair_model,
+        plus the new analysis if the round was analyzed again"""
+        if self.last_result is None:
+            return None
+        keys = ('scores', 'status', 'confidence', 'issues', 'repair', 'repair_model')
+        summary = {key: self.last_result[key] for key in keys}
+        if self.last_result['repair'] == 'reanalyzed':
+            summary['analysis'] = self.last_result['analysis']
+        return summary
@@ -0,0 +1,142 @@
+import re
+
+CRITERIA = ('argument', 'evidence', 'rebuttal', 'clarity')
+DEFAULT_TOKEN_BUDGET = 6000
+DEFAULT_PIVOTAL_ROUNDS = 2
+
+_ASSESSMENT_PATTERN = re.compile(r"ROUND ASSESSMENT[^\n]*\n", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English prose)"""
+    return (len(text) + 3) // 4
+
+
+def _clip(text, max_chars):
+    """Collapse whitespace and cut at the last sentence end that fits in max_chars"""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+
+    clipped = text[:max_chars]
+    ends = [match.end() for match in _SENTENCE_END.finditer(clipped)]
+    if ends and ends[-1] > max_chars // 2:
+        return clipped[:ends[-1]]
+    return clipped.rstrip() + "…"
+
+
+def _assessment(analysis, max_chars):
+    """The ROUND ASSESSMENT part of an analysis, or its last paragraph if there is none"""
+    match = _ASSESSMENT_PATTERN.search(analysis)
+    if match:
+        section = analysis[match.end():]
+    else:
+        paragraphs = [p for p in analysis.split("\n\n") if p.strip()]
+        section = paragraphs[-1] if paragraphs else ""
+    return _clip(section, max_chars)
+
+
+def summarize_round(round_data, max_chars=240):
+    """Compact structured summary of a finished round, stored alongside it for the final verdict"""
+    scores = round_data.get('scores', {})
+    party1_scores = scores.get('party1', {})
+    party2_scores = scores.get('party2', {})
+    margin = party1_scores.get('total', 0) - party2_scores.get('total', 0)
+
+    if margin > 0:
+        winner = round_data.get('party1_name', 'Party 1')
+    elif margin < 0:
+        winner = round_data.get('party2_name', 'Party 2')
+    else:
+        winner = None
+
+    return {
+        'round': round_data.get('round'),
+        'winner': winner,
+        'margin': abs(margin),
+        'party1_point': _clip(round_data.get('party1_argument', ''), max_chars),
+        'party2_point': _clip(round_data.get('party2_argument', ''), max_chars),
+        'assessment': _assessment(round_data.get('analysis', ''), max_chars)
+    }
+
+
+def _score_line(round_data):
+    scores = round_data.get('scores', {})
+    cells = []
+    for party in ('party1', 'party2'):
+        party_scores = scores.get(party, {})
+        criteria = "/".join(str(party_scores.get(criterion, 0)) for criterion in CRITERIA)
+        cells.append(f"{criteria} = {party_scores.get('total', 0)}")
+    return f"R{round_data.get('round')} | {cells[0]} | {cells[1]}"
+
+
+def _summary_line(summary, detailed=True):
+    outcome = f"{summary['winner']} by {summary['margin']}" if summary['winner'] else "tied"
+    line = f"R{summary['round']}: {outcome}."
+    if detailed:
+        line += (
+            f" P1: {summary['party1_point']}"
+            f" P2: {summary['party2_point']}"
+            f" Assessment: {summary['assessment']}"
+        )
+    return line
+
+
+def _raw_round(round_data, max_chars):
+    text = (
+        f"Round {round_data.get('round')}\n"
+        f"{round_data.get('party1_name', 'Party 1')}: {round_data.get('party1_argument', '')}\n"
+        f"{round_data.get('party2_name', 'Party 2')}: {round_data.get('party2_argument', '')}\n"
+        f"Analysis: {round_data.get('analysis', '')}"
+    )
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def build_verdict_context(debate_history, token_budget=DEFAULT_TOKEN_BUDGET, pivotal_rounds=DEFAULT_PIVOTAL_ROUNDS):
+    """Debate record for the final verdict prompt, kept within token_budget.
+
+    Always includes the per-criterion score table. Round summaries are added in full
+    while they fit; the rounds with the smallest margins are shortened to their outcome
+    first. Any remaining budget goes to the raw text of the pivotal_rounds rounds with
+    the largest score margins.
+    """
+    if not debate_history:
+        return "No rounds were completed."
+
+    first = debate_history[0]
+    header = [
+        f"P1 = {first.get('party1_name', 'Party 1')}, P2 = {first.get('party2_name', 'Party 2')}",
+        "Per-round scores (Argument/Evidence/Rebuttal/Clarity = total), P1 | P2:"
+    ]
+    header += [_score_line(round_data) for round_data in debate_history]
+
+    summaries = [round_data.get('summary') or summarize_round(round_data) for round_data in debate_history]
+    by_margin = sorted(range(len(summaries)), key=lambda i: (summaries[i]['margin'], i))
+
+    used = estimate_tokens("\n".join(header))
+    summary_lines = [_summary_line(summary) for summary in summaries]
+    used += estimate_tokens("\n".join(summary_lines))
+
+    # Shorten the least decisive rounds first until the summaries fit
+    for i in by_margin:
+        if used <= token_budget:
+            break
+        brief = _summary_line(summaries[i], detailed=False)
+        used -= estimate_tokens(summary_lines[i]) - estimate_tokens(brief)
+        summary_lines[i] = brief
+
+    sections = ["\n".join(header), "Round summaries:\n" + "\n".join(summary_lines)]
+
+    pivotal = [i for i in reversed(by_margin) if summaries[i]['margin'] > 0][:pivotal_rounds]
+    raw_rounds = {}
+    for i in pivotal:
+        remaining_chars = (token_budget - used) * 4
+        if remaining_chars < 200:
+            break
+        raw_rounds[i] = _raw_round(debate_history[i], remaining_chars)
+        used += estimate_tokens(raw_rounds[i])
+    if raw_rounds:
+        sections.append("Full text of pivotal rounds:\n" + "\n\n".join(raw_rounds[i] for i in sorted(raw_rounds)))
+
+    return "\n\n".join(sections)